@@ -135,6 +135,18 @@ export const api = {
         return response.json();
     },
 
+    async getRestaurantView(yelpId) {
+        // Public endpoint: send the token when we have one so is_favorite is filled in
+        const token = getAuthToken();
+        const headers = token ? { 'Authorization': `Bearer ${token}` } : {};
+        const response = await fetch(`${API_BASE_URL}/restaurants/${yelpId}/view`, { headers });
+        if (!response.ok) {
+            const errorData = await response.json();
+            throw new Error(errorData.detail || "Failed to fetch restaurant");
+        }
+        return response.json();
+    },
+
     async getLocalPicks(latitude, longitude, limit = 10) {
         const params = new URLSearchParams({ latitude, longitude, limit });
         const response = await fetch(`${API_BASE_URL}/recommendations/localpicks?${params}`);
@@ -174,6 +186,16 @@ export const api = {
         return response.json();
     },
 
+    async getUsersFavorites() {
+        const url = `${API_BASE_URL}/users/me/favorites`;
+        const response = await fetchWithAuth(url, { method: "GET" });
+        if (!response.ok) {
+            const errorData = await response.json();
+            throw new Error(errorData.detail || "Failed to get favorites");
+        }
+        return response.json();
+    },
+
     async getSimilarRestaurants(restaurantId, limit = 5) {
         const params = new URLSearchParams({ limit });
         const url = `${API_BASE_URL}/restaurants/similar/${restaurantId}?${params}`;
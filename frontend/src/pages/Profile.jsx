@@ -2,7 +2,6 @@ import React, { useState, useEffect } from "react";
 import axios from 'axios';
 import { useNavigate, useLocation, useSearchParams } from "react-router-dom";
 import "./Profile.css";
-import { api } from "../api";
 
 // --- CONFIGURATION ---
 const API_BASE_URL = 'http://localhost:8000'; 
@@ -65,13 +64,14 @@ export default function Profile() {
   useEffect(() => {
     const fetchProfile = async () => {
       try {
-        const response = await base_api.get('/users/me');
-        const reviewCountRes = await base_api.get('/users/me/reviews/count');
-        const favoritesCountRes = await api.getUsersFavoritesList();
-
-        const userData = response.data;
-        const reviewCount = reviewCountRes.data.reviewCount;
-        const favoritesCount =  favoritesCountRes.favorite_ids ? favoritesCountRes.favorite_ids.length : 0;
+        // Profile, review count and favorites in one round trip
+        const response = await base_api.get('/users/me/bundle', {
+          params: { include: 'profile,review_count,favorite_ids' },
+        });
+
+        const userData = response.data.profile;
+        const reviewCount = response.data.review_count;
+        const favoritesCount = response.data.favorite_ids ? response.data.favorite_ids.length : 0;
 
         const formatDate = (isoString) => {
             if (!isoString) {
@@ -1,4 +1,4 @@
-import React, {useEffect, useState, useCallback} from "react";
+import React, {useEffect, useState} from "react";
 import "./Restaurant.css"; // styles below
 import { useNavigate, useParams, useLocation, useSearchParams } from "react-router-dom";
 import { api } from "../api"; // needed for fetching restaurant data
@@ -80,24 +80,6 @@ export default function Restaurant() {
         );
     }
 
-    const checkFavoriteStatus = useCallback(async () => {
-
-        try {
-            const response = await api.getUsersFavoritesList(); // <-- NOTE: We need a new backend endpoint for *just* the IDs
-            const favoriteIds = response.favorite_ids || [];
-            const isFav = favoriteIds.includes(id);
-            // const isFav = response.data.some(fav => fav.id === id);
-            console.log(response);
-            console.log("Favorite status for restaurant", id, "is", isFav);
-            setIsFavorited(isFav);
-
-        } catch (err) {
-           
-            setFavoritesError("Could not check favorite status. Please log in.");
-            console.error("Error checking favorite status:", err);
-        }
-    }, [id]);
-
     const toggleFavorite = async () => {
 
         try {
@@ -123,11 +105,13 @@ export default function Restaurant() {
         const fetchRestaurant = async () => {
             try {
                 setLoading(true);
-                const data = await api.getYelpBusinessDetails(id);
-                setRestaurant(data);
-
-                const recData = await api.getSimilarRestaurants(id, 5);
-                setRecs(recData);
+                // Details, similar places and favorite status in one round trip
+                const data = await api.getRestaurantView(id);
+                setRestaurant(data.restaurant);
+                setRecs(data.similar);
+                if (data.is_favorite !== null) {
+                    setIsFavorited(data.is_favorite);
+                }
 
                 setError(null);
             } catch (err) {
@@ -140,9 +124,8 @@ export default function Restaurant() {
 
         if (id) {
             fetchRestaurant();
-            checkFavoriteStatus(); 
         }
-    }, [id, checkFavoriteStatus]);
+    }, [id]);
 
     if (loading) {
         return <div>Loading...</div>;
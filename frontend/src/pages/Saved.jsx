@@ -104,19 +104,8 @@ const handleGoBack = () => {
         setError(null);
         try {
             
-            const idsResponse = await api.getUsersFavoritesList(); 
-            const favoriteIds = idsResponse.favorite_ids || [];
-
-            if (favoriteIds.length === 0) {
-                 setFavorites([]);
-                 return;
-            }
-
-            
-            const detailPromises = favoriteIds.map(id => api.getYelpBusinessDetails(id));
-            
-            
-            const detailedFavorites = await Promise.all(detailPromises);
+            // One round trip: the backend resolves every favorite's details
+            const detailedFavorites = await api.getUsersFavorites();
             
             
             if (Array.isArray(detailedFavorites)) {
@@ -0,0 +1,91 @@
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from typing import Any
+
+from cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+TOKEN_CACHE_MAX_ENTRIES = int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", "10000"))
+# Stop serving a cached token this many seconds before its own `exp`
+TOKEN_CACHE_EXPIRY_MARGIN = float(os.getenv("TOKEN_CACHE_EXPIRY_MARGIN", "30"))
+SIGNING_KEYS_REFRESH_INTERVAL = float(os.getenv("SIGNING_KEYS_REFRESH_INTERVAL", "1800"))
+
+
+class VerifiedTokenCache:
+    """
+    Bounded cache of already-verified Firebase ID tokens.
+    Keyed on a SHA-256 of the token (raw tokens are never kept) and expiring
+    at the token's own `exp` claim, so a cached entry is never more permissive
+    than verify_id_token() itself.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = TOKEN_CACHE_MAX_ENTRIES,
+        expiry_margin: float = TOKEN_CACHE_EXPIRY_MARGIN,
+    ) -> None:
+        self._cache = TTLCache(max_entries=max_entries, max_bytes=max_entries)
+        self.expiry_margin = expiry_margin
+        self.verify_calls = 0
+        self.verify_seconds = 0.0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> dict[str, Any] | None:
+        claims: dict[str, Any] | None = self._cache.get(self._key(token))
+        return claims
+
+    def put(self, token: str, claims: dict[str, Any]) -> None:
+        ttl = float(claims.get("exp", 0)) - time.time() - self.expiry_margin
+        if ttl > 0:
+            self._cache.set(self._key(token), claims, ttl=ttl)
+
+    def record_verify(self, seconds: float) -> None:
+        self.verify_calls += 1
+        self.verify_seconds += seconds
+
+    def stats(self) -> dict[str, Any]:
+        avg_verify = self.verify_seconds / self.verify_calls if self.verify_calls else 0.0
+        stats = self._cache.stats()
+        return {
+            "entries": stats["entries"],
+            "hits": stats["hits"],
+            "misses": stats["misses"],
+            "verify_calls": self.verify_calls,
+            "avg_verify_ms": avg_verify * 1000,
+            # Every hit skipped one signature verification
+            "verify_ms_saved": stats["hits"] * avg_verify * 1000,
+        }
+
+
+def prefetch_signing_keys() -> bool:
+    """
+    Refresh Google's ID token signing certificates in firebase_admin's own
+    HTTP cache, so verify_id_token() never pays for the fetch in a request.
+    The keys have to land in that cache, so this goes through the SDK's own
+    (private) certificate request; requirements.txt pins firebase-admin below
+    the next major version for it. Returns False if the internals are missing.
+    """
+    try:
+        from firebase_admin import _token_gen, auth
+
+        request = auth._get_client(None)._token_verifier.request
+        # no-cache forces a revalidation and stores the fresh response
+        request(_token_gen.ID_TOKEN_CERT_URI, headers={"Cache-Control": "no-cache"})
+        return True
+    except Exception as e:
+        logger.warning("Signing key prefetch failed: %s", e)
+        return False
+
+
+async def refresh_signing_keys_forever(interval: float = SIGNING_KEYS_REFRESH_INTERVAL) -> None:
+    """Background task (started from the lifespan hook) that keeps the keys warm."""
+    while True:
+        await asyncio.to_thread(prefetch_signing_keys)
+        await asyncio.sleep(interval)
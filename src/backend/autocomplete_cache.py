@@ -0,0 +1,121 @@
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from cache import TTLCache
+from tracing import detached_task
+
+logger = logging.getLogger(__name__)
+
+Key = tuple[str, str]  # (location tile, normalized text)
+
+
+class AutocompleteCache:
+    """
+    Prefix-indexed autocomplete cache with stale-while-revalidate.
+
+    Entries are keyed by (location tile, normalized text). A lookup for "pizz"
+    that has no entry of its own is answered by narrowing the results cached
+    for the longest shorter prefix ("piz", "pi", ...). Entries older than
+    `ttl` are still served for up to `stale_ttl` more seconds while a refresh
+    runs in the background.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[..., Awaitable[Any]],
+        narrow: Callable[[Any, str], Any | None],
+        ttl: float = 600,
+        stale_ttl: float = 3600,
+        min_prefix: int = 2,
+        max_entries: int = 20000,
+    ) -> None:
+        # fetch(tile, text, background=False) calls upstream; narrow(response, text)
+        # filters a shorter prefix's response for `text`, or returns None if nothing matches
+        self._fetch = fetch
+        self._narrow = narrow
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.min_prefix = min_prefix
+        self._entries = TTLCache(max_entries=max_entries, max_bytes=max_entries)
+        self._refreshing: set[Key] = set()
+        self._tasks: set[asyncio.Task[None]] = set()
+        self.exact_hits = 0
+        self.prefix_hits = 0
+        self.stale_hits = 0
+        self.upstream_calls = 0
+
+    def _lookup(self, key: Key) -> tuple[Any, float] | None:
+        entry: tuple[Any, float] | None = self._entries.get(key)
+        return entry
+
+    def _store(self, key: Key, response: Any) -> None:
+        self._entries.set(key, (response, time.monotonic()), ttl=self.ttl + self.stale_ttl)
+
+    async def get(self, tile: str, text: str) -> Any:
+        key = (tile, text)
+        entry = self._lookup(key)
+        if entry is not None:
+            response, fetched_at = entry
+            if not self._revalidate(key, fetched_at):
+                self.exact_hits += 1
+            return response
+
+        # Answer from the longest cached shorter prefix, if it has matches
+        for end in range(len(text) - 1, self.min_prefix - 1, -1):
+            prefix_key = (tile, text[:end])
+            prefix_entry = self._lookup(prefix_key)
+            if prefix_entry is None:
+                continue
+            narrowed = self._narrow(prefix_entry[0], text)
+            if narrowed is not None:
+                # A stale prefix is refreshed like an exact entry would be
+                if not self._revalidate(prefix_key, prefix_entry[1]):
+                    self.prefix_hits += 1
+                return narrowed
+            break
+
+        return await self._fetch_and_store(key)
+
+    def _revalidate(self, key: Key, fetched_at: float) -> bool:
+        """Start a background refresh if the entry is past `ttl`; True if it was stale."""
+        if time.monotonic() - fetched_at <= self.ttl:
+            return False
+        self.stale_hits += 1
+        self._refresh_in_background(key)
+        return True
+
+    async def _fetch_and_store(self, key: Key, background: bool = False) -> Any:
+        self.upstream_calls += 1
+        response = await self._fetch(*key, background=background)
+        self._store(key, response)
+        return response
+
+    def _refresh_in_background(self, key: Key) -> None:
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+
+        async def refresh() -> None:
+            try:
+                await self._fetch_and_store(key, background=True)
+            except Exception as e:
+                logger.warning("Autocomplete refresh failed for %s: %s", key, e)
+            finally:
+                self._refreshing.discard(key)
+
+        # Keep a reference so the task is not garbage collected mid-flight
+        task = detached_task(refresh())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "exact_hits": self.exact_hits,
+            "prefix_hits": self.prefix_hits,
+            "stale_hits": self.stale_hits,
+            "upstream_calls": self.upstream_calls,
+        }
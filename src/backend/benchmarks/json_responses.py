@@ -0,0 +1,195 @@
+"""
+Microbenchmark: FastAPI's default response path (response_model validation and
+serialization) vs the FAST_JSON path (FastJSONResponse: prebuilt models are
+type-checked against the response_model rather than rebuilt) for the payload
+shape of each endpoint that uses responses.fast_response.
+
+Handlers return prebuilt models, so the numbers are serialization overhead
+per request, not Yelp or Firestore latency. FastAPI releases that already
+serialize response models with pydantic-core (dump_json) narrow the gap to
+the lighter validation pass; older releases go through jsonable_encoder and
+json.dumps and gain the most.
+
+    cd src/backend
+    python -m benchmarks.json_responses --requests 500 --rounds 5
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import time
+from collections.abc import Callable
+from typing import Any
+
+import fastapi
+import httpx
+from fastapi import FastAPI
+
+from models import RestaurantResponse, ReviewResponse, ReviewWithRestaurantInfo
+from responses import FastJSONResponse
+from yelp_api_client import YelpBusiness, YelpBusinessDetail, YelpSearchResponse
+
+
+def yelp_business(i: int) -> dict[str, Any]:
+    return {
+        "id": f"business-{i}",
+        "name": f"Restaurant {i}",
+        "image_url": f"https://s3-media.example.com/{i}/o.jpg",
+        "is_closed": False,
+        "review_count": 100 + i,
+        "rating": 4.5,
+        "phone": "+12125550100",
+        "display_phone": "(212) 555-0100",
+        "distance": 120.5 + i,
+        "coordinates": {"latitude": 40.73 + i / 1e4, "longitude": -73.99 - i / 1e4},
+        "location": {
+            "address1": f"{i} Broadway",
+            "city": "New York",
+            "zip_code": "10003",
+            "state": "NY",
+            "country": "US",
+            "display_address": [f"{i} Broadway", "New York, NY 10003"],
+        },
+        "url": f"https://www.yelp.com/biz/restaurant-{i}",
+        "categories": [
+            {"alias": "pizza", "title": "Pizza"},
+            {"alias": "italian", "title": "Italian"},
+        ],
+    }
+
+
+def yelp_detail(i: int) -> YelpBusinessDetail:
+    data = yelp_business(i)
+    data.pop("distance")
+    data["photos"] = [f"https://s3-media.example.com/{i}/{n}.jpg" for n in range(3)]
+    data["price"] = "$$"
+    data["hours"] = [
+        {
+            "open": [{"day": d, "start": "1100", "end": "2300"} for d in range(7)],
+            "hours_type": "REGULAR",
+            "is_open_now": True,
+        }
+    ]
+    return YelpBusinessDetail(**data)
+
+
+def restaurant(i: int) -> RestaurantResponse:
+    return RestaurantResponse(
+        id=f"business-{i}",
+        name=f"Restaurant {i}",
+        address=f"{i} Broadway, New York, NY 10003",
+        cuisine_type="Pizza",
+        description="Rating: 4.5",
+        phone="+12125550100",
+        image_url=f"https://s3-media.example.com/{i}/o.jpg",
+        created_at="2025-01-01T00:00:00",
+        updated_at="2025-01-01T00:00:00",
+    )
+
+
+def user_review(i: int) -> ReviewWithRestaurantInfo:
+    return ReviewWithRestaurantInfo(
+        id=f"review-{i}",
+        restaurant_id=f"business-{i}",
+        restaurant_name=f"Restaurant {i}",
+        rating=4,
+        text="Great crust, friendly staff. " * 4,
+        created_at="2025-01-01T00:00:00",
+    )
+
+
+def restaurant_review(i: int) -> ReviewResponse:
+    return ReviewResponse(
+        id=f"review-{i}",
+        restaurant_id="business-1",
+        user_id=f"user-{i}",
+        rating=4.0,
+        text="Great crust, friendly staff. " * 4,
+        created_at="2025-01-01T00:00:00",
+    )
+
+
+# endpoint -> (response_model, prebuilt content)
+ENDPOINTS: dict[str, tuple[Any, Any]] = {
+    "search_restaurants_yelp (50)": (
+        YelpSearchResponse,
+        YelpSearchResponse(
+            businesses=[YelpBusiness(**yelp_business(i)) for i in range(50)],
+            total=50,
+            region={"center": {"latitude": 40.73, "longitude": -73.99}},
+        ),
+    ),
+    "get_yelp_business_details": (YelpBusinessDetail, yelp_detail(1)),
+    "list_restaurants (50)": (list[RestaurantResponse], [restaurant(i) for i in range(50)]),
+    "list_user_favorites (20)": (
+        list[YelpBusinessDetail | RestaurantResponse],
+        [yelp_detail(i) for i in range(20)],
+    ),
+    "list_user_reviews (100)": (
+        list[ReviewWithRestaurantInfo],
+        [user_review(i) for i in range(100)],
+    ),
+    "list_restaurant_reviews (100)": (
+        list[ReviewResponse],
+        [restaurant_review(i) for i in range(100)],
+    ),
+}
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+    for index, (response_model, content) in enumerate(ENDPOINTS.values()):
+
+        def handlers(
+            content: Any = content, response_model: Any = response_model
+        ) -> tuple[Callable[[], Any], Callable[[], Any]]:
+            async def default() -> Any:
+                return content
+
+            async def fast() -> Any:
+                return FastJSONResponse(content, response_model)
+
+            return default, fast
+
+        default_handler, fast_handler = handlers()
+        app.get(f"/default/{index}", response_model=response_model)(default_handler)
+        app.get(f"/fast/{index}", response_model=response_model)(fast_handler)
+    return app
+
+
+async def time_path(client: httpx.AsyncClient, path: str, requests: int) -> float:
+    """Mean milliseconds per sequential request."""
+    started = time.perf_counter()
+    for _ in range(requests):
+        await client.get(path)
+    return (time.perf_counter() - started) * 1000 / requests
+
+
+async def main(requests: int, rounds: int) -> None:
+    app = build_app()
+    transport = httpx.ASGITransport(app=app)
+    has_orjson = importlib.util.find_spec("orjson") is not None
+    print(f"fastapi {fastapi.__version__}, orjson {'yes' if has_orjson else 'no'}")
+    print(f"{'endpoint':32} {'default ms':>11} {'fast ms':>9} {'speedup':>8}")
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for index, name in enumerate(ENDPOINTS):
+            default_body = (await client.get(f"/default/{index}")).content
+            fast_body = (await client.get(f"/fast/{index}")).content
+            # Both paths must produce the same document
+            assert json.loads(default_body) == json.loads(fast_body), name
+
+            # Alternate the two paths and keep the best round of each to damp noise
+            default_ms = fast_ms = float("inf")
+            for _ in range(rounds):
+                default_ms = min(default_ms, await time_path(client, f"/default/{index}", requests))
+                fast_ms = min(fast_ms, await time_path(client, f"/fast/{index}", requests))
+            print(f"{name:32} {default_ms:11.3f} {fast_ms:9.3f} {default_ms / fast_ms:7.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=500, help="requests per round")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.rounds))
@@ -0,0 +1,342 @@
+"""
+Offline load test: every endpoint in main.py against the in-memory Firestore
+and Firebase auth fakes and a local fake Yelp server (fakes/). No network or
+credentials needed. Reports throughput and p50/p95/p99 latency per endpoint.
+
+Requests go through httpx's ASGI transport, so the numbers cover the app
+(routing, auth, caches, data access, serialization) plus the simulated
+Yelp latency, but not a real socket to the client.
+
+    cd src/backend
+    python -m benchmarks.load --requests 200 --concurrency 20 --yelp-latency 0.05
+"""
+
+import os
+import tempfile
+
+# Configuration is read at import time, so set it before the app modules load.
+# The limiter and quota are lifted so they measure the app, not Yelp's budget.
+os.environ.setdefault("YELP_API_KEY", "fake")
+os.environ.setdefault("YELP_RATE_PER_SECOND", "100000")
+os.environ.setdefault("YELP_RATE_BURST", "100000")
+os.environ.setdefault("YELP_DAILY_QUOTA", "100000000")
+os.environ.setdefault("CACHE_BACKEND_URL", "memory://")
+os.environ.setdefault(
+    "DETAIL_STORE_PATH", os.path.join(tempfile.mkdtemp(prefix="crowdfork-load-"), "details.db")
+)
+
+import argparse  # noqa: E402
+import asyncio  # noqa: E402
+import itertools  # noqa: E402
+import statistics  # noqa: E402
+import time  # noqa: E402
+from collections.abc import Callable  # noqa: E402
+from datetime import datetime, timedelta  # noqa: E402
+from typing import Any
+
+import httpx  # noqa: E402
+
+import services  # noqa: E402
+from fakes.yelp import CENTER, FakeYelpSettings, make_business, serve  # noqa: E402
+
+# (method, url, json body or None, bearer token or None)
+Call = tuple[str, str, dict[str, Any] | None, str | None]
+
+
+class Fixture:
+    """Seeded users, tokens and restaurants shared by the scenarios."""
+
+    def __init__(self, db: Any, auth: Any, users: int, restaurants: int) -> None:
+        self.restaurant_ids: list[str] = [make_business(i)["id"] for i in range(restaurants)]
+        self.users: list[tuple[str, str]] = []  # (email, password)
+        self.tokens: list[str] = []
+        # request index -> review created by that request, so the delete is
+        # made by the same user
+        self.review_ids: dict[int, str] = {}
+        self.signups = itertools.count()
+        started = datetime(2025, 1, 1)
+
+        for i, restaurant_id in enumerate(self.restaurant_ids):
+            business = make_business(i)
+            db.collection("restaurants").document(restaurant_id).set(
+                {
+                    "name": business["name"],
+                    "address": ", ".join(business["location"]["display_address"]),
+                    "cuisine_type": business["categories"][0]["title"],
+                    "created_at": started.isoformat(),
+                    "updated_at": started.isoformat(),
+                }
+            )
+        for u in range(users):
+            email, password = f"load-{u}@example.com", "password123"
+            uid = auth.create_user(email=email, password=password).uid
+            favorites = self.restaurant_ids[u % restaurants :][:5]
+            db.collection("users").document(uid).set(
+                {
+                    "email": email,
+                    "name": f"Load User {u}",
+                    "favorites": favorites,
+                    "created_at": started.isoformat(),
+                    "joined_date": started.isoformat(),
+                    "review_count": 0,
+                }
+            )
+            self.users.append((email, password))
+            self.tokens.append(auth.issue_token(uid))
+            # A few reviews per user so the review listings have pages to read
+            for r in range(10):
+                created = started + timedelta(minutes=u * 10 + r)
+                db.collection("reviews").document().set(
+                    {
+                        "restaurant_id": self.restaurant_ids[(u + r) % restaurants],
+                        "user_id": uid,
+                        "rating": float(1 + (u + r) % 5),
+                        "text": "Solid slice, would come back.",
+                        "created_at": created.isoformat(),
+                    }
+                )
+            db.collection("users").document(uid).update({"review_count": 10})
+
+    def token(self, i: int) -> str:
+        return self.tokens[i % len(self.tokens)]
+
+    def restaurant(self, i: int) -> str:
+        return self.restaurant_ids[i % len(self.restaurant_ids)]
+
+
+def _near(i: int) -> str:
+    # A handful of distinct points so the caches see both hits and misses
+    lat, lon = CENTER[0] + (i % 7) * 0.003, CENTER[1] - (i % 5) * 0.003
+    return f"latitude={lat:.4f}&longitude={lon:.4f}"
+
+
+TERMS = ["pizza", "sushi", "thai", "ramen", "coffee", "mexican"]
+
+# name -> builds the i-th request. Writes are listed next to the endpoint that
+# undoes them (add/remove favorite, create/delete review) so the data set stays
+# the same size for the whole run.
+SCENARIOS: dict[str, Callable[[Fixture, int], Call]] = {
+    "GET /": lambda f, i: ("GET", "/", None, None),
+    "POST /signup": lambda f, i: (
+        "POST",
+        "/signup",
+        {"email": f"signup-{next(f.signups)}@example.com", "password": "password123"},
+        None,
+    ),
+    "POST /login": lambda f, i: (
+        "POST",
+        "/login",
+        {"email": f.users[i % len(f.users)][0], "password": f.users[i % len(f.users)][1]},
+        None,
+    ),
+    "GET /users/me": lambda f, i: ("GET", "/users/me", None, f.token(i)),
+    "PUT /users/me": lambda f, i: (
+        "PUT",
+        "/users/me",
+        {"tagline": f"tagline {i}"},
+        f.token(i),
+    ),
+    "GET /users/me/bundle": lambda f, i: (
+        "GET",
+        "/users/me/bundle?include=profile,review_count,favorite_ids,favorites",
+        None,
+        f.token(i),
+    ),
+    "GET /users/me/favorites/ids": lambda f, i: (
+        "GET",
+        "/users/me/favorites/ids",
+        None,
+        f.token(i),
+    ),
+    "GET /users/me/favorites": lambda f, i: ("GET", "/users/me/favorites", None, f.token(i)),
+    "POST /favorites/{id}": lambda f, i: (
+        "POST",
+        f"/favorites/{f.restaurant(i + 7)}",
+        None,
+        f.token(i),
+    ),
+    "DELETE /favorites/{id}": lambda f, i: (
+        "DELETE",
+        f"/favorites/{f.restaurant(i + 7)}",
+        None,
+        f.token(i),
+    ),
+    "GET /users/me/reviews/count": lambda f, i: (
+        "GET",
+        "/users/me/reviews/count",
+        None,
+        f.token(i),
+    ),
+    "GET /users/me/reviews": lambda f, i: ("GET", "/users/me/reviews", None, f.token(i)),
+    "GET /search/restaurants": lambda f, i: (
+        "GET",
+        f"/search/restaurants?term={TERMS[i % len(TERMS)]}&{_near(i)}",
+        None,
+        None,
+    ),
+    "GET /recommendations/nearby": lambda f, i: (
+        "GET",
+        f"/recommendations/nearby?{_near(i)}",
+        None,
+        None,
+    ),
+    "GET /recommendations/localpicks": lambda f, i: (
+        "GET",
+        f"/recommendations/localpicks?{_near(i)}",
+        None,
+        None,
+    ),
+    "GET /restaurants/similar/{id}": lambda f, i: (
+        "GET",
+        f"/restaurants/similar/{f.restaurant(i)}",
+        None,
+        None,
+    ),
+    "GET /autocomplete/restaurants": lambda f, i: (
+        "GET",
+        f"/autocomplete/restaurants?text={TERMS[i % len(TERMS)][: 2 + i % 3]}&{_near(i)}",
+        None,
+        None,
+    ),
+    "GET /yelp/restaurants/{id}": lambda f, i: (
+        "GET",
+        f"/yelp/restaurants/{f.restaurant(i)}",
+        None,
+        None,
+    ),
+    "GET /restaurants/{id}/view": lambda f, i: (
+        "GET",
+        f"/restaurants/{f.restaurant(i)}/view",
+        None,
+        f.token(i),
+    ),
+    "POST /restaurants/{id}/reviews": lambda f, i: (
+        "POST",
+        f"/restaurants/{f.restaurant(i)}/reviews",
+        {"restaurant_id": f.restaurant(i), "rating": 4, "text": "Load test review"},
+        f.token(i),
+    ),
+    "DELETE /reviews/{id}": lambda f, i: (
+        "DELETE",
+        f"/reviews/{f.review_ids[i]}",
+        None,
+        f.token(i),
+    ),
+    "GET /restaurants/ratings": lambda f, i: (
+        "GET",
+        "/restaurants/ratings?ids=" + ",".join(f.restaurant(i + n) for n in range(10)),
+        None,
+        None,
+    ),
+    "GET /restaurants/{id}/reviews": lambda f, i: (
+        "GET",
+        f"/restaurants/{f.restaurant(i)}/reviews",
+        None,
+        f.token(i),
+    ),
+    "POST /restaurants": lambda f, i: (
+        "POST",
+        "/restaurants",
+        {"name": f"Load Test Diner {i}", "address": f"{i} Broadway, New York, NY"},
+        None,
+    ),
+    "GET /restaurants": lambda f, i: ("GET", "/restaurants?location=NYC", None, None),
+}
+
+
+class Result:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.latencies: list[float] = []
+        self.errors = 0
+        self.elapsed = 0.0
+
+    def percentile(self, p: int) -> float:
+        if len(self.latencies) < 2:
+            return self.latencies[0] if self.latencies else 0.0
+        return statistics.quantiles(self.latencies, n=100, method="inclusive")[p - 1]
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    fixture: Fixture,
+    name: str,
+    build: Callable[[Fixture, int], Call],
+    requests: int,
+    concurrency: int,
+) -> Result:
+    result = Result(name)
+    calls = [build(fixture, i) for i in range(requests)]
+    pending = iter(enumerate(calls))
+
+    async def worker() -> None:
+        for i, (method, url, body, token) in pending:
+            headers = {"Authorization": f"Bearer {token}"} if token else None
+            started = time.perf_counter()
+            response = await client.request(method, url, json=body, headers=headers)
+            result.latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                result.errors += 1
+            elif name == "POST /restaurants/{id}/reviews":
+                fixture.review_ids[i] = response.json()["id"]
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+async def main(args: argparse.Namespace) -> None:
+    settings = FakeYelpSettings(args.yelp_latency, args.yelp_jitter, args.yelp_error_rate)
+    with serve(businesses=args.restaurants, settings=settings) as yelp_url:
+        db, auth = services.use_fakes(yelp_base_url=yelp_url)
+        fixture = Fixture(db, auth, args.users, min(args.restaurants, 200))
+
+        from main import app
+
+        selected = [s for s in SCENARIOS if not args.only or any(o in s for o in args.only)]
+        transport = httpx.ASGITransport(app=app)
+        async with app.router.lifespan_context(app):
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://load", timeout=60
+            ) as client:
+                print(
+                    f"{args.requests} requests x {len(selected)} endpoints, concurrency "
+                    f"{args.concurrency}, fake Yelp latency {args.yelp_latency * 1000:.0f} ms "
+                    f"(+{args.yelp_jitter * 1000:.0f} jitter), error rate {args.yelp_error_rate}"
+                )
+                print(
+                    f"{'endpoint':34} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+                    f"{'p99 ms':>8} {'errors':>7}"
+                )
+                for name in selected:
+                    created = fixture.review_ids
+                    if name.startswith("DELETE /reviews") and len(created) < args.requests:
+                        print(f"{name:34} skipped: run it with POST /restaurants/{{id}}/reviews")
+                        continue
+                    result = await run_scenario(
+                        client, fixture, name, SCENARIOS[name], args.requests, args.concurrency
+                    )
+                    print(
+                        f"{name:34} {args.requests / result.elapsed:8.1f} "
+                        f"{result.percentile(50) * 1000:8.2f} "
+                        f"{result.percentile(95) * 1000:8.2f} "
+                        f"{result.percentile(99) * 1000:8.2f} {result.errors:7d}"
+                    )
+        print(f"fake Yelp served {settings.requests} requests ({settings.errors} injected errors)")
+        print(f"fake Firestore: {db.stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=200, help="requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--restaurants", type=int, default=500)
+    parser.add_argument("--yelp-latency", type=float, default=0.05, help="seconds")
+    parser.add_argument("--yelp-jitter", type=float, default=0.02, help="seconds")
+    parser.add_argument("--yelp-error-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--only", nargs="*", help="run endpoints whose name contains any of these strings"
+    )
+    asyncio.run(main(parser.parse_args()))
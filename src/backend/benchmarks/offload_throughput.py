@@ -0,0 +1,85 @@
+"""
+Load test: concurrent throughput with blocking Firestore calls made directly
+from async handlers ("before") vs dispatched through datastore.run_sync ("after").
+
+Firestore is simulated by a blocking sleep and Yelp by an async sleep, so the
+numbers show event-loop blocking, not real backend latency.
+
+    cd src/backend
+    python -m benchmarks.offload_throughput --requests 400 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Any
+
+import httpx
+from fastapi import FastAPI
+
+import datastore
+
+
+def fake_firestore_get(latency: float) -> dict[str, Any]:
+    time.sleep(latency)  # the sync Firestore client blocks its calling thread
+    return {"favorites": []}
+
+
+def build_app(offload: bool, firestore_latency: float, yelp_latency: float) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/users/me")
+    async def profile() -> dict[str, Any]:
+        if offload:
+            return await datastore.run_sync(fake_firestore_get, firestore_latency)
+        return fake_firestore_get(firestore_latency)
+
+    @app.get("/search/restaurants")
+    async def search() -> dict[str, Any]:
+        await asyncio.sleep(yelp_latency)  # Yelp goes through the async httpx client
+        return {"businesses": []}
+
+    return app
+
+
+async def run(app: FastAPI, requests: int, concurrency: int) -> tuple[float, float]:
+    """Fire a 50/50 mix of Firestore- and Yelp-backed requests; return (req/s, yelp p95 ms)."""
+    transport = httpx.ASGITransport(app=app)
+    semaphore = asyncio.Semaphore(concurrency)
+    yelp_latencies: list[float] = []
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def one(i: int) -> None:
+            path = "/users/me" if i % 2 else "/search/restaurants"
+            async with semaphore:
+                started = time.perf_counter()
+                await client.get(path)
+                if path == "/search/restaurants":
+                    yelp_latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(requests)))
+        elapsed = time.perf_counter() - started
+
+    yelp_latencies.sort()
+    p95 = yelp_latencies[int(len(yelp_latencies) * 0.95) - 1] * 1000
+    return requests / elapsed, p95
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--firestore-latency", type=float, default=0.02)
+    parser.add_argument("--yelp-latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    for label, offload in (("before (blocking)", False), ("after (run_sync)", True)):
+        app = build_app(offload, args.firestore_latency, args.yelp_latency)
+        rps, p95 = asyncio.run(run(app, args.requests, args.concurrency))
+        print(f"{label:<20} {rps:8.1f} req/s   yelp-backed p95 {p95:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
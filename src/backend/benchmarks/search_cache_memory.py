@@ -0,0 +1,88 @@
+"""
+Memory benchmark: 10k cached Yelp businesses held as YelpSearchResponse
+models vs as CompactSearchResults pages, plus the cost of expanding a compact
+page back to the public model when it is served.
+
+Each page is decoded from its own JSON document, as it would be from Yelp,
+so strings are not shared between pages unless the compact form interns them.
+
+    cd src/backend
+    python -m benchmarks.search_cache_memory --businesses 10000 --page-size 50
+"""
+
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+from collections.abc import Callable
+from typing import Any
+
+from benchmarks.json_responses import yelp_business
+from compact import CompactSearchResults
+from yelp_api_client import YelpBusiness, YelpSearchResponse
+
+CUISINES = [("pizza", "Pizza"), ("sushi", "Sushi Bars"), ("mexican", "Mexican"), ("thai", "Thai")]
+
+
+def page_documents(businesses: int, page_size: int) -> list[bytes]:
+    pages = []
+    for start in range(0, businesses, page_size):
+        items = []
+        for i in range(start, min(start + page_size, businesses)):
+            item = yelp_business(i)
+            alias, title = CUISINES[i % len(CUISINES)]
+            item["categories"] = [{"alias": alias, "title": title}]
+            items.append(item)
+        pages.append(json.dumps({"businesses": items, "total": 240, "region": {}}).encode())
+    return pages
+
+
+def measure(build: Callable[[], list[Any]]) -> tuple[list[Any], int]:
+    """Build the cache contents and return them with the bytes they retain."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    contents = build()
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return contents, retained
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--businesses", type=int, default=10000)
+    parser.add_argument("--page-size", type=int, default=50)
+    args = parser.parse_args()
+
+    documents = page_documents(args.businesses, args.page_size)
+    models, model_bytes = measure(
+        lambda: [YelpSearchResponse(**json.loads(doc)) for doc in documents]
+    )
+    pages, compact_bytes = measure(
+        lambda: [
+            CompactSearchResults.from_response(YelpSearchResponse(**json.loads(doc)))
+            for doc in documents
+        ]
+    )
+
+    # Expanded pages must be the same documents the models serialize to
+    for model, page in zip(models, pages, strict=True):
+        expanded = page.to_response(YelpSearchResponse, YelpBusiness)
+        assert expanded.model_dump() == model.model_dump()
+
+    started = time.perf_counter()
+    for page in pages:
+        page.to_response(YelpSearchResponse, YelpBusiness)
+    expand_ms = (time.perf_counter() - started) * 1000 / len(pages)
+
+    print(f"{args.businesses} businesses in {len(pages)} pages of {args.page_size}")
+    print(f"  pydantic models    {model_bytes / 1024 / 1024:8.2f} MiB")
+    print(f"  compact pages      {compact_bytes / 1024 / 1024:8.2f} MiB")
+    print(f"  ratio              {model_bytes / compact_bytes:8.2f}x smaller")
+    print(f"  expand one page    {expand_ms:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Cold-start benchmark: time from the first import of main to the first
+response, in a fresh interpreter per run, split into module import, lifespan
+startup and the first request.
+
+Firebase Admin is initialized for real, from a throwaway service account
+(a generated key, so nothing leaves the machine) unless --credentials points
+at a real one. The request goes through httpx's ASGI transport, so nothing
+listens on a socket and no Yelp call is made for the default path.
+
+    cd src/backend
+    python -m benchmarks.startup --runs 5 --path /
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Runs in the child interpreter; timings start before anything else is imported
+CHILD = """
+import time
+started = time.perf_counter()
+import asyncio
+import json
+import os
+
+import httpx
+
+import main
+
+imported = time.perf_counter()
+
+
+async def first_response():
+    async with main.app.router.lifespan_context(main.app):
+        ready = time.perf_counter()
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://startup") as client:
+            response = await client.get({path!r})
+        done = time.perf_counter()
+    return ready, done, response.status_code
+
+
+ready, done, status = asyncio.run(first_response())
+print(json.dumps({{
+    "import_ms": (imported - started) * 1000,
+    "lifespan_ms": (ready - imported) * 1000,
+    "first_request_ms": (done - ready) * 1000,
+    "import_to_first_response_ms": (done - started) * 1000,
+    "status": status,
+}}), flush=True)
+# Offline, background Firestore reads retry until their deadline; don't wait for them
+os._exit(0)
+"""
+
+
+def throwaway_credentials(directory: str) -> str:
+    """A syntactically valid service account key for a project that does not exist."""
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+    account = {
+        "type": "service_account",
+        "project_id": "crowdfork-startup-bench",
+        "private_key_id": "0" * 40,
+        "private_key": pem,
+        "client_email": "bench@crowdfork-startup-bench.iam.gserviceaccount.com",
+        "client_id": "0",
+        "token_uri": "https://oauth2.googleapis.com/token",
+    }
+    path = os.path.join(directory, "serviceAccountKey.json")
+    with open(path, "w") as f:
+        json.dump(account, f)
+    return path
+
+
+def run_once(path: str, env: dict[str, str]) -> dict[str, float]:
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD.format(path=path)],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    timings: dict[str, float] = json.loads(result.stdout.strip().splitlines()[-1])
+    # Includes interpreter start-up
+    timings["process_ms"] = (time.perf_counter() - started) * 1000
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--path", default="/", help="endpoint requested first")
+    parser.add_argument("--credentials", help="service account JSON (default: throwaway key)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="crowdfork-startup-") as tmp:
+        env = {
+            **os.environ,
+            "FIREBASE_CREDENTIALS": args.credentials or throwaway_credentials(tmp),
+            "YELP_API_KEY": os.getenv("YELP_API_KEY", "fake"),
+            "DETAIL_STORE_PATH": os.path.join(tmp, "details.db"),
+            "PYTHONDONTWRITEBYTECODE": "1",
+        }
+        # The first run also warms the OS page cache; it is not reported
+        run_once(args.path, env)
+        runs: list[dict[str, float]] = [run_once(args.path, env) for _ in range(args.runs)]
+
+    print(f"GET {args.path} -> {runs[-1]['status']:.0f}, median of {args.runs} fresh interpreters")
+    for key in (
+        "import_ms",
+        "lifespan_ms",
+        "first_request_ms",
+        "import_to_first_response_ms",
+        "process_ms",
+    ):
+        values = [run[key] for run in runs]
+        print(f"  {key:30} {statistics.median(values):8.1f}  (min {min(values):.1f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+import math
+import sys
+from array import array
+from collections.abc import Iterable, Sequence
+from typing import Any
+
+# Yelp location fields, stored positionally instead of as a dict per business
+_LOCATION_KEYS = (
+    "address1",
+    "address2",
+    "address3",
+    "city",
+    "zip_code",
+    "country",
+    "state",
+    "display_address",
+    "cross_streets",
+)
+_MISSING = object()
+
+# Category lists repeat across thousands of businesses ("pizza"/"Pizza"); identical
+# ones share a single tuple. The common lists show up early, so once the pool is
+# full later ones are simply not shared rather than growing it without bound.
+CATEGORY_POOL_MAX = 4096
+_category_pool: dict[tuple[tuple[tuple[str, str], ...], ...], Any] = {}
+
+
+def _intern(value: Any) -> Any:
+    if isinstance(value, str) and len(value) <= 64:
+        return sys.intern(value)
+    if isinstance(value, list):
+        return tuple(_intern(v) for v in value)
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    return list(value) if isinstance(value, tuple) else value
+
+
+def _pack_categories(categories: Iterable[dict[str, str]]) -> tuple[Any, ...]:
+    key = tuple(
+        tuple((sys.intern(k), _intern(v)) for k, v in sorted(c.items())) for c in categories
+    )
+    pooled = _category_pool.get(key)
+    if pooled is not None:
+        return pooled  # type: ignore[no-any-return]
+    if len(_category_pool) < CATEGORY_POOL_MAX:
+        _category_pool[key] = key
+    return key
+
+
+def _sizeof(value: Any) -> int:
+    """Bytes held by `value` and the containers and strings inside it."""
+    if value is _MISSING:
+        return 0
+    size = sys.getsizeof(value)
+    if isinstance(value, (tuple, list)):
+        size += sum(_sizeof(v) for v in value)
+    elif isinstance(value, dict):
+        size += sum(_sizeof(k) + _sizeof(v) for k, v in value.items())
+    return size
+
+
+def _pack_location(location: dict[str, Any]) -> tuple[tuple[Any, ...], dict[str, Any] | None]:
+    values = tuple(_intern(location.get(k, _MISSING)) for k in _LOCATION_KEYS)
+    extra = {k: v for k, v in location.items() if k not in _LOCATION_KEYS}
+    return values, extra or None
+
+
+class CompactBusiness:
+    """
+    Slotted, immutable-by-convention form of a YelpBusiness: location as a
+    positional tuple, shared category tuples, interned short strings and plain
+    float coordinates (NaN when missing). The per-query `distance` is not part
+    of the record; it lives with the result page.
+    """
+
+    __slots__ = (
+        "id",
+        "name",
+        "image_url",
+        "is_closed",
+        "review_count",
+        "rating",
+        "phone",
+        "display_phone",
+        "url",
+        "latitude",
+        "longitude",
+        "categories",
+        "location",
+        "location_extra",
+    )
+
+    def __init__(self, business: Any) -> None:
+        self.id: str = business.id
+        self.name: str = business.name
+        self.image_url: str = business.image_url
+        self.is_closed: bool = business.is_closed
+        self.review_count: int = business.review_count
+        self.rating: float = business.rating
+        self.phone: str = business.phone
+        self.display_phone: str = business.display_phone
+        self.url: str | None = business.url
+        self.latitude = float(business.coordinates.get("latitude", math.nan))
+        self.longitude = float(business.coordinates.get("longitude", math.nan))
+        self.categories = _pack_categories(business.categories)
+        self.location, self.location_extra = _pack_location(business.location)
+
+    @property
+    def has_coordinates(self) -> bool:
+        return not (math.isnan(self.latitude) or math.isnan(self.longitude))
+
+    def location_dict(self) -> dict[str, Any]:
+        location = {
+            k: _thaw(v)
+            for k, v in zip(_LOCATION_KEYS, self.location, strict=True)
+            if v is not _MISSING
+        }
+        if self.location_extra:
+            location.update(self.location_extra)
+        return location
+
+    def fields(self, distance: float | None = None) -> dict[str, Any]:
+        """Keyword arguments for the public YelpBusiness model."""
+        coordinates: dict[str, float] = {}
+        if not math.isnan(self.latitude):
+            coordinates["latitude"] = self.latitude
+        if not math.isnan(self.longitude):
+            coordinates["longitude"] = self.longitude
+        return {
+            "id": self.id,
+            "name": self.name,
+            "image_url": self.image_url,
+            "is_closed": self.is_closed,
+            "review_count": self.review_count,
+            "rating": self.rating,
+            "phone": self.phone,
+            "display_phone": self.display_phone,
+            "distance": distance,
+            "coordinates": coordinates,
+            "location": self.location_dict(),
+            "url": self.url,
+            "categories": [{k: _thaw(v) for k, v in c} for c in self.categories],
+        }
+
+    def size(self) -> int:
+        """Approximate bytes held by this record; pooled categories are not counted."""
+        fields = (getattr(self, name) for name in self.__slots__ if name != "categories")
+        return sys.getsizeof(self) + sum(_sizeof(value) for value in fields)
+
+    def to_model(self, model: Any, distance: float | None = None) -> Any:
+        # The record was built from a validated model, so skip re-validation
+        return model.model_construct(**self.fields(distance))
+
+
+class CompactSearchResults:
+    """
+    A cached Yelp search page: compact business records plus their distances
+    packed into one float array. Expanded to the public response model only
+    when it is served.
+    """
+
+    __slots__ = ("businesses", "distances", "total", "region")
+
+    def __init__(
+        self,
+        businesses: Sequence[CompactBusiness],
+        distances: Sequence[float | None],
+        total: int,
+        region: dict[str, Any],
+    ) -> None:
+        self.businesses = tuple(businesses)
+        self.distances = array("d", (math.nan if d is None else d for d in distances))
+        self.total = total
+        self.region = region
+
+    @classmethod
+    def from_response(
+        cls, response: Any, records: list[CompactBusiness] | None = None
+    ) -> "CompactSearchResults":
+        """Compact a YelpSearchResponse; `records` reuses already compacted businesses."""
+        if records is None:
+            records = [CompactBusiness(b) for b in response.businesses]
+        distances = [b.distance for b in response.businesses]
+        return cls(records, distances, response.total, response.region)
+
+    def size(self) -> int:
+        """Approximate bytes held by this page, for cache byte budgets."""
+        return (
+            sys.getsizeof(self)
+            + sys.getsizeof(self.businesses)
+            + sys.getsizeof(self.distances)
+            + _sizeof(self.region)
+            + sum(record.size() for record in self.businesses)
+        )
+
+    def to_response(self, response_model: Any, business_model: Any) -> Any:
+        businesses = [
+            record.to_model(business_model, None if math.isnan(d) else d)
+            for record, d in zip(self.businesses, self.distances, strict=True)
+        ]
+        return response_model.model_construct(
+            businesses=businesses, total=self.total, region=self.region
+        )
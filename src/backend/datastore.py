@@ -0,0 +1,42 @@
+import asyncio
+import functools
+import os
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, TypeVar
+
+from tracing import span
+
+T = TypeVar("T")
+
+# Firestore and Firebase Admin clients are synchronous. Their calls run on this
+# bounded pool so a slow round-trip never blocks the event loop.
+FIRESTORE_MAX_WORKERS = int(os.getenv("FIRESTORE_MAX_WORKERS", "32"))
+
+_executor = ThreadPoolExecutor(max_workers=FIRESTORE_MAX_WORKERS, thread_name_prefix="firestore")
+
+
+async def run_sync(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking Firestore / Firebase Admin call on the data-access thread pool."""
+    loop = asyncio.get_running_loop()
+    with span("firestore"):
+        return await loop.run_in_executor(_executor, functools.partial(fn, *args, **kwargs))
+
+
+async def get_doc(ref: Any) -> Any:
+    """DocumentReference.get() off the event loop."""
+    return await run_sync(ref.get)
+
+
+async def stream(query: Any) -> list[Any]:
+    """Run a query and return all of its document snapshots."""
+    return await run_sync(lambda: list(query.stream()))
+
+
+async def get_all(db: Any, refs: list[Any]) -> list[Any]:
+    """Batch-get several documents in one round-trip."""
+    return await run_sync(lambda: list(db.get_all(refs)))
+
+
+def shutdown() -> None:
+    _executor.shutdown(wait=False)
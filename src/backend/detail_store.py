@@ -0,0 +1,147 @@
+import asyncio
+import functools
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+# SQLite file shared by every uvicorn worker on the host. WAL mode lets readers
+# in all workers proceed while one worker writes.
+DETAIL_STORE_PATH = os.getenv("DETAIL_STORE_PATH", "yelp_details.sqlite3")
+# How long a worker may hold the refresh lease for one business
+DETAIL_STORE_REFRESH_LEASE = float(os.getenv("DETAIL_STORE_REFRESH_LEASE", "60"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS business_details (
+    id TEXT PRIMARY KEY,
+    payload BLOB NOT NULL,
+    etag TEXT,
+    fetched_at REAL NOT NULL,
+    refresh_lease_until REAL NOT NULL DEFAULT 0
+)
+"""
+
+
+class StoredDetail:
+    __slots__ = ("payload", "etag", "fetched_at")
+
+    def __init__(self, payload: bytes, etag: str | None, fetched_at: float) -> None:
+        self.payload = payload  # uncompressed JSON
+        self.etag = etag
+        self.fetched_at = fetched_at
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+
+class DetailStore:
+    """
+    Persistent key-value store for Yelp business detail payloads, kept as
+    zlib-compressed JSON with the upstream ETag and the wall-clock time they
+    were fetched. Calls run on a small dedicated thread pool, each thread
+    with its own connection.
+    """
+
+    def __init__(self, path: str = DETAIL_STORE_PATH, max_workers: int = 2) -> None:
+        self.path = path
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="detail-store"
+        )
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        conn: sqlite3.Connection | None = getattr(self._local, "conn", None)
+        if conn is None:
+            # Used only by this thread; check_same_thread=False lets close() run at shutdown
+            conn = sqlite3.connect(
+                self.path, timeout=5, isolation_level=None, check_same_thread=False
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(_SCHEMA)
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    async def _run(self, fn: Callable[..., T], *args: Any) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(fn, *args))
+
+    def _get(self, key: str) -> StoredDetail | None:
+        row = (
+            self._connection()
+            .execute("SELECT payload, etag, fetched_at FROM business_details WHERE id = ?", (key,))
+            .fetchone()
+        )
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return StoredDetail(zlib.decompress(row[0]), row[1], row[2])
+
+    def _put(self, key: str, payload: bytes, etag: str | None, fetched_at: float) -> None:
+        self._connection().execute(
+            "INSERT INTO business_details (id, payload, etag, fetched_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET payload = excluded.payload, etag = excluded.etag, "
+            "fetched_at = excluded.fetched_at, refresh_lease_until = 0",
+            (key, zlib.compress(payload), etag, fetched_at),
+        )
+        self.writes += 1
+
+    def _touch(self, key: str, fetched_at: float) -> None:
+        self._connection().execute(
+            "UPDATE business_details SET fetched_at = ?, refresh_lease_until = 0 WHERE id = ?",
+            (fetched_at, key),
+        )
+
+    def _claim_refresh(self, key: str, lease: float) -> bool:
+        now = time.time()
+        cursor = self._connection().execute(
+            "UPDATE business_details SET refresh_lease_until = ? "
+            "WHERE id = ? AND refresh_lease_until < ?",
+            (now + lease, key, now),
+        )
+        return cursor.rowcount == 1
+
+    async def get(self, key: str) -> StoredDetail | None:
+        return await self._run(self._get, key)
+
+    async def put(
+        self, key: str, payload: bytes, etag: str | None, fetched_at: float | None = None
+    ) -> None:
+        await self._run(self._put, key, payload, etag, fetched_at or time.time())
+
+    async def touch(self, key: str) -> None:
+        """Mark an entry as revalidated (upstream answered 304 Not Modified)."""
+        await self._run(self._touch, key, time.time())
+
+    async def claim_refresh(self, key: str, lease: float = DETAIL_STORE_REFRESH_LEASE) -> bool:
+        """
+        Take the refresh lease for a stale entry. Only one worker process wins
+        per lease period, so a stale entry is refetched once, not once per worker.
+        """
+        return await self._run(self._claim_refresh, key, lease)
+
+    def close(self) -> None:
+        # Let queued writes finish before the connections go away
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+
+    def stats(self) -> dict[str, Any]:
+        return {"path": self.path, "hits": self.hits, "misses": self.misses, "writes": self.writes}
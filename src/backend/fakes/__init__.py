@@ -0,0 +1,5 @@
+"""
+In-process stand-ins for the external services the backend talks to
+(Firestore, Firebase Auth, the Yelp Fusion API), for offline load tests and
+local development without production credentials. See services.py.
+"""
@@ -0,0 +1,92 @@
+import secrets
+import threading
+import time
+from typing import Any
+
+# Lifetime of issued ID tokens, matching Firebase's one hour
+TOKEN_LIFETIME = 3600
+
+
+class UserRecord:
+    def __init__(self, uid: str, email: str, password: str) -> None:
+        self.uid = uid
+        self.email = email
+        self.password = password
+
+
+class FakeAuth:
+    """
+    Stand-in for the firebase_admin.auth module plus the identity toolkit's
+    email/password sign-in. Exposes the same exception names as attributes so callers can
+    keep writing `except auth.EmailAlreadyExistsError`. Tokens are opaque
+    random strings; verifying one is a dict lookup.
+    """
+
+    class InvalidIdTokenError(ValueError):
+        pass
+
+    class ExpiredIdTokenError(InvalidIdTokenError):
+        pass
+
+    class EmailAlreadyExistsError(ValueError):
+        pass
+
+    class UserNotFoundError(ValueError):
+        pass
+
+    def __init__(self, token_lifetime: float = TOKEN_LIFETIME) -> None:
+        self.token_lifetime = token_lifetime
+        self._lock = threading.Lock()
+        self._users: dict[str, UserRecord] = {}
+        self._by_email: dict[str, str] = {}
+        self._tokens: dict[str, dict[str, Any]] = {}
+
+    def create_user(
+        self, email: str, password: str, uid: str | None = None, **kwargs: Any
+    ) -> UserRecord:
+        with self._lock:
+            if email in self._by_email:
+                raise self.EmailAlreadyExistsError(f"Email already exists: {email}")
+            user = UserRecord(uid or secrets.token_hex(14), email, password)
+            self._users[user.uid] = user
+            self._by_email[email] = user.uid
+            return user
+
+    def update_user(self, uid: str, email: str | None = None, **kwargs: Any) -> UserRecord:
+        with self._lock:
+            user = self._users.get(uid)
+            if user is None:
+                raise self.UserNotFoundError(f"No user record found for uid: {uid}")
+            if email is not None and email != user.email:
+                if email in self._by_email:
+                    raise self.EmailAlreadyExistsError(f"Email already exists: {email}")
+                del self._by_email[user.email]
+                self._by_email[email] = uid
+                user.email = email
+            return user
+
+    def issue_token(self, uid: str) -> str:
+        """Mint an ID token for an existing user (what a client gets after sign-in)."""
+        with self._lock:
+            user = self._users[uid]
+            token = secrets.token_urlsafe(32)
+            self._tokens[token] = {
+                "uid": uid,
+                "email": user.email,
+                "exp": time.time() + self.token_lifetime,
+            }
+            return token
+
+    def verify_id_token(self, id_token: str, **kwargs: Any) -> dict[str, Any]:
+        claims = self._tokens.get(id_token)
+        if claims is None:
+            raise self.InvalidIdTokenError("Invalid ID token")
+        if claims["exp"] <= time.time():
+            raise self.ExpiredIdTokenError("ID token has expired")
+        return dict(claims)
+
+    def sign_in_with_email_and_password(self, email: str, password: str) -> dict[str, Any]:
+        uid = self._by_email.get(email)
+        if uid is None or self._users[uid].password != password:
+            raise self.InvalidIdTokenError("INVALID_LOGIN_CREDENTIALS")
+        return {"localId": uid, "email": email, "idToken": self.issue_token(uid)}
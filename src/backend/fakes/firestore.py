@@ -0,0 +1,378 @@
+import copy
+import threading
+import uuid
+from collections.abc import Iterator
+from datetime import datetime, timezone
+from typing import Any
+
+from google.api_core.exceptions import NotFound
+from google.cloud.firestore_v1 import transforms
+
+ASCENDING = "ASCENDING"
+DESCENDING = "DESCENDING"
+
+_OPERATORS = {
+    "==": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    "<": lambda a, b: a is not None and a < b,
+    "<=": lambda a, b: a is not None and a <= b,
+    ">": lambda a, b: a is not None and a > b,
+    ">=": lambda a, b: a is not None and a >= b,
+    "in": lambda a, b: a in b,
+    "not-in": lambda a, b: a not in b,
+    "array_contains": lambda a, b: isinstance(a, list) and b in a,
+    "array_contains_any": lambda a, b: isinstance(a, list) and any(v in a for v in b),
+}
+
+
+def _auto_id() -> str:
+    return uuid.uuid4().hex[:20]
+
+
+def _resolve(value: Any, current: Any) -> Any:
+    """Apply a write value (possibly a transform sentinel) to the current field value."""
+    if isinstance(value, transforms.Increment):
+        return (current if isinstance(current, (int, float)) else 0) + value.value
+    if isinstance(value, transforms.ArrayUnion):
+        items = list(current) if isinstance(current, list) else []
+        return items + [v for v in value.values if v not in items]
+    if isinstance(value, transforms.ArrayRemove):
+        items = list(current) if isinstance(current, list) else []
+        return [v for v in items if v not in value.values]
+    if value is transforms.SERVER_TIMESTAMP:
+        return datetime.now(timezone.utc)
+    if isinstance(value, dict):
+        # Nested maps merge into the existing map (set(..., merge=True) semantics)
+        base = copy.deepcopy(current) if isinstance(current, dict) else {}
+        return _merge(base, value)
+    return copy.deepcopy(value)
+
+
+def _merge(target: dict[str, Any], data: dict[str, Any]) -> dict[str, Any]:
+    for key, value in data.items():
+        if value is transforms.DELETE_FIELD:
+            target.pop(key, None)
+        else:
+            target[key] = _resolve(value, target.get(key))
+    return target
+
+
+def _set_path(target: dict[str, Any], path: str, value: Any) -> None:
+    # update() takes dotted field paths: {"histogram.4": Increment(1)}
+    *parents, leaf = path.split(".")
+    for part in parents:
+        child = target.get(part)
+        if not isinstance(child, dict):
+            child = target[part] = {}
+        target = child
+    if value is transforms.DELETE_FIELD:
+        target.pop(leaf, None)
+    else:
+        target[leaf] = _resolve(value, target.get(leaf))
+
+
+def _field(data: dict[str, Any], path: str) -> Any:
+    value: Any = data
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+class DocumentSnapshot:
+    def __init__(self, reference: "DocumentReference", data: dict[str, Any] | None) -> None:
+        self.reference = reference
+        self.id = reference.id
+        self._data = data
+
+    @property
+    def exists(self) -> bool:
+        return self._data is not None
+
+    def to_dict(self) -> dict[str, Any] | None:
+        return copy.deepcopy(self._data)
+
+    def get(self, field_path: str) -> Any:
+        return _field(self._data or {}, field_path)
+
+
+class DocumentReference:
+    def __init__(self, db: "FakeFirestore", collection: str, document_id: str) -> None:
+        self._db = db
+        self.collection_name = collection
+        self.id = document_id
+
+    @property
+    def path(self) -> str:
+        return f"{self.collection_name}/{self.id}"
+
+    def get(self, transaction: Any = None, **kwargs: Any) -> DocumentSnapshot:
+        with self._db._lock:
+            return DocumentSnapshot(self, self._db._read(self))
+
+    def set(self, data: dict[str, Any], merge: bool = False) -> None:
+        self._db._write([("set", self, data, merge)])
+
+    def update(self, data: dict[str, Any]) -> None:
+        self._db._write([("update", self, data, False)])
+
+    def delete(self) -> None:
+        self._db._write([("delete", self, None, False)])
+
+
+class AggregationResult:
+    def __init__(self, alias: str, value: int) -> None:
+        self.alias = alias
+        self.value = value
+
+
+class AggregationQuery:
+    def __init__(self, query: "Query", alias: str) -> None:
+        self._query = query
+        self._alias = alias
+
+    def get(self, **kwargs: Any) -> list[list[AggregationResult]]:
+        return [[AggregationResult(self._alias, len(self._query._matching()))]]
+
+
+class Query:
+    """Immutable query over one collection, like google.cloud.firestore.Query."""
+
+    ASCENDING = ASCENDING
+    DESCENDING = DESCENDING
+
+    def __init__(
+        self,
+        db: "FakeFirestore",
+        collection: str,
+        filters: tuple[tuple[str, str, Any], ...] = (),
+        orders: tuple[tuple[str, str], ...] = (),
+        limit_to: int | None = None,
+        cursor: dict[str, Any] | None = None,
+    ) -> None:
+        self._db = db
+        self._collection = collection
+        self._filters = filters
+        self._orders = orders
+        self._limit = limit_to
+        self._cursor = cursor
+
+    def _copy(self, **changes: Any) -> "Query":
+        state = {
+            "filters": self._filters,
+            "orders": self._orders,
+            "limit_to": self._limit,
+            "cursor": self._cursor,
+            **changes,
+        }
+        return Query(self._db, self._collection, **state)
+
+    def where(self, field_path: str, op_string: str, value: Any) -> "Query":
+        if op_string not in _OPERATORS:
+            raise ValueError(f"Unsupported operator: {op_string}")
+        return self._copy(filters=self._filters + ((field_path, op_string, value),))
+
+    def order_by(self, field_path: str, direction: str = ASCENDING) -> "Query":
+        return self._copy(orders=self._orders + ((field_path, direction),))
+
+    def limit(self, count: int) -> "Query":
+        return self._copy(limit_to=count)
+
+    def start_after(self, document_fields: Any) -> "Query":
+        if isinstance(document_fields, DocumentSnapshot):
+            document_fields = {**(document_fields.to_dict() or {}), "__name__": document_fields.id}
+        return self._copy(cursor=dict(document_fields))
+
+    def count(self, alias: str = "count") -> AggregationQuery:
+        return AggregationQuery(self, alias)
+
+    def _value(self, doc_id: str, data: dict[str, Any], field_path: str) -> Any:
+        return doc_id if field_path == "__name__" else _field(data, field_path)
+
+    def _sort_key(self, doc_id: str, data: dict[str, Any]) -> tuple[Any, ...]:
+        return tuple(self._value(doc_id, data, field) for field, _ in self._orders)
+
+    def _after_cursor(self, key: tuple[Any, ...]) -> bool:
+        assert self._cursor is not None
+        for (field, direction), value in zip(self._orders, key, strict=True):
+            bound = self._cursor.get(field)
+            if value == bound:
+                continue
+            return bool(value > bound) if direction == ASCENDING else bool(value < bound)
+        return False  # equal to the cursor: start_after excludes it
+
+    def _matching(self) -> list[tuple[str, dict[str, Any]]]:
+        with self._db._lock:
+            docs = [
+                (doc_id, copy.deepcopy(data))
+                for doc_id, data in self._db._collection(self._collection).items()
+            ]
+        for field, op, value in self._filters:
+            check = _OPERATORS[op]
+            docs = [(i, d) for i, d in docs if check(self._value(i, d, field), value)]
+        # Firestore only returns documents that have every ordered field
+        fields = [field for field, _ in self._orders]
+        docs = [(i, d) for i, d in docs if all(self._value(i, d, f) is not None for f in fields)]
+        for field, direction in reversed(self._orders):
+            docs.sort(
+                key=lambda item: self._value(item[0], item[1], field),
+                reverse=direction == DESCENDING,
+            )
+        if self._cursor is not None:
+            docs = [(i, d) for i, d in docs if self._after_cursor(self._sort_key(i, d))]
+        if self._limit is not None:
+            docs = docs[: self._limit]
+        return docs
+
+    def stream(self, transaction: Any = None, **kwargs: Any) -> Iterator[DocumentSnapshot]:
+        for doc_id, data in self._matching():
+            ref = DocumentReference(self._db, self._collection, doc_id)
+            yield DocumentSnapshot(ref, data)
+
+    def get(self, transaction: Any = None, **kwargs: Any) -> list[DocumentSnapshot]:
+        return list(self.stream())
+
+
+class CollectionReference(Query):
+    def __init__(self, db: "FakeFirestore", collection: str) -> None:
+        super().__init__(db, collection)
+        self.id = collection
+
+    def document(self, document_id: str | None = None) -> DocumentReference:
+        return DocumentReference(self._db, self._collection, document_id or _auto_id())
+
+    def add(
+        self, document_data: dict[str, Any], document_id: str | None = None
+    ) -> tuple[datetime, DocumentReference]:
+        ref = self.document(document_id)
+        ref.set(document_data)
+        return datetime.now(timezone.utc), ref
+
+
+class WriteBatch:
+    def __init__(self, db: "FakeFirestore") -> None:
+        self._db = db
+        self._writes: list[tuple[str, DocumentReference, Any, bool]] = []
+
+    def set(self, reference: DocumentReference, data: dict[str, Any], merge: bool = False) -> None:
+        self._writes.append(("set", reference, data, merge))
+
+    def update(self, reference: DocumentReference, data: dict[str, Any]) -> None:
+        self._writes.append(("update", reference, data, False))
+
+    def delete(self, reference: DocumentReference) -> None:
+        self._writes.append(("delete", reference, None, False))
+
+    def commit(self) -> list[Any]:
+        self._db._write(self._writes)
+        writes, self._writes = self._writes, []
+        return [None] * len(writes)
+
+
+class Transaction(WriteBatch):
+    """
+    Serializable transaction. Implements the private hooks the real
+    @firestore.transactional decorator calls, so production transaction
+    functions run unchanged: the store lock is held from _begin to commit.
+    """
+
+    def __init__(self, db: "FakeFirestore") -> None:
+        super().__init__(db)
+        self._read_only = False
+        self._max_attempts = 1
+        self._id: bytes | None = None
+
+    def _clean_up(self) -> None:
+        self._writes = []
+        self._id = None
+
+    def _begin(self, retry_id: bytes | None = None) -> None:
+        self._db._lock.acquire()
+        self._id = uuid.uuid4().bytes
+
+    def _commit(self) -> list[Any]:
+        try:
+            return self.commit()
+        finally:
+            self._finish()
+
+    def _rollback(self) -> None:
+        self._writes = []
+        self._finish()
+
+    def _finish(self) -> None:
+        if self._id is not None:
+            self._id = None
+            self._db._lock.release()
+
+    def get(self, ref_or_query: Any, **kwargs: Any) -> Any:
+        if isinstance(ref_or_query, DocumentReference):
+            return iter([ref_or_query.get()])
+        return ref_or_query.stream()
+
+
+class FakeFirestore:
+    """
+    In-memory, thread-safe stand-in for google.cloud.firestore.Client covering
+    what this app uses: documents, where/order_by/limit/start_after queries,
+    COUNT aggregation, get_all, batches, transactions and the Increment /
+    ArrayUnion / ArrayRemove / SERVER_TIMESTAMP / DELETE_FIELD transforms.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._data: dict[str, dict[str, dict[str, Any]]] = {}
+        self.reads = 0
+        self.writes = 0
+
+    def _collection(self, name: str) -> dict[str, dict[str, Any]]:
+        return self._data.setdefault(name, {})
+
+    def _read(self, ref: DocumentReference) -> dict[str, Any] | None:
+        self.reads += 1
+        data = self._collection(ref.collection_name).get(ref.id)
+        return copy.deepcopy(data)
+
+    def _write(self, writes: list[tuple[str, DocumentReference, Any, bool]]) -> None:
+        with self._lock:
+            # Validate first so a failing write leaves the batch unapplied
+            for kind, ref, _, _ in writes:
+                if kind == "update" and ref.id not in self._collection(ref.collection_name):
+                    raise NotFound(f"No document to update: {ref.path}")
+            for kind, ref, data, merge in writes:
+                self.writes += 1
+                docs = self._collection(ref.collection_name)
+                if kind == "delete":
+                    docs.pop(ref.id, None)
+                elif kind == "update":
+                    for path, value in data.items():
+                        _set_path(docs[ref.id], path, value)
+                else:
+                    existing = docs.get(ref.id) if merge else None
+                    docs[ref.id] = _merge(copy.deepcopy(existing) if existing else {}, data)
+
+    def collection(self, name: str) -> CollectionReference:
+        return CollectionReference(self, name)
+
+    def document(self, path: str) -> DocumentReference:
+        collection, document_id = path.split("/", 1)
+        return DocumentReference(self, collection, document_id)
+
+    def get_all(
+        self, references: list[DocumentReference], **kwargs: Any
+    ) -> Iterator[DocumentSnapshot]:
+        with self._lock:
+            snapshots = [DocumentSnapshot(ref, self._read(ref)) for ref in references]
+        return iter(snapshots)
+
+    def batch(self) -> WriteBatch:
+        return WriteBatch(self)
+
+    def transaction(self, **kwargs: Any) -> Transaction:
+        return Transaction(self)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            documents = sum(len(docs) for docs in self._data.values())
+        return {"documents": documents, "reads": self.reads, "writes": self.writes}
@@ -0,0 +1,49 @@
+"""
+Fake Firebase identity toolkit: accounts:signInWithPassword backed by a
+FakeAuth, answering with the same body and error codes as Google's API.
+
+    IDENTITY_TOOLKIT_HOST=http://127.0.0.1:8082 FIREBASE_API_KEY=fake uvicorn main:app
+"""
+
+import asyncio
+import json
+
+from fastapi import FastAPI, Request, Response
+
+from fakes.auth import TOKEN_LIFETIME, FakeAuth
+
+
+def _error(message: str, status_code: int = 400) -> Response:
+    body = {"error": {"code": status_code, "message": message}}
+    return Response(json.dumps(body), status_code=status_code, media_type="application/json")
+
+
+def create_app(auth: FakeAuth, latency: float = 0.0) -> FastAPI:
+    app = FastAPI(title="Fake identity toolkit")
+
+    @app.post("/v1/accounts:signInWithPassword")
+    async def sign_in_with_password(request: Request, key: str = "") -> Response:
+        if latency > 0:
+            await asyncio.sleep(latency)
+        if not key:
+            return _error("API key not valid. Please pass a valid API key.")
+        body = await request.json()
+        email, password = body.get("email"), body.get("password")
+        if not email:
+            return _error("INVALID_EMAIL")
+        if not password:
+            return _error("MISSING_PASSWORD")
+        try:
+            user = auth.sign_in_with_email_and_password(email, password)
+        except auth.InvalidIdTokenError:
+            return _error("INVALID_LOGIN_CREDENTIALS")
+        payload = {
+            "kind": "identitytoolkit#VerifyPasswordResponse",
+            **user,
+            "registered": True,
+            "refreshToken": f"refresh-{user['idToken']}",
+            "expiresIn": str(TOKEN_LIFETIME),
+        }
+        return Response(json.dumps(payload), media_type="application/json")
+
+    return app
@@ -0,0 +1,233 @@
+"""
+Fake Yelp Fusion API: /v3/businesses/search, /v3/businesses/{id} and
+/v3/autocomplete over a deterministic catalog of restaurants around Manhattan,
+with configurable latency, jitter and error rate.
+
+    cd src/backend
+    python -m fakes.yelp --port 8081 --latency 0.08 --error-rate 0.01
+    YELP_API_HOST=http://127.0.0.1:8081 YELP_API_KEY=fake uvicorn main:app
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import socket
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+import uvicorn
+from fastapi import FastAPI, Request, Response
+
+from geo import haversine_m
+
+CENTER = (40.7359, -73.9911)
+CUISINES = [
+    ("pizza", "Pizza"),
+    ("sushi", "Sushi Bars"),
+    ("mexican", "Mexican"),
+    ("thai", "Thai"),
+    ("italian", "Italian"),
+    ("ramen", "Ramen"),
+    ("bakeries", "Bakeries"),
+    ("coffee", "Coffee & Tea"),
+]
+NAMES = ["Joe's", "Golden", "Little", "Corner", "Village", "Empire", "Hudson", "Bowery"]
+STREETS = ["Broadway", "Bleecker St", "Houston St", "2nd Ave", "Spring St", "Grand St"]
+
+
+class FakeYelpSettings:
+    """Mutable at runtime so a load test can change latency or errors mid-run."""
+
+    def __init__(
+        self, latency: float = 0.05, jitter: float = 0.02, error_rate: float = 0.0, seed: int = 0
+    ) -> None:
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.errors = 0
+
+
+def make_business(i: int) -> dict[str, Any]:
+    rng = random.Random(i)
+    alias, title = CUISINES[i % len(CUISINES)]
+    name = f"{NAMES[i % len(NAMES)]} {title} {i}"
+    street = f"{rng.randint(1, 999)} {STREETS[i % len(STREETS)]}"
+    return {
+        "id": f"fake-{i:05d}",
+        "alias": f"{alias}-{i}",
+        "name": name,
+        "image_url": f"https://s3-media.example.com/fake-{i}/o.jpg",
+        "is_closed": False,
+        "url": f"https://www.yelp.com/biz/fake-{i}",
+        "review_count": rng.randint(5, 3000),
+        "categories": [{"alias": alias, "title": title}],
+        "rating": rng.choice([3.0, 3.5, 4.0, 4.5, 5.0]),
+        "coordinates": {
+            "latitude": CENTER[0] + rng.uniform(-0.04, 0.04),
+            "longitude": CENTER[1] + rng.uniform(-0.04, 0.04),
+        },
+        "price": "$" * rng.randint(1, 4),
+        "location": {
+            "address1": street,
+            "address2": "",
+            "address3": None,
+            "city": "New York",
+            "zip_code": "10003",
+            "country": "US",
+            "state": "NY",
+            "display_address": [street, "New York, NY 10003"],
+        },
+        "phone": f"+1212555{i % 10000:04d}",
+        "display_phone": f"(212) 555-{i % 10000:04d}",
+    }
+
+
+def make_detail(business: dict[str, Any]) -> dict[str, Any]:
+    detail = dict(business)
+    detail["photos"] = [business["image_url"].replace("/o.jpg", f"/{n}.jpg") for n in range(3)]
+    detail["hours"] = [
+        {
+            "open": [
+                {"is_overnight": False, "start": "1100", "end": "2300", "day": d} for d in range(7)
+            ],
+            "hours_type": "REGULAR",
+            "is_open_now": True,
+        }
+    ]
+    return detail
+
+
+def create_app(businesses: int = 500, settings: FakeYelpSettings | None = None) -> FastAPI:
+    settings = settings or FakeYelpSettings()
+    catalog = [make_business(i) for i in range(businesses)]
+    by_id = {b["id"]: b for b in catalog}
+    app = FastAPI(title="Fake Yelp Fusion API")
+    app.state.settings = settings
+
+    @app.middleware("http")
+    async def simulate_upstream(request: Request, call_next: Any) -> Response:
+        settings.requests += 1
+        delay = settings.latency + settings.random.uniform(0, settings.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if settings.random.random() < settings.error_rate:
+            settings.errors += 1
+            return Response(
+                json.dumps({"error": {"code": "SERVICE_UNAVAILABLE"}}),
+                status_code=503,
+                media_type="application/json",
+            )
+        response: Response = await call_next(request)
+        return response
+
+    @app.get("/v3/businesses/search")
+    def search(
+        term: str | None = None,
+        location: str | None = None,
+        latitude: float | None = None,
+        longitude: float | None = None,
+        sort_by: str | None = None,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> dict[str, Any]:
+        matches = catalog
+        if term:
+            needle = term.lower()
+            matches = [
+                b
+                for b in catalog
+                if needle in b["name"].lower() or needle in b["categories"][0]["alias"]
+            ] or catalog
+        origin = (latitude, longitude) if latitude is not None and longitude is not None else CENTER
+        results = []
+        for b in matches:
+            coords = b["coordinates"]
+            distance = haversine_m(origin[0], origin[1], coords["latitude"], coords["longitude"])
+            results.append({**b, "distance": distance})
+        if sort_by == "rating":
+            results.sort(key=lambda b: -b["rating"])
+        elif sort_by == "review_count":
+            results.sort(key=lambda b: -b["review_count"])
+        else:
+            results.sort(key=lambda b: b["distance"])
+        return {
+            "businesses": results[offset : offset + min(limit, 50)],
+            "total": len(results),
+            "region": {"center": {"latitude": origin[0], "longitude": origin[1]}},
+        }
+
+    @app.get("/v3/businesses/{business_id}")
+    def details(business_id: str, request: Request) -> Response:
+        business = by_id.get(business_id)
+        if business is None:
+            return Response(
+                json.dumps({"error": {"code": "BUSINESS_NOT_FOUND"}}),
+                status_code=404,
+                media_type="application/json",
+            )
+        body = json.dumps(make_detail(business)).encode()
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        return Response(body, media_type="application/json", headers={"ETag": etag})
+
+    @app.get("/v3/autocomplete")
+    def autocomplete(text: str = "") -> dict[str, Any]:
+        needle = text.lower()
+        categories = [
+            {"alias": alias, "title": title}
+            for alias, title in CUISINES
+            if title.lower().startswith(needle) or alias.startswith(needle)
+        ]
+        businesses: list[dict[str, Any]] = [
+            {"id": b["id"], "name": b["name"]}
+            for b in catalog
+            if any(word.lower().startswith(needle) for word in b["name"].split())
+        ][:3]
+        terms = [{"text": c["title"]} for c in categories][:3]
+        return {"terms": terms, "businesses": businesses, "categories": categories}
+
+    return app
+
+
+@contextmanager
+def serve(
+    businesses: int = 500, settings: FakeYelpSettings | None = None, port: int = 0
+) -> Iterator[str]:
+    """Run the fake API in a background thread; yields its base URL."""
+    app = create_app(businesses, settings)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(("127.0.0.1", port))
+    config = uvicorn.Config(app, log_level="warning", access_log=False)
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, kwargs={"sockets": [sock]}, daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError("Fake Yelp server failed to start")
+        threading.Event().wait(0.01)
+    try:
+        yield f"http://127.0.0.1:{sock.getsockname()[1]}"
+    finally:
+        server.should_exit = True
+        thread.join(timeout=5)
+        sock.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--businesses", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per request")
+    parser.add_argument("--jitter", type=float, default=0.02, help="extra random seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction answered 503")
+    args = parser.parse_args()
+    settings = FakeYelpSettings(args.latency, args.jitter, args.error_rate)
+    uvicorn.run(create_app(args.businesses, settings), host="127.0.0.1", port=args.port)
@@ -0,0 +1,173 @@
+import asyncio
+import os
+import threading
+from typing import Any
+
+import httpx
+
+# Web API key of the Firebase project (falls back to firebaseconfig.py's apiKey)
+FIREBASE_API_KEY = os.getenv("FIREBASE_API_KEY")
+# Point at a local stand-in for tests and offline runs
+IDENTITY_TOOLKIT_HOST = os.getenv("IDENTITY_TOOLKIT_HOST", "https://identitytoolkit.googleapis.com")
+SIGN_IN_PATH = "/v1/accounts:signInWithPassword"
+
+# Connection pool / timeout settings for the sign-in client
+IDENTITY_TOOLKIT_MAX_CONNECTIONS = int(os.getenv("IDENTITY_TOOLKIT_MAX_CONNECTIONS", "20"))
+IDENTITY_TOOLKIT_CONNECT_TIMEOUT = float(os.getenv("IDENTITY_TOOLKIT_CONNECT_TIMEOUT", "3"))
+IDENTITY_TOOLKIT_READ_TIMEOUT = float(os.getenv("IDENTITY_TOOLKIT_READ_TIMEOUT", "5"))
+IDENTITY_TOOLKIT_POOL_TIMEOUT = float(os.getenv("IDENTITY_TOOLKIT_POOL_TIMEOUT", "5"))
+# Sign-ins in flight at once; a login storm queues here instead of piling onto Google
+IDENTITY_TOOLKIT_CONCURRENCY = int(os.getenv("IDENTITY_TOOLKIT_CONCURRENCY", "16"))
+# Longest a sign-in waits for a slot before failing with IdentityToolkitUnavailableError
+IDENTITY_TOOLKIT_QUEUE_TIMEOUT = float(os.getenv("IDENTITY_TOOLKIT_QUEUE_TIMEOUT", "5"))
+
+# Identity toolkit error codes that mean the email/password pair was wrong
+_CREDENTIAL_ERRORS = {
+    "EMAIL_NOT_FOUND",
+    "INVALID_PASSWORD",
+    "INVALID_LOGIN_CREDENTIALS",
+    "INVALID_EMAIL",
+    "MISSING_PASSWORD",
+    "USER_DISABLED",
+}
+
+
+class SignInError(Exception):
+    """The identity toolkit rejected the credentials (wrong email or password)."""
+
+
+class IdentityToolkitUnavailableError(Exception):
+    """Sign-in cannot be attempted right now; callers should answer 503."""
+
+    def __init__(self, message: str, retry_after: float = 1.0) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _api_key() -> str | None:
+    if FIREBASE_API_KEY:
+        return FIREBASE_API_KEY
+    try:
+        import firebaseconfig
+    except ImportError:
+        return None
+    api_key: str | None = firebaseconfig.firebaseConfig.get("apiKey")
+    return api_key
+
+
+class IdentityToolkitClient:
+    """
+    Async email/password sign-in against the Firebase identity toolkit REST
+    API (what Pyrebase's sign_in_with_email_and_password calls), over an
+    application-lifetime connection pool. Returns the same response dict:
+    idToken, refreshToken, expiresIn, localId, email.
+    """
+
+    def __init__(
+        self,
+        base_url: str = IDENTITY_TOOLKIT_HOST,
+        api_key: str | None = None,
+        max_connections: int = IDENTITY_TOOLKIT_MAX_CONNECTIONS,
+        concurrency: int = IDENTITY_TOOLKIT_CONCURRENCY,
+        queue_timeout: float = IDENTITY_TOOLKIT_QUEUE_TIMEOUT,
+        connect_timeout: float = IDENTITY_TOOLKIT_CONNECT_TIMEOUT,
+        read_timeout: float = IDENTITY_TOOLKIT_READ_TIMEOUT,
+        pool_timeout: float = IDENTITY_TOOLKIT_POOL_TIMEOUT,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self.base_url = base_url
+        self.api_key = api_key
+        self.limits = httpx.Limits(
+            max_connections=max_connections, max_keepalive_connections=max_connections
+        )
+        self.timeout = httpx.Timeout(read_timeout, connect=connect_timeout, pool=pool_timeout)
+        self.queue_timeout = queue_timeout
+        self.transport = transport
+        self._slots = asyncio.Semaphore(concurrency)
+        self._client: httpx.AsyncClient | None = None
+        self._client_lock = threading.Lock()
+        self.sign_ins = 0
+        self.rejected = 0
+        self.failures = 0
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        with self._client_lock:
+            if self._client is None or self._client.is_closed:
+                self._client = httpx.AsyncClient(
+                    base_url=self.base_url,
+                    limits=self.limits,
+                    timeout=self.timeout,
+                    transport=self.transport,
+                )
+            return self._client
+
+    async def aclose(self) -> None:
+        """Close the connection pool (called on application shutdown)."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def sign_in_with_email_and_password(self, email: str, password: str) -> dict[str, Any]:
+        """
+        Raises SignInError for bad credentials and IdentityToolkitUnavailableError
+        when the API is saturated, slow or failing.
+        """
+        if self.api_key is None:
+            self.api_key = _api_key()
+            if self.api_key is None:
+                raise IdentityToolkitUnavailableError("FIREBASE_API_KEY is not configured")
+        await self._acquire_slot()
+        try:
+            response = await self.client.post(
+                SIGN_IN_PATH,
+                params={"key": self.api_key},
+                json={"email": email, "password": password, "returnSecureToken": True},
+            )
+        except httpx.HTTPError as e:
+            self.failures += 1
+            raise IdentityToolkitUnavailableError(f"Sign-in request failed: {e!r}") from e
+        finally:
+            self._slots.release()
+
+        if response.status_code == 200:
+            self.sign_ins += 1
+            user: dict[str, Any] = response.json()
+            return user
+        try:
+            code = response.json()["error"]["message"]
+        except (ValueError, KeyError, TypeError):
+            code = f"HTTP {response.status_code}"
+        # Codes can carry a suffix: "TOO_MANY_ATTEMPTS_TRY_LATER : Access to this account..."
+        if response.status_code == 400 and code.split(" ")[0] in _CREDENTIAL_ERRORS:
+            self.rejected += 1
+            raise SignInError(code)
+        self.failures += 1
+        retry_after = response.headers.get("Retry-After", "")
+        raise IdentityToolkitUnavailableError(
+            f"Sign-in failed: {code}", float(retry_after) if retry_after.isdigit() else 1.0
+        )
+
+    async def _acquire_slot(self) -> None:
+        # Not wait_for(): on 3.10 it can time out or be cancelled just after
+        # acquire() got a permit, and that permit is then never released
+        acquire = asyncio.ensure_future(self._slots.acquire())
+        try:
+            await asyncio.wait({acquire}, timeout=self.queue_timeout)
+        except asyncio.CancelledError:
+            if acquire.done():
+                self._slots.release()
+            else:
+                acquire.cancel()
+            raise
+        if not acquire.done():
+            # A cancelled acquire() that was already woken hands the permit on
+            acquire.cancel()
+            self.failures += 1
+            raise IdentityToolkitUnavailableError("Too many sign-ins in flight")
+
+    def stats(self) -> dict[str, Any]:
+        return {"sign_ins": self.sign_ins, "rejected": self.rejected, "failures": self.failures}
+
+
+identity_client = IdentityToolkitClient()
@@ -1,22 +1,44 @@
-from fastapi import FastAPI, HTTPException, status, Depends, Query
+from fastapi import FastAPI, HTTPException, status, Depends, Header, Query, Response
 from pydantic import BaseModel
 from typing import Optional, List, Any
+from collections.abc import AsyncIterator, Awaitable, Callable
 
 from fastapi.requests import Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
+import asyncio
+import logging
+import secrets
+import time
+from contextlib import asynccontextmanager
 from datetime import datetime
-import firebase_admin
-import firebaseconfig as firebaseconfig
-import pyrebase
-from dotenv import load_dotenv
 
-from firebase_admin import auth, credentials, firestore
+# Loads .env, so it comes before the modules that read their settings at import
+import services
+from auth_cache import VerifiedTokenCache, refresh_signing_keys_forever
+import datastore
+from datastore import run_sync
+from identity_toolkit import IdentityToolkitUnavailableError, identity_client
+from pagination import NEXT_CURSOR_HEADER, apply_cursor, next_cursor
+from profiler import PROFILER_ADMIN_TOKEN, PROFILER_INTERVAL, PROFILER_MAX_SECONDS, profiler
+from responses import fast_response
+from tracing import (
+    PROMETHEUS_CONTENT_TYPE,
+    TRACING_ENABLED,
+    TracedRoute,
+    TracingMiddleware,
+    metrics,
+    span,
+)
+from ratings import RATINGS_COLLECTION, add_review, read_aggregate, to_rating_aggregate
+from search_index import LOCAL_INDEX_REFRESH_INTERVAL, LocalRestaurantIndex
+from shared_cache import SharedCache, backend_from_url
 from models import (
     LoginSchema,
     Restaurant,
+    RestaurantRatingAggregate,
     RestaurantResponse,
     RestaurantUpdate,
     Review,
@@ -28,19 +50,82 @@ from models import (
 )
 from yelp_api_client import (
     YelpAutocompleteResponse,
+    YelpUnavailableError,
     YelpSearchResponse,
     autocomplete_yelp,
     search_yelp,
+    search_yelp_tile,
+    search_restaurants,
+    restaurant_index,
     YelpSearchQuery,
     YelpBusinessDetail,
-    get_business_details
+    get_business_details,
+    get_business_details_many,
+    yelp_client,
+    yelp_flight,
+    search_cache,
+    detail_cache,
+    detail_store,
+    autocomplete_cache,
 )
 from typing import List, Optional
 
-# Load environment variables from .env file
-load_dotenv()
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # Open the pooled Yelp client once and reuse it for every request
+    await yelp_client.start()
+    # Build the Firebase clients off the event loop; routes that use them wait
+    # in backend_ready, Yelp-only routes are served straight away
+    services.start_warm_up()
+    # Keep Google's token signing keys warm so no request pays for the fetch
+    key_refresher = None
+    if services.uses_firebase_auth():
+        key_refresher = asyncio.create_task(after_warm_up(refresh_signing_keys_forever))
+    # Load the local `restaurants` collection into its search index without delaying startup
+    index_loader = asyncio.create_task(after_warm_up(refresh_local_restaurants_forever))
+    # Listen for invalidations published by other workers
+    await user_cache.start()
+    yield
+    index_loader.cancel()
+    if key_refresher is not None:
+        key_refresher.cancel()
+    await yelp_client.aclose()
+    await identity_client.aclose()
+    await cache_backend.close()
+    datastore.shutdown()
+    detail_store.close()
+    profiler.stop()
+    services.shutdown()
+
+
+async def after_warm_up(job: Callable[[], Awaitable[None]]) -> None:
+    """Run a background startup job once the Firebase clients are built."""
+    try:
+        await services.ready()
+    except Exception as e:
+        logger.warning("Firebase warm-up failed, continuing lazily: %s", e)
+    await job()
+
+
+async def backend_ready() -> None:
+    """Hold Firebase-backed requests until the clients are built (a no-op after)."""
+    try:
+        await services.ready()
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Backend is not available: {e}",
+            headers={"Retry-After": "1"},
+        ) from e
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
+if TRACING_ENABLED:
+    # Routes note when their endpoint returns, so serialization gets its own phase
+    app.router.route_class = TracedRoute
 
 # Add CORS middleware
 
@@ -56,36 +141,116 @@ app.add_middleware(
     allow_credentials=True,  # Allows cookies and authorization headers
     allow_methods=["*"],  # Allows all HTTP methods (POST, GET, etc.)
     allow_headers=["*"],  # Allows all request headers
+    # Lets the browser read pagination cursors and per-section timings
+    expose_headers=[NEXT_CURSOR_HEADER, "Server-Timing"],
 )
 
+if TRACING_ENABLED:
+    # Per-phase Server-Timing headers and /metrics histograms for every request
+    app.add_middleware(TracingMiddleware)
 
-security = HTTPBearer()
 
-# Initialize Firebase Admin SDK
-if not firebase_admin._apps:
-    cred = credentials.Certificate("serviceAccountKey.json")  # add your service account key
-    firebase_admin.initialize_app(cred)
+def yelp_http_error(e: Exception, detail: str) -> HTTPException:
+    """
+    Map a Yelp failure to an HTTP error. Rate limiting and quota exhaustion are
+    a temporary 503 with Retry-After, not a generic 500.
+    """
+    if isinstance(e, YelpUnavailableError):
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"{detail}: {str(e)}",
+            headers={"Retry-After": str(max(1, round(e.retry_after)))},
+        )
+    return HTTPException(status_code=500, detail=f"{detail}: {str(e)}")
+
 
-# Initialize Pyrebase for authentication
-firebase = pyrebase.initialize_app(firebaseconfig.firebaseConfig)
+security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
-# Initialize Firestore
-db = firestore.client()
+# Firestore client and Firebase auth API (real ones from serviceAccountKey.json
+# unless services.configure() / FAKE_BACKENDS=1 swapped in the local fakes),
+# built on first use so importing this module stays cheap
+db = services.Lazy(services.firestore_client)
+auth = services.Lazy(services.auth_api)
+# firebase_admin.firestore (ArrayUnion, Query, transactional), imported by the warm-up
+firestore = services.Lazy(services.firestore_module)
 
 reviews = []
 
+# Local `restaurants` documents, searchable by cuisine and address (GET /restaurants)
+local_restaurants = LocalRestaurantIndex()
+
+
+async def refresh_local_restaurants_forever(
+    interval: float = LOCAL_INDEX_REFRESH_INTERVAL,
+) -> None:
+    """Background task (started from the lifespan hook) that reloads local_restaurants."""
+    while True:
+        try:
+            docs = await datastore.stream(db.collection("restaurants"))
+            restaurants = []
+            for doc in docs:
+                try:
+                    restaurants.append(RestaurantResponse(id=doc.id, **doc.to_dict()))
+                except ValueError as e:
+                    logger.warning("Skipping malformed restaurant %s: %s", doc.id, e)
+            local_restaurants.replace_all(restaurants)
+        except Exception:
+            logger.exception("Failed to load restaurants into the search index")
+        await asyncio.sleep(interval)
+
+
+# Cache of verified ID tokens, so repeated requests skip signature verification
+token_cache = VerifiedTokenCache()
+
+# Shared cache tier (CACHE_BACKEND_URL, e.g. redis://localhost:6379/0) for data
+# every worker reads. `users` documents are invalidated on every write to them.
+# A per-process backend cannot reach other workers' copies, so without a shared
+# one users are always read from Firestore.
+USER_CACHE_TTL = 60
+cache_backend = backend_from_url()
+user_cache = SharedCache(cache_backend, "users", ttl=USER_CACHE_TTL, enabled=cache_backend.shared)
+
+
+async def get_user_data(user_id: str) -> dict[str, Any] | None:
+    """The user's `users` document, or None if it does not exist."""
+    cached: dict[str, Any] | None = await user_cache.get(user_id)
+    if cached is not None:
+        return cached
+    generation = user_cache.generation(user_id)
+    user_doc = await datastore.get_doc(db.collection("users").document(user_id))
+    if not user_doc.exists:
+        return None
+    user_data: dict[str, Any] = user_doc.to_dict()
+    await user_cache.set(user_id, user_data, generation=generation)
+    return user_data
+
 # --------- Auth Related Functions ---------
 
 
+async def verify_token_cached(token: str) -> dict[str, Any]:
+    """Return the decoded claims for a token, verifying it only on a cache miss."""
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached
+    started = time.perf_counter()
+    with span("auth"):
+        decoded_token: dict[str, Any] = await run_sync(auth.verify_id_token, token)
+    token_cache.record_verify(time.perf_counter() - started)
+    token_cache.put(token, decoded_token)
+    return decoded_token
+
+
 # (Auth) Dependency to get current user from Firebase ID token
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
 ):
     """Verify Firebase ID token and return user info"""
+    await backend_ready()
     token = credentials.credentials
     try:
         # Verify the Firebase ID token
-        decoded_token = auth.verify_id_token(token)
+        decoded_token = await verify_token_cached(token)
         return {
             "user_id": decoded_token["uid"],
             "email": decoded_token.get("email", ""),
@@ -107,8 +272,22 @@ async def get_current_user(
         ) from err
 
 
+# (Auth) Dependency for public endpoints that personalize for signed-in users
+async def get_optional_user(
+    credentials: HTTPAuthorizationCredentials | None = Depends(optional_security),
+) -> dict[str, Any] | None:
+    """Like get_current_user, but anonymous (None) instead of 401 without a valid token."""
+    if credentials is None:
+        return None
+    try:
+        user: dict[str, Any] = await get_current_user(credentials)
+    except HTTPException:
+        return None
+    return user
+
+
 # Create a new user account
-@app.post("/signup")
+@app.post("/signup", dependencies=[Depends(backend_ready)])
 async def create_an_account(user_data: SignUpSchema):
     email = user_data.email
     password = user_data.password
@@ -119,10 +298,11 @@ async def create_an_account(user_data: SignUpSchema):
     current_time = datetime.utcnow().isoformat()
     
     try:
-        user = auth.create_user(email=email, password=password)
+        with span("auth"):
+            user = await run_sync(auth.create_user, email=email, password=password)
         
         user_doc_ref = db.collection("users").document(user.uid)
-        user_doc_ref.set({
+        await run_sync(user_doc_ref.set, {
             "email": email,
             "favorites": [], 
             "created_at": datetime.utcnow().isoformat(),
@@ -132,6 +312,7 @@ async def create_an_account(user_data: SignUpSchema):
             "location": location,
             "created_at": current_time, 
             "joined_date": current_time,
+            "review_count": 0,
             
             
         })
@@ -147,15 +328,22 @@ async def create_an_account(user_data: SignUpSchema):
 
 
 # Create a login token for existing user
-@app.post("/login")
+@app.post("/login", dependencies=[Depends(backend_ready)])
 async def create_access_token(user_data: LoginSchema):
     email = user_data.email
     password = user_data.password
     try:
-        user = firebase.auth().sign_in_with_email_and_password(email=email, password=password)
+        with span("auth"):
+            user = await services.sign_in(email, password)
 
         token = user["idToken"]
         return JSONResponse(content={"token": token}, status_code=200)
+    except IdentityToolkitUnavailableError as err:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Sign-in is temporarily unavailable",
+            headers={"Retry-After": str(max(1, round(err.retry_after)))},
+        ) from err
     except Exception as err:
         raise HTTPException(status_code=400, detail="Invalid username or password") from err
 
@@ -174,6 +362,83 @@ def root():
     return {"Hello": "Worlds"}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Request, per-phase and per-call latency histograms in Prometheus text format."""
+    return PlainTextResponse(metrics.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+# --------------- Internal (admin) ----------------
+
+
+def require_admin(x_admin_token: str | None = Header(None)) -> None:
+    """The /internal endpoints exist only when PROFILER_ADMIN_TOKEN is set."""
+    if not PROFILER_ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if x_admin_token is None or not secrets.compare_digest(x_admin_token, PROFILER_ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+@app.get("/internal/stats", dependencies=[Depends(require_admin)])
+async def get_internal_stats():
+    """Cache and request-coalescing counters for this worker."""
+    return {
+        "yelp_search_cache": search_cache.stats(),
+        "yelp_detail_cache": detail_cache.stats(),
+        "yelp_detail_store": detail_store.stats(),
+        "yelp_autocomplete_cache": autocomplete_cache.stats(),
+        "search_index": restaurant_index.stats(),
+        "local_restaurant_index": local_restaurants.stats(),
+        "yelp_singleflight": yelp_flight.stats(),
+        "token_cache": token_cache.stats(),
+        "user_cache": user_cache.stats(),
+        "yelp_rate_limit": yelp_client.rate_status(),
+        "yelp_resilience": yelp_client.resilience_status(),
+        "identity_toolkit": identity_client.stats(),
+    }
+
+
+# --------------- Sampling Profiler (admin) ----------------
+
+
+@app.post("/internal/profiler/start", dependencies=[Depends(require_admin)])
+async def start_profiler(
+    interval_ms: float = Query(PROFILER_INTERVAL * 1000, ge=1, le=1000),
+    duration: float = Query(60, gt=0, le=PROFILER_MAX_SECONDS),
+):
+    """
+    Start sampling every thread of this worker (event loop and thread pools).
+    The session stops itself after `duration` seconds.
+    """
+    try:
+        profiler.start(interval=interval_ms / 1000, duration=duration)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e)) from e
+    return profiler.stats()
+
+
+@app.post("/internal/profiler/stop", dependencies=[Depends(require_admin)])
+async def stop_profiler():
+    # On the event loop thread, so the SIGPROF handler can be restored
+    profiler.stop()
+    return profiler.stats()
+
+
+@app.get("/internal/profiler", dependencies=[Depends(require_admin)])
+async def get_profiler_status():
+    return profiler.stats()
+
+
+@app.get("/internal/profiler/collapsed", dependencies=[Depends(require_admin)])
+async def get_profiler_collapsed(idle: bool = False):
+    """
+    Samples of the current or last session as collapsed stacks, e.g.
+    `flamegraph.pl profile.txt > profile.svg`, or open in speedscope.app.
+    `idle=true` keeps samples of parked threads (event loop in select, idle workers).
+    """
+    return PlainTextResponse(profiler.collapsed(include_idle=idle))
+
+
 # --------------- Favorite Restaurants Operations ----------------
 
 @app.get("/users/me/favorites/ids")
@@ -184,12 +449,12 @@ async def list_user_favorite_ids(current_user: dict = Depends(get_current_user))
     user_id = current_user["user_id"]
     
     try:
-        user_doc = db.collection("users").document(user_id).get()
+        user_data = await get_user_data(user_id)
 
-        if not user_doc.exists:
+        if user_data is None:
             return {"favorite_ids": []}
         
-        favorite_ids = user_doc.to_dict().get("favorites", [])
+        favorite_ids = user_data.get("favorites", [])
         print(f"Favorite IDs for user {user_id}: {favorite_ids}")
         
         return {"favorite_ids": favorite_ids}
@@ -214,9 +479,10 @@ async def add_favorite_restaurant(
         #     raise HTTPException(status_code=404, detail="Restaurant not found in local DB")
 
         # Use Firestore Array Union to safely add the ID if it's not already there
-        user_doc_ref.update({
+        await run_sync(user_doc_ref.update, {
             "favorites": firestore.ArrayUnion([restaurant_id])
         })
+        await user_cache.invalidate(user_id)
 
         return JSONResponse(
             content={"message": f"Restaurant {restaurant_id} added to favorites"}, 
@@ -237,9 +503,10 @@ async def remove_favorite_restaurant(
 
     try:
         # Use Firestore Array Remove to safely remove the ID
-        user_doc_ref.update({
+        await run_sync(user_doc_ref.update, {
             "favorites": firestore.ArrayRemove([restaurant_id])
         })
+        await user_cache.invalidate(user_id)
 
         return JSONResponse(
             content={"message": f"Restaurant {restaurant_id} removed from favorites"}, 
@@ -272,7 +539,8 @@ async def update_user_profile(
     # Handle Email Change (Requires Firebase Auth update)
     if user_update.email is not None and user_update.email != current_user["email"]:
         try:
-            auth.update_user(user_id, email=user_update.email)
+            with span("auth"):
+                await run_sync(auth.update_user, user_id, email=user_update.email)
             update_data["email"] = user_update.email
         except auth.EmailAlreadyExistsError:
             raise HTTPException(status_code=400, detail="Email is already in use by another account.")
@@ -283,9 +551,10 @@ async def update_user_profile(
         return JSONResponse(content={"message": "No data provided for update."}, status_code=200)
 
     try:
-        user_doc_ref.update(update_data)
+        await run_sync(user_doc_ref.update, update_data)
+        await user_cache.invalidate(user_id)
         
-        updated_doc = user_doc_ref.get().to_dict()
+        updated_doc = (await datastore.get_doc(user_doc_ref)).to_dict()
         return {**current_user, **updated_doc} # Merge current token info with new Firestore data
         
     except Exception as e:
@@ -298,15 +567,20 @@ async def get_user_profile(current_user: dict = Depends(get_current_user)):
     including new fields from Firestore.
     """
     user_id = current_user["user_id"]
-    user_doc = db.collection("users").document(user_id).get()
+    user_data = await get_user_data(user_id)
 
-    if not user_doc.exists:
+    if user_data is None:
         raise HTTPException(status_code=404, detail="User profile data missing")
 
-    user_data = user_doc.to_dict()
+    return profile_from_user_data(current_user, user_data)
 
+
+def profile_from_user_data(
+    current_user: dict[str, Any], user_data: dict[str, Any]
+) -> dict[str, Any]:
+    """Public profile fields from a `users` document."""
     return {
-        "user_id": user_id,
+        "user_id": current_user["user_id"],
         "email": current_user["email"],
         "name": user_data.get("name"),
         "tagline": user_data.get("tagline"),
@@ -315,6 +589,124 @@ async def get_user_profile(current_user: dict = Depends(get_current_user)):
         "image_url": user_data.get("image_url"),
     }
 
+
+def _read_review_count(transaction: Any, user_id: str) -> tuple[int, bool]:
+    """
+    The user's review counter as seen by `transaction`, and whether it had to be
+    seeded: accounts created before the counter existed get a COUNT of their
+    reviews, read in the same transaction so a concurrent review write retries.
+    """
+    snapshot = db.collection("users").document(user_id).get(transaction=transaction)
+    count = (snapshot.to_dict() or {}).get("review_count") if snapshot.exists else None
+    if count is not None:
+        return int(count), False
+    query = db.collection("reviews").where("user_id", "==", user_id)
+    return int(query.count().get(transaction=transaction)[0][0].value), True
+
+
+def _seed_review_count_txn(transaction: Any, user_id: str) -> int:
+    count, seeded = _read_review_count(transaction, user_id)
+    if seeded:
+        transaction.set(
+            db.collection("users").document(user_id), {"review_count": count}, merge=True
+        )
+    return count
+
+
+async def review_count_from_user_data(user_id: str, user_data: dict[str, Any] | None) -> int:
+    """
+    Read the maintained review counter (updated in create_review / delete_review).
+    Older accounts have no counter yet: count server-side and backfill it.
+    """
+    count = (user_data or {}).get("review_count")
+    if count is not None:
+        return int(count)
+    seed_txn = firestore.transactional(_seed_review_count_txn)
+    seeded = await run_sync(seed_txn, db.transaction(), user_id)
+    await user_cache.invalidate(user_id)
+    return int(seeded)
+
+
+async def hydrate_favorites(
+    favorite_ids: list[str],
+) -> list[YelpBusinessDetail | RestaurantResponse]:
+    """
+    Resolve favorite IDs to restaurant details, keeping the favorites order.
+    Local restaurants come from Firestore; Yelp IDs are resolved concurrently
+    through the business detail cache. IDs that cannot be resolved are skipped.
+    """
+    if not favorite_ids:
+        return []
+
+    # Batch fetch local restaurant details for each favorited ID
+    restaurant_refs = [db.collection("restaurants").document(rid) for rid in favorite_ids]
+    local_restaurants = {}
+    fetched_restaurants = await datastore.get_all(db, restaurant_refs)
+    for doc in fetched_restaurants:
+        if doc.exists:
+            local_restaurants[doc.id] = RestaurantResponse(id=doc.id, **doc.to_dict())
+
+    # Anything not in the local collection is a Yelp business ID
+    yelp_ids = [rid for rid in favorite_ids if rid not in local_restaurants]
+    yelp_details = await get_business_details_many(yelp_ids) if yelp_ids else {}
+
+    favorite_restaurants: list[YelpBusinessDetail | RestaurantResponse] = []
+    for rid in favorite_ids:
+        restaurant = local_restaurants.get(rid) or yelp_details.get(rid)
+        if restaurant is not None:
+            favorite_restaurants.append(restaurant)
+    return favorite_restaurants
+
+
+BUNDLE_SECTIONS = {"profile", "review_count", "favorite_ids", "favorites"}
+DEFAULT_BUNDLE_SECTIONS = "profile,review_count,favorite_ids"
+
+
+@app.get("/users/me/bundle")
+async def get_user_bundle(
+    include: str = Query(
+        DEFAULT_BUNDLE_SECTIONS,
+        description="Comma-separated sections: profile, review_count, favorite_ids, favorites",
+    ),
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Everything the Profile page needs in one round trip: the token is verified
+    once, the `users` document is read once, and the selected sections are
+    gathered concurrently.
+    """
+    sections = [section.strip() for section in include.split(",") if section.strip()]
+    unknown = set(sections) - BUNDLE_SECTIONS
+    if unknown:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown include section(s): {', '.join(sorted(unknown))}"
+        )
+
+    user_id = current_user["user_id"]
+    try:
+        user_data = await get_user_data(user_id)
+        if user_data is None:
+            raise HTTPException(status_code=404, detail="User profile data missing")
+        favorite_ids = user_data.get("favorites", [])
+
+        async def build(section: str) -> Any:
+            if section == "profile":
+                return profile_from_user_data(current_user, user_data)
+            if section == "review_count":
+                return await review_count_from_user_data(user_id, user_data)
+            if section == "favorite_ids":
+                return favorite_ids
+            return await hydrate_favorites(favorite_ids)
+
+        results = await asyncio.gather(*(build(section) for section in sections))
+        return dict(zip(sections, results, strict=True))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to fetch profile bundle: {str(e)}"
+        ) from e
+
 @app.get("/users/me/reviews/count")
 async def get_user_reviews_count(current_user: dict = Depends(get_current_user)):
     """
@@ -323,51 +715,36 @@ async def get_user_reviews_count(current_user: dict = Depends(get_current_user))
     user_id = current_user["user_id"]
 
     try:
+        user_data = await get_user_data(user_id)
+        count = await review_count_from_user_data(user_id, user_data)
 
-        reviews_ref = db.collection("reviews").where("user_id", "==", user_id)
-    
-        count = 0
-        for _ in reviews_ref.stream():
-            count += 1
-            
         return {"reviewCount": count}
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch review count: {str(e)}") from e
     
 
-@app.get("/users/me/favorites", response_model=List[RestaurantResponse])
+# Favorites mix Yelp businesses and local restaurants
+FAVORITES_MODEL = list[YelpBusinessDetail | RestaurantResponse]
+
+
+@app.get("/users/me/favorites", response_model=FAVORITES_MODEL)
 async def list_user_favorites(current_user: dict = Depends(get_current_user)):
     """
-    Get all favorite restaurants (details) for the current logged-in user.
+    Get all favorite restaurants (details) for the current logged-in user,
+    resolved server-side in one response.
     """
     user_id = current_user["user_id"]
     
     try:
-        # 1. Fetch the user document to get the list of favorite IDs
-        user_doc = db.collection("users").document(user_id).get()
-        if not user_doc.exists:
+        # Fetch the user document to get the list of favorite IDs
+        user_data = await get_user_data(user_id)
+        if user_data is None:
             # This should ideally not happen if signup is successful
             raise HTTPException(status_code=404, detail="User profile not found")
             
-        favorite_ids = user_doc.to_dict().get("favorites", [])
-        
-        if not favorite_ids:
-            return [] # User has no favorites
-
-        # 2. Batch fetch restaurant details for each favorited ID
-        restaurant_refs = [db.collection("restaurants").document(rid) for rid in favorite_ids]
-        
-        favorite_restaurants = []
-        fetched_restaurants = db.get_all(restaurant_refs)
-        
-        # 3. Compile the response
-        for doc in fetched_restaurants:
-            if doc.exists:
-                data = doc.to_dict()
-                favorite_restaurants.append(RestaurantResponse(id=doc.id, **data))
-        
-        return favorite_restaurants
+        favorite_ids = user_data.get("favorites", [])
+        return fast_response(await hydrate_favorites(favorite_ids), FAVORITES_MODEL)
         
     except HTTPException:
         raise
@@ -394,16 +771,18 @@ async def search_restaurants_yelp(
         if location == "Current Location" and (latitude is None or longitude is None):
             location = "NYC"
 
-        yelp_results = await search_yelp(
+        # Answered from the local index when it is confident, otherwise from Yelp
+        yelp_results = await search_restaurants(
             term=term, 
             location=location, 
             latitude=latitude, 
             longitude=longitude, 
-            limit=20
+            limit=20,
+            endpoint="search",
         )
-        return yelp_results
+        return fast_response(yelp_results, YelpSearchResponse)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to fetch from Yelp: {str(e)}") from e
+        raise yelp_http_error(e, "Failed to fetch from Yelp") from e
 
 @app.get("/recommendations/nearby", response_model=YelpSearchResponse)
 async def get_local_picks(latitude: float, longitude: float, limit: int = 10):
@@ -411,12 +790,17 @@ async def get_local_picks(latitude: float, longitude: float, limit: int = 10):
     Local Picks - gets highly rated places nearby without a search term.
     """
     try:
-        # We call search_yelp but without a 'term', and sort by rating
-        return await search_yelp(
-            latitude=latitude, longitude=longitude, sort_by="rating", limit=limit
+        # Search without a 'term', sorted by rating. Tiled so nearby users share a cache entry
+        local_picks = await search_yelp_tile(
+            latitude=latitude,
+            longitude=longitude,
+            sort_by="rating",
+            limit=limit,
+            endpoint="nearby",
         )
+        return fast_response(local_picks, YelpSearchResponse)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e)) from e
+        raise yelp_http_error(e, "Failed to fetch local picks") from e
     
 @app.get("/restaurants/similar/{restaurant_id}", response_model=List[dict])
 async def get_similar_restaurants(restaurant_id: str):
@@ -426,61 +810,65 @@ async def get_similar_restaurants(restaurant_id: str):
     """
     try:
         source_restaurant = await get_business_details(restaurant_id)
-        
-        if not source_restaurant.categories:
-             # If no category, we can't really match "similar", so return empty
-            return []
+        return await similar_restaurants_for(source_restaurant)
+    except Exception as e:
+        print(f"Error fetching similar restaurants: {e}")
+        return []
 
-        # Obtain the category to search for reaturants of similar genre (e.g., "Pizza")
-        category_term = source_restaurant.categories[0].get("title", "")
 
-        # Extract Location Data for presise searching
-        lat = source_restaurant.coordinates.get("latitude")
-        lon = source_restaurant.coordinates.get("longitude")
-        
-        search_location = None
-
-        # Check if we have valid coordinates
-        if lat is None or lon is None:
-            # FALLBACK: Build a text address from the location dict. Use Yelps 'display_address' as a list like ["123 Main St", "New York, NY"]
-            address_list = source_restaurant.location.get("display_address", [])
-            if address_list:
-                search_location = ", ".join(address_list)
-            else:
-                # Ultimate fallback if restaurant has NO address and NO coords
-                search_location = "NYC" 
-        
-        # Search Yelp (If lat/lon are None, it uses search_location.)
-        search_results = await search_yelp(
-            term=category_term,
-            latitude=lat,
-            longitude=lon,
-            location=search_location,
-            limit=5, 
-            sort_by="rating"
-        )
+async def similar_restaurants_for(source_restaurant: YelpBusinessDetail) -> list[dict[str, Any]]:
+    """Top 3 restaurants in the same category near an already fetched business."""
+    if not source_restaurant.categories:
+         # If no category, we can't really match "similar", so return empty
+        return []
 
-        # Filter out the original restaurant and return top 3
-        recommendations = []
-        for business in search_results.businesses:
-            if business.id != restaurant_id:
-                recommendations.append({
-                    "id": business.id,
-                    "name": business.name,
-                    "image_url": business.image_url,
-                    "rating": business.rating,
-                    "price": getattr(business, "price", None),
-                    "review_count": business.review_count
-                })
-                
-            if len(recommendations) >= 3:
-                break
-        
-        return recommendations
+    # Obtain the category to search for reaturants of similar genre (e.g., "Pizza")
+    category_term = source_restaurant.categories[0].get("title", "")
 
-    except Exception as e:
-        print(f"Error fetching similar restaurants: {e}")
-        return []
+    # Extract Location Data for presise searching
+    lat = source_restaurant.coordinates.get("latitude")
+    lon = source_restaurant.coordinates.get("longitude")
+    
+    search_location = None
+
+    # Check if we have valid coordinates
+    if lat is None or lon is None:
+        # FALLBACK: Build a text address from the location dict. Use Yelps 'display_address' as a list like ["123 Main St", "New York, NY"]
+        address_list = source_restaurant.location.get("display_address", [])
+        if address_list:
+            search_location = ", ".join(address_list)
+        else:
+            # Ultimate fallback if restaurant has NO address and NO coords
+            search_location = "NYC" 
+    
+    # Search Yelp (If lat/lon are None, it uses search_location.)
+    search_results = await search_yelp(
+        term=category_term,
+        latitude=lat,
+        longitude=lon,
+        location=search_location,
+        limit=5, 
+        sort_by="rating",
+        endpoint="similar",
+    )
+
+    # Filter out the original restaurant and return top 3
+    recommendations = []
+    for business in search_results.businesses:
+        if business.id != source_restaurant.id:
+            recommendations.append({
+                "id": business.id,
+                "name": business.name,
+                "image_url": business.image_url,
+                "rating": business.rating,
+                "price": getattr(business, "price", None),
+                "review_count": business.review_count
+            })
+            
+        if len(recommendations) >= 3:
+            break
+    
+    return recommendations
 
 
 @app.get("/autocomplete/restaurants", response_model=YelpAutocompleteResponse)
@@ -496,10 +884,8 @@ async def autocomplete_restaurants_yelp(
         yelp_results = await autocomplete_yelp(text=text, latitude=latitude, longitude=longitude)
         return yelp_results
     except Exception as e:
-        raise HTTPException(
-            status_code=500,  # error can vary based on issue (text too short, etc)
-            detail=f"Autocomplete failed: {str(e)}",
-        ) from e
+        # error can vary based on issue (text too short, etc)
+        raise yelp_http_error(e, "Autocomplete failed") from e
 
 
 @app.get("/yelp/restaurants/{yelp_id}", response_model=YelpBusinessDetail)
@@ -509,12 +895,78 @@ async def get_yelp_business_details(yelp_id: str):
     Used when a user clicks on a search result.
     """
     try:
-        return await get_business_details(yelp_id)
+        return fast_response(await get_business_details(yelp_id), YelpBusinessDetail)
     except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Failed to fetch details from Yelp: {str(e)}"
+        raise yelp_http_error(e, "Failed to fetch details from Yelp") from e
+
+@app.get("/restaurants/{yelp_id}/view")
+async def get_restaurant_view(
+    yelp_id: str,
+    response: Response,
+    reviews_limit: int = Query(10, ge=1, le=100),
+    current_user: dict | None = Depends(get_optional_user),
+):
+    """
+    Everything the Restaurant page needs in one payload. Business details are
+    fetched once, then similar restaurants and, for a signed-in user, the
+    CrowdFork reviews and the favorite status are gathered in parallel.
+    Anonymous callers get null reviews, as /restaurants/{restaurant_id}/reviews
+    requires a login. Per-section timings are returned in the Server-Timing header.
+    """
+    timings: dict[str, float] = {}
+
+    async def timed(name: str, coro: Any) -> Any:
+        started = time.perf_counter()
+        try:
+            return await coro
+        finally:
+            timings[name] = (time.perf_counter() - started) * 1000
+
+    async def similar(details: YelpBusinessDetail) -> list[dict[str, Any]]:
+        try:
+            return await similar_restaurants_for(details)
+        except Exception as e:
+            logger.warning("Error fetching similar restaurants for %s: %s", yelp_id, e)
+            return []
+
+    async def review_page() -> tuple[list[ReviewResponse] | None, str | None]:
+        if current_user is None:
+            return None, None
+        return await restaurant_review_page(yelp_id, reviews_limit)
+
+    async def is_favorite() -> bool | None:
+        if current_user is None:
+            return None
+        user_data = await get_user_data(current_user["user_id"])
+        return user_data is not None and yelp_id in user_data.get("favorites", [])
+
+    started = time.perf_counter()
+    try:
+        details = await timed("details", get_business_details(yelp_id))
+    except Exception as e:
+        raise yelp_http_error(e, "Failed to fetch details from Yelp") from e
+
+    try:
+        recommendations, (reviews, reviews_cursor), favorite = await asyncio.gather(
+            timed("similar", similar(details)),
+            timed("reviews", review_page()),
+            timed("favorite", is_favorite()),
         )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to load restaurant: {str(e)}") from e
+    timings["total"] = (time.perf_counter() - started) * 1000
+
+    response.headers["Server-Timing"] = ", ".join(
+        f"{name};dur={duration:.1f}" for name, duration in timings.items()
+    )
+    return {
+        "restaurant": details,
+        "similar": recommendations,
+        "reviews": reviews,
+        "reviews_next_cursor": reviews_cursor,
+        "is_favorite": favorite,
+    }
+
 
 @app.get("/recommendations/localpicks", response_model=YelpSearchResponse)
 async def get_localpicks_restaurants(
@@ -527,15 +979,17 @@ async def get_localpicks_restaurants(
     Uses Yelp's 'hot_and_new' attribute to find trending places.
     """
     try:
-        return await search_yelp(
+        top_picks = await search_yelp_tile(
             latitude=latitude,
             longitude=longitude,
             attributes="hot_and_new", # popular businesses which recently joined Yelp
             sort_by="best_match",
-            limit=limit
+            limit=limit,
+            endpoint="localpicks",
         )
+        return fast_response(top_picks, YelpSearchResponse)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise yelp_http_error(e, "Failed to fetch top picks") from e
 
 # ------- Helper function to verify restaurant existence ----------
 
@@ -544,7 +998,7 @@ async def verify_restaurant_exists(restaurant_id: str) -> bool:
     """Check if restaurant exists in Firestore"""
     try:
         restaurant_ref = db.collection("restaurants").document(restaurant_id)
-        restaurant = restaurant_ref.get()
+        restaurant = await datastore.get_doc(restaurant_ref)
         return restaurant.exists
     except Exception as e:
         print(f"Error checking restaurant: {e}")
@@ -553,6 +1007,9 @@ async def verify_restaurant_exists(restaurant_id: str) -> bool:
 
 # -------------- Crud Operations for Reviews ----------------
 
+# Upper bound on IDs accepted by the bulk ratings endpoint
+MAX_RATING_IDS = 100
+
 
 @app.post("/restaurants/{restaurant_id}/reviews", response_model=ReviewResponse)
 async def create_review(
@@ -585,34 +1042,80 @@ async def create_review(
             "created_at": datetime.utcnow().isoformat(),
         }
 
-        # Add to Firestore
-        review_ref = db.collection("reviews").add(review_data)
-        review_id = review_ref[1].id
+        review_ref = db.collection("reviews").document()
+        create_txn = firestore.transactional(_create_review_txn)
+        await run_sync(create_txn, db.transaction(), review_ref, review_data)
+        await user_cache.invalidate(current_user["user_id"])
+        review_id = review_ref.id
 
         return ReviewResponse(id=review_id, **review_data)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create review: {str(e)}") from e
 
 
+def _create_review_txn(transaction: Any, review_ref: Any, review_data: dict[str, Any]) -> None:
+    """
+    Add a review and count it in its author's review counter and the
+    restaurant's rating aggregate in one transaction. Run it wrapped in
+    firestore.transactional so contention is retried.
+    """
+    user_id = review_data["user_id"]
+    restaurant_id = review_data["restaurant_id"]
+    review_count, _ = _read_review_count(transaction, user_id)
+    aggregate = read_aggregate(db, transaction, restaurant_id)
+    add_review(aggregate, review_data["rating"], 1, review_data["created_at"])
+
+    transaction.set(review_ref, review_data)
+    transaction.set(
+        db.collection("users").document(user_id), {"review_count": review_count + 1}, merge=True
+    )
+    # Whole document, so emptied histogram buckets are dropped
+    transaction.set(db.collection(RATINGS_COLLECTION).document(restaurant_id), aggregate)
+
+
+def _delete_review_txn(transaction: Any, review_ref: Any, user_id: str) -> dict[str, Any]:
+    """
+    Delete a review and remove it from its author's review counter and the
+    restaurant's rating aggregate in one transaction. last_review_at is left as
+    is; maintenance.py restaurant-ratings recomputes it. Run it wrapped in
+    firestore.transactional so contention is retried.
+    """
+    review = review_ref.get(transaction=transaction)
+
+    if not review.exists:
+        raise HTTPException(status_code=404, detail="Review not found")
+
+    review_data: dict[str, Any] = review.to_dict()
+
+    # Check if the current user is the author of the review
+    if review_data["user_id"] != user_id:
+        raise HTTPException(status_code=403, detail="You can only delete your own reviews")
+
+    # Read before any write; seeded values still include this review
+    review_count, _ = _read_review_count(transaction, user_id)
+    restaurant_id = review_data["restaurant_id"]
+    aggregate = read_aggregate(db, transaction, restaurant_id)
+    add_review(aggregate, review_data["rating"], -1)
+
+    transaction.delete(review_ref)
+    transaction.set(
+        db.collection("users").document(user_id),
+        {"review_count": max(0, review_count - 1)},
+        merge=True,
+    )
+    transaction.set(db.collection(RATINGS_COLLECTION).document(restaurant_id), aggregate)
+    return review_data
+
+
 @app.delete("/reviews/{review_id}")
 async def delete_review(review_id: str, current_user: dict = Depends(get_current_user)):
     """Delete a review (only the review author can delete)"""
 
     try:
         review_ref = db.collection("reviews").document(review_id)
-        review = review_ref.get()
-
-        if not review.exists:
-            raise HTTPException(status_code=404, detail="Review not found")
-
-        review_data = review.to_dict()
-
-        # Check if the current user is the author of the review
-        if review_data["user_id"] != current_user["user_id"]:
-            raise HTTPException(status_code=403, detail="You can only delete your own reviews")
-
-        # Delete the review
-        review_ref.delete()
+        delete_txn = firestore.transactional(_delete_review_txn)
+        await run_sync(delete_txn, db.transaction(), review_ref, current_user["user_id"])
+        await user_cache.invalidate(current_user["user_id"])
 
         return JSONResponse(content={"message": "Review deleted successfully"}, status_code=200)
     except HTTPException:
@@ -623,9 +1126,15 @@ async def delete_review(review_id: str, current_user: dict = Depends(get_current
 
 
 @app.get("/users/me/reviews", response_model=List[ReviewWithRestaurantInfo])
-async def list_user_reviews(limit: int = 10, current_user: dict = Depends(get_current_user)):
+async def list_user_reviews(
+    response: Response,
+    limit: int = Query(10, ge=1, le=100),
+    cursor: str | None = Query(None, description="X-Next-Cursor value from the previous page"),
+    current_user: dict = Depends(get_current_user),
+):
     """
     Get all reviews by the current logged-in user, including the restaurant name.
+    Newest first; the cursor for the next page is returned in the X-Next-Cursor header.
     """
     user_id = current_user["user_id"]
 
@@ -634,9 +1143,19 @@ async def list_user_reviews(limit: int = 10, current_user: dict = Depends(get_cu
             db.collection("reviews")
             .where("user_id", "==", user_id)
             .order_by("created_at", direction=firestore.Query.DESCENDING)
-            .limit(limit)
+            .order_by("__name__", direction=firestore.Query.DESCENDING)
         )
-        review_docs = list(reviews_ref.stream())
+        reviews_ref = apply_cursor(reviews_ref, cursor).limit(limit + 1)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+    try:
+        review_docs = await datastore.stream(reviews_ref)
+
+        page_cursor = next_cursor(review_docs, limit)
+        if page_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = page_cursor
+        review_docs = review_docs[:limit]
 
         if not review_docs:
             return []
@@ -646,7 +1165,7 @@ async def list_user_reviews(limit: int = 10, current_user: dict = Depends(get_cu
         restaurant_map = {}
         restaurant_refs = [db.collection("restaurants").document(rid) for rid in restaurant_ids]
         
-        fetched_restaurants = db.get_all(restaurant_refs)
+        fetched_restaurants = await datastore.get_all(db, restaurant_refs)
         for doc in fetched_restaurants:
             if doc.exists:
                 restaurant_map[doc.id] = doc.to_dict().get("name", "Unknown Restaurant")
@@ -667,14 +1186,68 @@ async def list_user_reviews(limit: int = 10, current_user: dict = Depends(get_cu
                 )
             )
 
-        return enhanced_reviews
+        return fast_response(enhanced_reviews, list[ReviewWithRestaurantInfo], response)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch user's reviews: {str(e)}") from e
 
 
+@app.get(
+    "/restaurants/ratings",
+    response_model=list[RestaurantRatingAggregate],
+    dependencies=[Depends(backend_ready)],
+)
+async def get_restaurant_ratings(
+    ids: str = Query(..., description="Comma-separated restaurant IDs, e.g. 'id1,id2'"),
+):
+    """
+    CrowdFork rating aggregates for many restaurants in one batched read.
+    Restaurants without reviews are returned with a zero count.
+    """
+    restaurant_ids = list(dict.fromkeys(rid.strip() for rid in ids.split(",") if rid.strip()))
+    if not restaurant_ids:
+        return []
+    if len(restaurant_ids) > MAX_RATING_IDS:
+        raise HTTPException(
+            status_code=400, detail=f"At most {MAX_RATING_IDS} restaurant IDs per request"
+        )
+
+    try:
+        refs = [db.collection(RATINGS_COLLECTION).document(rid) for rid in restaurant_ids]
+        docs = {doc.id: doc for doc in await datastore.get_all(db, refs)}
+        return [
+            to_rating_aggregate(
+                rid, docs[rid].to_dict() if rid in docs and docs[rid].exists else None
+            )
+            for rid in restaurant_ids
+        ]
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch ratings: {str(e)}") from e
+
+
+async def restaurant_review_page(
+    restaurant_id: str, limit: int, cursor: str | None = None
+) -> tuple[list[ReviewResponse], str | None]:
+    """One page of a restaurant's reviews and the cursor for the next page."""
+    # Newest first with the document id as tie-breaker
+    reviews_ref = (
+        db.collection("reviews")
+        .where("restaurant_id", "==", restaurant_id)
+        .order_by("created_at", direction=firestore.Query.DESCENDING)
+        .order_by("__name__", direction=firestore.Query.DESCENDING)
+    )
+    reviews_ref = apply_cursor(reviews_ref, cursor).limit(limit + 1)
+    review_docs = await datastore.stream(reviews_ref)
+    reviews = [ReviewResponse(id=doc.id, **doc.to_dict()) for doc in review_docs[:limit]]
+    return reviews, next_cursor(review_docs, limit)
+
+
 @app.get("/restaurants/{restaurant_id}/reviews", response_model=List[ReviewResponse])
 async def list_restaurant_reviews(
-    restaurant_id: str, limit: int = 10, current_user: dict = Depends(get_current_user)
+    restaurant_id: str,
+    response: Response,
+    limit: int = Query(10, ge=1, le=100),
+    cursor: str | None = Query(None, description="X-Next-Cursor value from the previous page"),
+    current_user: dict = Depends(get_current_user),
 ):
     # Check if restaurant exists
     if not await verify_restaurant_exists(restaurant_id):
@@ -683,20 +1256,13 @@ async def list_restaurant_reviews(
     """Get all reviews by the current logged-in user"""
 
     try:
-        # Query reviews by the restaurant
-        reviews_ref = (
-            db.collection("reviews")
-            .where("restaurant_id", "==", restaurant_id)
-            .order_by("created_at", direction=firestore.Query.DESCENDING)
-            .limit(limit)
-        )
-
-        reviews = []
-        for doc in reviews_ref.stream():
-            review_data = doc.to_dict()
-            reviews.append(ReviewResponse(id=doc.id, **review_data))
+        reviews, page_cursor = await restaurant_review_page(restaurant_id, limit, cursor)
+        if page_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = page_cursor
 
-        return reviews
+        return fast_response(reviews, list[ReviewResponse], response)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch reviews: {str(e)}") from e
 
@@ -724,7 +1290,12 @@ def get_review(review_id: int) -> Any:
 # No authentication required for restaurant operations
 
 
-@app.post("/restaurants", response_model=RestaurantResponse, status_code=201)
+@app.post(
+    "/restaurants",
+    response_model=RestaurantResponse,
+    status_code=201,
+    dependencies=[Depends(backend_ready)],
+)
 async def create_restaurant(restaurant: Restaurant):
     """Create a new restaurant (no authentication required)"""
 
@@ -740,10 +1311,13 @@ async def create_restaurant(restaurant: Restaurant):
         }
 
         # Add to Firestore
-        restaurant_ref = db.collection("restaurants").add(restaurant_data)
+        restaurant_ref = await run_sync(db.collection("restaurants").add, restaurant_data)
         restaurant_id = restaurant_ref[1].id
 
-        return RestaurantResponse(id=restaurant_id, **restaurant_data)
+        created = RestaurantResponse.model_validate({"id": restaurant_id, **restaurant_data})
+        # Searchable here right away; other workers pick it up on their next reload
+        local_restaurants.add(created)
+        return created
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create restaurant: {str(e)}") from e
 
@@ -775,9 +1349,20 @@ async def list_restaurants(limit: int = 20, cuisine_type: Optional[str] = None,
         if cuisine_type:
             term = cuisine_type
 
-        yelp_results = await search_yelp(term="restaurants", location=location, limit=limit)
+        # CrowdFork's own restaurants first; Yelp fills the rest of the page
+        mapped_restaurants: list[RestaurantResponse] = local_restaurants.search(
+            cuisine_type, location, limit=limit
+        )
+        if len(mapped_restaurants) >= limit:
+            return fast_response(mapped_restaurants, list[RestaurantResponse])
+
+        yelp_results = await search_yelp(
+            term="restaurants",
+            location=location,
+            limit=limit - len(mapped_restaurants),
+            endpoint="restaurants",
+        )
 
-        mapped_restaurants: list[RestaurantResponse] = []
         for business in yelp_results.businesses:
             # Map Yelp business to RestaurantResponse
             address = ", ".join(business.location.get("display_address", []))
@@ -798,10 +1383,10 @@ async def list_restaurants(limit: int = 20, cuisine_type: Optional[str] = None,
                     updated_at=datetime.utcnow().isoformat(),
                 )
             )
-        return mapped_restaurants
+        return fast_response(mapped_restaurants, list[RestaurantResponse])
 
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to fetch restaurants: {str(e)}") from e
+        raise yelp_http_error(e, "Failed to fetch restaurants") from e
 
 # we don't need this
 # @app.get("/restaurants/{restaurant_id}", response_model=RestaurantResponse)
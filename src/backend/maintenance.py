@@ -0,0 +1,84 @@
+"""
+Reconciliation jobs for counters that are maintained incrementally in Firestore.
+
+    cd src/backend
+    python maintenance.py review-counts [--dry-run]
+    python maintenance.py restaurant-ratings [--dry-run]
+
+Review writes seed a missing counter themselves, so these jobs are only needed
+to repair drift, e.g. from a write made outside the API.
+"""
+
+import argparse
+from collections import defaultdict
+from typing import Any
+
+from ratings import RATINGS_COLLECTION, add_review, empty_aggregate
+
+
+def reconcile_review_counts(db: Any, dry_run: bool = False) -> dict[str, int]:
+    """Recompute every user's `review_count` with a COUNT aggregation and fix drift."""
+    checked = 0
+    repaired = 0
+    for user_doc in db.collection("users").stream():
+        checked += 1
+        query = db.collection("reviews").where("user_id", "==", user_doc.id)
+        actual = int(query.count().get()[0][0].value)
+        stored = (user_doc.to_dict() or {}).get("review_count")
+        if stored != actual:
+            repaired += 1
+            print(f"users/{user_doc.id}: review_count {stored} -> {actual}")
+            if not dry_run:
+                user_doc.reference.set({"review_count": actual}, merge=True)
+    return {"checked": checked, "repaired": repaired}
+
+
+def reconcile_restaurant_ratings(db: Any, dry_run: bool = False) -> dict[str, int]:
+    """Rebuild every restaurant's rating aggregate from a single scan of `reviews`."""
+    aggregates: dict[str, dict[str, Any]] = defaultdict(empty_aggregate)
+    for review_doc in db.collection("reviews").stream():
+        review = review_doc.to_dict()
+        add_review(aggregates[review["restaurant_id"]], review["rating"], 1, review["created_at"])
+
+    checked = 0
+    repaired = 0
+    stored_docs = {doc.id: doc for doc in db.collection(RATINGS_COLLECTION).stream()}
+    for restaurant_id in set(aggregates) | set(stored_docs):
+        checked += 1
+        expected = aggregates.get(restaurant_id) or empty_aggregate()
+        stored_doc = stored_docs.get(restaurant_id)
+        stored = stored_doc.to_dict() if stored_doc is not None else {}
+        stored_histogram = {k: v for k, v in stored.get("histogram", {}).items() if v}
+        if (
+            stored.get("review_count") != expected["review_count"]
+            or abs(stored.get("rating_sum", 0.0) - expected["rating_sum"]) > 1e-6
+            or stored_histogram != expected["histogram"]
+            or stored.get("last_review_at") != expected["last_review_at"]
+        ):
+            repaired += 1
+            print(f"{RATINGS_COLLECTION}/{restaurant_id}: {stored} -> {expected}")
+            if not dry_run:
+                # Overwrite (no merge) so stale histogram buckets are dropped
+                db.collection(RATINGS_COLLECTION).document(restaurant_id).set(expected)
+    return {"checked": checked, "repaired": repaired}
+
+
+JOBS = {
+    "review-counts": reconcile_review_counts,
+    "restaurant-ratings": reconcile_restaurant_ratings,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Repair drift in maintained counters.")
+    parser.add_argument("job", choices=sorted(JOBS))
+    parser.add_argument("--dry-run", action="store_true", help="Report drift without writing")
+    args = parser.parse_args()
+
+    from main import db
+
+    print(JOBS[args.job](db, dry_run=args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
@@ -49,6 +49,16 @@ class ReviewResponse(BaseModel):
     created_at: str
 
 
+class RestaurantRatingAggregate(BaseModel):
+    restaurant_id: str
+    review_count: int = 0
+    rating_sum: float = 0.0
+    average_rating: float | None = None
+    # Star bucket ("0".."5", floor of the rating) -> number of reviews
+    histogram: dict[str, int] = {}
+    last_review_at: str | None = None
+
+
 class Restaurant(BaseModel):
     name: str
     address: str
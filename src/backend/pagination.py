@@ -0,0 +1,54 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any
+
+# Response header carrying the cursor for the next page (absent on the last page)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(created_at: str, doc_id: str) -> str:
+    """Opaque cursor for the position right after (created_at, doc_id)."""
+    raw = json.dumps([created_at, doc_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, str]:
+    """
+    Inverse of encode_cursor. Raises ValueError on a malformed cursor, including
+    one whose timestamp or document ID could not have come from encode_cursor.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, doc_id = json.loads(raw)
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+    # Check both fields here: a bad value would otherwise fail inside Firestore
+    if not isinstance(created_at, str) or not isinstance(doc_id, str):
+        raise ValueError("Invalid cursor")
+    if not doc_id or "/" in doc_id:
+        raise ValueError("Invalid cursor")
+    try:
+        datetime.fromisoformat(created_at)
+    except ValueError as e:
+        raise ValueError("Invalid cursor") from e
+    return created_at, doc_id
+
+
+def apply_cursor(query: Any, cursor: str | None) -> Any:
+    """
+    Continue a query ordered by created_at DESC, then document id DESC, after
+    the given cursor. The id tie-breaker keeps pages stable when timestamps collide.
+    """
+    if not cursor:
+        return query
+    created_at, doc_id = decode_cursor(cursor)
+    return query.start_after({"created_at": created_at, "__name__": doc_id})
+
+
+def next_cursor(docs: list[Any], limit: int) -> str | None:
+    """Docs are fetched with limit + 1; a cursor is returned only if there is another page."""
+    if len(docs) <= limit:
+        return None
+    last = docs[limit - 1]
+    return encode_cursor(last.to_dict()["created_at"], last.id)
@@ -0,0 +1,224 @@
+import os
+import re
+import signal
+import sys
+import threading
+import time
+from collections import Counter, deque
+from types import CodeType, FrameType
+from typing import Any
+
+# Shared secret for the /internal endpoints (stats, profiler); they are 404 when unset
+PROFILER_ADMIN_TOKEN = os.getenv("PROFILER_ADMIN_TOKEN", "")
+# Default sampling interval and the longest a session may run before stopping itself
+PROFILER_INTERVAL = float(os.getenv("PROFILER_INTERVAL", "0.01"))
+PROFILER_MAX_SECONDS = float(os.getenv("PROFILER_MAX_SECONDS", "300"))
+PROFILER_MAX_DEPTH = 128
+
+# Leaf frames of threads that are parked rather than running: the event loop
+# waiting in select(), idle pool workers and condition waits. Left out of the
+# profile unless idle samples are asked for.
+_IDLE_LEAVES = {
+    ("selectors.py", "select"),
+    ("selectors.py", "EpollSelector.select"),
+    ("selectors.py", "KqueueSelector.select"),
+    ("thread.py", "_worker"),
+    ("threading.py", "Condition.wait"),
+    ("threading.py", "Event.wait"),
+    ("queue.py", "Queue.get"),
+}
+_POOL_SUFFIX = re.compile(r"_\d+$")
+
+
+class SamplingProfiler:
+    """
+    Sampling profiler for every thread of this worker process. Each sample
+    records all Python stacks, so the event loop thread shows the coroutine
+    running at that moment and the Firestore / detail-store pools show their
+    blocking calls. Samples are aggregated as collapsed stacks
+    ("thread;file:func;... count"), the input format of flamegraph.pl and
+    speedscope.
+
+    Worker threads are sampled by a sampler thread every `interval` of wall
+    time. When started from the main thread (uvicorn's event loop) the main
+    thread is instead sampled on SIGPROF, per `interval` of process CPU time:
+    the signal interrupts the loop at an arbitrary bytecode, whereas a sampler
+    thread only gets the GIL when the loop releases it and would attribute
+    every sample to the selector wait.
+
+    The signal handler may interrupt code holding any lock (including ours,
+    in collapsed()), so it takes none: it appends the raw stack to a deque,
+    which the sampler thread and readers fold into the counts.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._samples: Counter[tuple[str, ...]] = Counter()
+        self._labels: dict[CodeType, str] = {}
+        # Main-thread stacks recorded by the SIGPROF handler, not yet counted
+        self._pending: deque[tuple[CodeType, ...]] = deque()
+        self._signal_samples = 0
+        self._signal_seconds = 0.0
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._deadline = 0.0
+        self._previous_handler: Any = None
+        self.running = False
+        self.mode = ""
+        self.interval = PROFILER_INTERVAL
+        self.started_at: float | None = None
+        self.stopped_at: float | None = None
+        self.sample_count = 0
+        self.sampling_seconds = 0.0
+
+    def start(self, interval: float = PROFILER_INTERVAL, duration: float = 60.0) -> None:
+        """Start a new session (clearing the last one); it stops itself after `duration`."""
+        if self.running:
+            raise RuntimeError("Profiler is already running")
+        with self._lock:
+            self._samples.clear()
+            self._pending.clear()
+        self.interval = interval
+        self.sample_count = 0
+        self.sampling_seconds = 0.0
+        self._signal_samples = 0
+        self._signal_seconds = 0.0
+        self.started_at = time.time()
+        self.stopped_at = None
+        self._deadline = time.monotonic() + min(duration, PROFILER_MAX_SECONDS)
+        self.running = True
+        if threading.current_thread() is threading.main_thread() and hasattr(signal, "SIGPROF"):
+            self.mode = "signal"
+            previous = signal.signal(signal.SIGPROF, self._on_signal)
+            # Still installed if the last session timed out rather than being stopped
+            if previous != self._on_signal:
+                self._previous_handler = previous
+            signal.setitimer(signal.ITIMER_PROF, interval, interval)
+        else:
+            self.mode = "thread"
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if not self.running:
+            return
+        self.running = False
+        if self.mode == "signal":
+            signal.setitimer(signal.ITIMER_PROF, 0)
+            if threading.current_thread() is threading.main_thread():
+                signal.signal(signal.SIGPROF, self._previous_handler or signal.SIG_DFL)
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self.stopped_at = time.time()
+
+    def _on_signal(self, signum: int, frame: FrameType | None) -> None:
+        # Runs on the main thread between two bytecodes of whatever it was
+        # doing, possibly while that code holds a lock: no locks, no labels
+        if frame is None or not self.running:
+            return
+        started = time.perf_counter()
+        self._pending.append(_code_stack(frame))
+        self._signal_samples += 1
+        self._signal_seconds += time.perf_counter() - started
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        main_id = threading.main_thread().ident
+        while not self._stop.wait(self.interval):
+            if time.monotonic() >= self._deadline:
+                # Restoring the SIGPROF handler needs the main thread; the
+                # disarmed timer is enough to stop the signal samples
+                self.stop()
+                break
+            started = time.perf_counter()
+            frames = sys._current_frames()
+            frames.pop(own_id, None)
+            if self.mode == "signal" and main_id is not None:
+                frames.pop(main_id, None)
+            self._sample(frames)
+            self.sampling_seconds += time.perf_counter() - started
+
+    def _label(self, code: CodeType) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            filename = os.path.basename(code.co_filename)
+            # co_qualname is new in 3.11
+            name = getattr(code, "co_qualname", code.co_name)
+            label = f"{filename}:{name}".replace(";", ":").replace(" ", "_")
+            self._labels[code] = label
+        return label
+
+    def _root(self, thread_name: str) -> str:
+        # Pool workers ("firestore_0", "firestore_1", ...) share one root
+        return _POOL_SUFFIX.sub("", thread_name).replace(" ", "_")
+
+    def _sample(self, frames: dict[int, FrameType]) -> None:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        stacks = []
+        for thread_id, frame in frames.items():
+            root = self._root(names.get(thread_id, str(thread_id)))
+            stacks.append((root, *map(self._label, _code_stack(frame))))
+        with self._lock:
+            self._samples.update(stacks)
+            self.sample_count += 1
+            self._drain()
+
+    def _drain(self) -> None:
+        """Count the stacks queued by the signal handler. Call with the lock held."""
+        root = self._root(threading.main_thread().name)
+        while True:
+            try:
+                codes = self._pending.popleft()
+            except IndexError:
+                return
+            stack = (root, *map(self._label, codes))
+            self._samples[stack] += 1
+
+    def collapsed(self, include_idle: bool = False) -> str:
+        """Samples in collapsed-stack format, heaviest first."""
+        with self._lock:
+            self._drain()
+            samples = list(self._samples.items())
+        lines = []
+        for stack, count in sorted(samples, key=lambda item: -item[1]):
+            if not include_idle and _is_idle(stack[-1]):
+                continue
+            lines.append(f"{';'.join(stack)} {count}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def stats(self) -> dict[str, Any]:
+        end = self.stopped_at or time.time()
+        with self._lock:
+            self._drain()
+        return {
+            "running": self.running,
+            "mode": self.mode,
+            "interval_ms": self.interval * 1000,
+            "started_at": self.started_at,
+            "duration_s": end - self.started_at if self.started_at else 0.0,
+            "samples": self.sample_count + self._signal_samples,
+            "distinct_stacks": len(self._samples),
+            # Time the sampler itself held the GIL
+            "overhead_ms": (self.sampling_seconds + self._signal_seconds) * 1000,
+        }
+
+
+def _code_stack(frame: FrameType) -> tuple[CodeType, ...]:
+    """Code objects from the root of the stack down to `frame`."""
+    codes: list[CodeType] = []
+    current: FrameType | None = frame
+    while current is not None and len(codes) < PROFILER_MAX_DEPTH:
+        codes.append(current.f_code)
+        current = current.f_back
+    codes.reverse()
+    return tuple(codes)
+
+
+def _is_idle(leaf: str) -> bool:
+    filename, _, qualname = leaf.partition(":")
+    return (filename, qualname) in _IDLE_LEAVES
+
+
+profiler = SamplingProfiler()
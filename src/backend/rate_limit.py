@@ -0,0 +1,155 @@
+import asyncio
+import heapq
+import itertools
+import time
+from collections.abc import Mapping
+from datetime import datetime, timezone
+from enum import IntEnum
+from typing import Any
+
+
+class Priority(IntEnum):
+    """Lower value goes first when callers are waiting for a token."""
+
+    INTERACTIVE = 0  # detail / search calls a user is waiting on
+    AUTOCOMPLETE = 1
+    BACKGROUND = 2  # prefetch and cache refreshes
+
+
+class TokenBucket:
+    """
+    Async token bucket with priority classes. Refills at `rate` tokens per
+    second up to `capacity`; waiting callers are served lowest priority value
+    first, FIFO within a priority.
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._seq = itertools.count()
+        self._timer: asyncio.TimerHandle | None = None
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    @property
+    def level(self) -> float:
+        self._refill()
+        return self._tokens
+
+    @property
+    def waiting(self) -> int:
+        return sum(1 for _, _, fut in self._waiters if not fut.done())
+
+    def try_acquire(self) -> bool:
+        """Take a token only if one is free right now and nobody is queued."""
+        self._refill()
+        if not self._waiters and self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+    async def acquire(self, priority: int = Priority.INTERACTIVE) -> None:
+        self._refill()
+        if not self._waiters and self._tokens >= 1:
+            self._tokens -= 1
+            return
+
+        fut: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), fut))
+        self._schedule()
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # Granted a token but the caller went away: give it back
+                self._tokens += 1
+                self._schedule()
+            raise
+
+    def _dispatch(self) -> None:
+        self._timer = None
+        self._refill()
+        while self._waiters and self._tokens >= 1:
+            _, _, fut = heapq.heappop(self._waiters)
+            if fut.done():  # cancelled while waiting
+                continue
+            self._tokens -= 1
+            fut.set_result(None)
+        self._schedule()
+
+    def _schedule(self) -> None:
+        while self._waiters and self._waiters[0][2].done():
+            heapq.heappop(self._waiters)
+        if self._timer is None and self._waiters:
+            delay = max(0.0, (1 - self._tokens) / self.rate)
+            self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+
+
+class DailyQuota:
+    """
+    Daily request budget. Counts locally and resyncs from upstream rate-limit
+    headers when present. As the budget runs low, lower priority classes are
+    refused first ("degraded"), then everything ("cache_only").
+    """
+
+    def __init__(self, limit: int, low_water: float = 0.1, critical: float = 0.02) -> None:
+        self.limit = limit
+        self.low_water = low_water
+        self.critical = critical
+        self._remaining = limit
+        self._day = self._today()
+
+    @staticmethod
+    def _today() -> str:
+        return datetime.now(timezone.utc).date().isoformat()
+
+    def _roll(self) -> None:
+        today = self._today()
+        if today != self._day:
+            self._day = today
+            self._remaining = self.limit
+
+    @property
+    def remaining(self) -> int:
+        self._roll()
+        return self._remaining
+
+    @property
+    def mode(self) -> str:
+        remaining = self.remaining
+        if remaining <= self.limit * self.critical:
+            return "cache_only"
+        if remaining <= self.limit * self.low_water:
+            return "degraded"
+        return "normal"
+
+    def allows(self, priority: int) -> bool:
+        mode = self.mode
+        if mode == "cache_only":
+            return False
+        if mode == "degraded":
+            return priority == Priority.INTERACTIVE
+        return True
+
+    def consume(self) -> None:
+        self._roll()
+        self._remaining -= 1
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        """Resync from Yelp's RateLimit-DailyLimit / RateLimit-Remaining headers."""
+        try:
+            if "ratelimit-dailylimit" in headers:
+                self.limit = int(headers["ratelimit-dailylimit"])
+            if "ratelimit-remaining" in headers:
+                self._remaining = int(headers["ratelimit-remaining"])
+        except ValueError:
+            pass
+
+    def stats(self) -> dict[str, Any]:
+        return {"limit": self.limit, "remaining": self.remaining, "mode": self.mode}
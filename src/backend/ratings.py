@@ -0,0 +1,73 @@
+from collections.abc import Iterable
+from typing import Any
+
+from models import RestaurantRatingAggregate
+
+# Per-restaurant rating aggregates, maintained alongside every review write
+RATINGS_COLLECTION = "restaurant_ratings"
+
+
+def rating_bucket(rating: float) -> str:
+    """Star bucket for the histogram: "4" holds ratings 4.0 - 4.9, "5" holds 5."""
+    return str(min(5, max(0, int(rating))))
+
+
+def empty_aggregate() -> dict[str, Any]:
+    return {"review_count": 0, "rating_sum": 0.0, "histogram": {}, "last_review_at": None}
+
+
+def add_review(
+    aggregate: dict[str, Any], rating: float, sign: int, created_at: str | None = None
+) -> dict[str, Any]:
+    """Count (sign=1) or uncount (sign=-1) one review in `aggregate`, in place."""
+    count = max(0, aggregate.get("review_count", 0) + sign)
+    aggregate["review_count"] = count
+    # Reset rather than accumulate float error once the last review is gone
+    aggregate["rating_sum"] = aggregate.get("rating_sum", 0.0) + sign * rating if count else 0.0
+    histogram = aggregate.setdefault("histogram", {})
+    bucket = rating_bucket(rating)
+    histogram[bucket] = histogram.get(bucket, 0) + sign
+    if histogram[bucket] <= 0:
+        del histogram[bucket]
+    last = aggregate.get("last_review_at")
+    if sign > 0 and created_at is not None and (last is None or created_at > last):
+        aggregate["last_review_at"] = created_at
+    return aggregate
+
+
+def aggregate_from_reviews(reviews: Iterable[dict[str, Any]]) -> dict[str, Any]:
+    aggregate = empty_aggregate()
+    for review in reviews:
+        add_review(aggregate, review["rating"], 1, review.get("created_at"))
+    return aggregate
+
+
+def read_aggregate(db: Any, transaction: Any, restaurant_id: str) -> dict[str, Any]:
+    """
+    The restaurant's aggregate as seen by `transaction`. Restaurants reviewed
+    before aggregates existed have none: rebuild it from their reviews in the
+    same transaction, so the caller can write the updated value back.
+    """
+    ref = db.collection(RATINGS_COLLECTION).document(restaurant_id)
+    snapshot = ref.get(transaction=transaction)
+    data = snapshot.to_dict() if snapshot.exists else None
+    if data is not None and "review_count" in data and "rating_sum" in data:
+        return {**empty_aggregate(), **data}
+    query = db.collection("reviews").where("restaurant_id", "==", restaurant_id)
+    return aggregate_from_reviews(doc.to_dict() for doc in query.stream(transaction=transaction))
+
+
+def to_rating_aggregate(
+    restaurant_id: str, data: dict[str, Any] | None
+) -> RestaurantRatingAggregate:
+    data = data or {}
+    count = data.get("review_count", 0)
+    rating_sum = data.get("rating_sum", 0.0)
+    return RestaurantRatingAggregate(
+        restaurant_id=restaurant_id,
+        review_count=count,
+        rating_sum=rating_sum,
+        average_rating=round(rating_sum / count, 2) if count > 0 else None,
+        histogram={k: v for k, v in data.get("histogram", {}).items() if v},
+        last_review_at=data.get("last_review_at"),
+    )
@@ -0,0 +1,72 @@
+import functools
+import os
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+from pydantic_core import to_jsonable_python
+from starlette.responses import Response
+
+from tracing import span
+
+try:
+    import orjson
+except ImportError:  # listed in requirements.txt; pydantic-core serializes without it
+    orjson = None  # type: ignore[assignment]
+
+# Opt-in fast response path for handlers returning already built models: check
+# them against the route's response_model and write JSON bytes in one pass
+FAST_JSON_ENABLED = os.getenv("FAST_JSON", "0") == "1"
+
+
+@functools.cache
+def _adapter(model: Any) -> TypeAdapter[Any]:
+    return TypeAdapter(model)
+
+
+def _is_model_content(content: Any) -> bool:
+    if isinstance(content, list):
+        return bool(content) and isinstance(content[0], BaseModel)
+    return isinstance(content, BaseModel)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response for a route's `model` (its response_model). Content is
+    validated against the model as FastAPI would, but instances of the declared
+    models pass by type check instead of being rebuilt. Models are then written
+    straight to JSON bytes by pydantic-core through the model's serializer, so
+    fields outside the response_model are filtered out and aliases applied;
+    plain dicts and lists go through orjson when it is installed.
+    """
+
+    def __init__(self, content: Any, model: Any, **kwargs: Any) -> None:
+        self.model = model
+        super().__init__(content, **kwargs)
+
+    def render(self, content: Any) -> bytes:
+        with span("serialize"):
+            adapter = _adapter(self.model)
+            content = adapter.validate_python(content)
+            if orjson is not None and not _is_model_content(content):
+                rendered: bytes = orjson.dumps(content, default=to_jsonable_python)
+                return rendered
+            return adapter.dump_json(content, by_alias=True)
+
+
+def fast_response(content: Any, model: Any, response: Response | None = None) -> Any:
+    """
+    Return `content` through the fast path when FAST_JSON=1, otherwise unchanged
+    so FastAPI validates and serializes it against the route's response_model.
+
+    `model` must be the route's response_model: returning a Response makes
+    FastAPI skip its own response_model handling, so FastJSONResponse does it.
+    Headers set on the injected `response` parameter (e.g. X-Next-Cursor) are
+    carried over.
+    """
+    if not FAST_JSON_ENABLED:
+        return content
+    headers = None
+    if response is not None:
+        headers = {k: v for k, v in response.headers.items() if k != "content-length"}
+    return FastJSONResponse(content, model, headers=headers)
@@ -0,0 +1,307 @@
+import math
+import os
+import re
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
+from typing import Any
+
+from compact import CompactBusiness
+from geo import haversine_m
+
+SEARCH_INDEX_MAX_DOCS = int(os.getenv("SEARCH_INDEX_MAX_DOCS", "50000"))
+# Businesses not seen in a Yelp response for this long are not served locally
+SEARCH_INDEX_MAX_AGE = float(os.getenv("SEARCH_INDEX_MAX_AGE", str(24 * 60 * 60)))
+# Grid cell size in degrees (~2.2km of latitude) and search radius around the caller
+SEARCH_INDEX_CELL_DEGREES = float(os.getenv("SEARCH_INDEX_CELL_DEGREES", "0.02"))
+SEARCH_INDEX_RADIUS_M = float(os.getenv("SEARCH_INDEX_RADIUS_M", "2000"))
+# How often each worker reloads the local `restaurants` collection, picking up
+# restaurants created through other workers
+LOCAL_INDEX_REFRESH_INTERVAL = float(os.getenv("LOCAL_INDEX_REFRESH_INTERVAL", "300"))
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Terms that match every restaurant (e.g. list_restaurants searches for "restaurants")
+GENERIC_TERMS = {"restaurant", "restaurants", "food"}
+LOCATION_ALIASES = {"nyc": "new york", "sf": "san francisco", "la": "los angeles"}
+
+
+def tokenize(text: str | None) -> set[str]:
+    return set(_TOKEN_RE.findall(text.lower())) if text else set()
+
+
+def _location_tokens(location: str | None) -> set[str]:
+    if not location:
+        return set()
+    return tokenize(LOCATION_ALIASES.get(location.strip().lower(), location))
+
+
+def _intersect(postings: dict[str, set[str]], tokens: Iterable[str]) -> set[str]:
+    result: set[str] | None = None
+    for token in tokens:
+        ids = postings.get(token, set())
+        result = set(ids) if result is None else result & ids
+        if not result:
+            break
+    return result or set()
+
+
+def _discard(postings: dict[Any, set[str]], keys: Iterable[Any], business_id: str) -> None:
+    for key in keys:
+        ids = postings.get(key)
+        if ids is not None:
+            ids.discard(business_id)
+            if not ids:
+                del postings[key]
+
+
+class _Doc:
+    __slots__ = ("business", "name_tokens", "tokens", "location_tokens", "cell", "seen_at")
+
+    def __init__(
+        self,
+        business: CompactBusiness,
+        name_tokens: set[str],
+        tokens: set[str],
+        location_tokens: set[str],
+        cell: tuple[int, int] | None,
+    ) -> None:
+        self.business = business
+        self.name_tokens = name_tokens
+        self.tokens = tokens
+        self.location_tokens = location_tokens
+        self.cell = cell
+        self.seen_at = time.monotonic()
+
+
+class RestaurantSearchIndex:
+    """
+    In-process inverted index (name, categories, address tokens) plus a spatial
+    grid over coordinates. Fed only from Yelp search responses, so every hit is
+    a Yelp business the detail endpoints can resolve; businesses are held as
+    CompactBusiness records and returned as instances of `model` (YelpBusiness).
+    Local `restaurants` documents live in LocalRestaurantIndex instead.
+    """
+
+    def __init__(
+        self,
+        model: Any,
+        max_docs: int = SEARCH_INDEX_MAX_DOCS,
+        max_age: float = SEARCH_INDEX_MAX_AGE,
+        cell_degrees: float = SEARCH_INDEX_CELL_DEGREES,
+        radius_m: float = SEARCH_INDEX_RADIUS_M,
+    ) -> None:
+        self.model = model
+        self.max_docs = max_docs
+        self.max_age = max_age
+        self.cell_degrees = cell_degrees
+        self.radius_m = radius_m
+        self._docs: OrderedDict[str, _Doc] = OrderedDict()
+        # token -> business IDs, for name/category tokens and address tokens separately
+        self._postings: dict[str, set[str]] = {}
+        self._location_postings: dict[str, set[str]] = {}
+        self._cells: dict[tuple[int, int], set[str]] = {}
+        self.local_answers = 0
+        self.fallthroughs = 0
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def _cell(self, latitude: float, longitude: float) -> tuple[int, int]:
+        return (
+            math.floor(latitude / self.cell_degrees),
+            math.floor(longitude / self.cell_degrees),
+        )
+
+    def add(self, business: Any) -> CompactBusiness:
+        """Index (or re-index) a YelpBusiness. Returns the stored compact record."""
+        record = business if isinstance(business, CompactBusiness) else CompactBusiness(business)
+        self.remove(record.id)
+
+        location = record.location_dict()
+        address = " ".join(location.get("display_address") or [])
+        location_tokens = tokenize(address) | tokenize(location.get("city"))
+        name_tokens = tokenize(record.name)
+        tokens = set(name_tokens)
+        for category in record.categories:
+            fields = dict(category)
+            tokens |= tokenize(fields.get("title")) | tokenize(fields.get("alias"))
+
+        cell = self._cell(record.latitude, record.longitude) if record.has_coordinates else None
+
+        self._docs[record.id] = _Doc(record, name_tokens, tokens, location_tokens, cell)
+        for token in tokens:
+            self._postings.setdefault(token, set()).add(record.id)
+        for token in location_tokens:
+            self._location_postings.setdefault(token, set()).add(record.id)
+        if cell is not None:
+            self._cells.setdefault(cell, set()).add(record.id)
+
+        while len(self._docs) > self.max_docs:
+            self.remove(next(iter(self._docs)))
+        return record
+
+    def add_many(self, businesses: Iterable[Any]) -> list[CompactBusiness]:
+        return [self.add(business) for business in businesses]
+
+    def remove(self, business_id: str) -> None:
+        doc = self._docs.pop(business_id, None)
+        if doc is None:
+            return
+        _discard(self._postings, doc.tokens, business_id)
+        _discard(self._location_postings, doc.location_tokens, business_id)
+        if doc.cell is not None:
+            _discard(self._cells, [doc.cell], business_id)
+
+    def _nearby_ids(self, latitude: float, longitude: float) -> set[str]:
+        row, col = self._cell(latitude, longitude)
+        # Enough neighboring cells to cover the search radius
+        span = math.ceil(self.radius_m / (self.cell_degrees * 111_000)) + 1
+        ids: set[str] = set()
+        for d_row in range(-span, span + 1):
+            for d_col in range(-span, span + 1):
+                ids |= self._cells.get((row + d_row, col + d_col), set())
+        return ids
+
+    def search(
+        self,
+        term: str | None,
+        location: str | None = None,
+        latitude: float | None = None,
+        longitude: float | None = None,
+        limit: int = 20,
+        min_results: int | None = None,
+    ) -> tuple[list[Any], int] | None:
+        """
+        Answer a search locally: the first `limit` matches and how many fresh
+        matches there are in all. Returns None (fall through to Yelp) unless at
+        least `min_results` (default: a full page of `limit`) exist.
+        """
+        # Every query token must match (AND); a search is always scoped to an area
+        term_tokens = tokenize(term) - GENERIC_TERMS
+        distances: dict[str, float] = {}
+        if latitude is not None and longitude is not None:
+            candidates = self._nearby_ids(latitude, longitude)
+        elif location:
+            candidates = _intersect(self._location_postings, _location_tokens(location))
+        else:
+            candidates = set()
+        if term_tokens:
+            candidates &= _intersect(self._postings, term_tokens)
+
+        if latitude is not None and longitude is not None:
+            for business_id in candidates:
+                record = self._docs[business_id].business
+                distances[business_id] = haversine_m(
+                    latitude, longitude, record.latitude, record.longitude
+                )
+            candidates = {bid for bid in candidates if distances[bid] <= self.radius_m}
+
+        now = time.monotonic()
+        docs = [
+            self._docs[business_id]
+            for business_id in candidates
+            if now - self._docs[business_id].seen_at <= self.max_age
+        ]
+        if len(docs) < (limit if min_results is None else min_results):
+            self.fallthroughs += 1
+            return None
+
+        # Name matches first, then better rated / more reviewed, then nearer
+        docs.sort(
+            key=lambda doc: (
+                -len(term_tokens & doc.name_tokens),
+                -doc.business.rating,
+                -doc.business.review_count,
+                distances.get(doc.business.id, 0.0),
+            )
+        )
+        self.local_answers += 1
+        page = [
+            doc.business.to_model(self.model, distances.get(doc.business.id))
+            for doc in docs[:limit]
+        ]
+        return page, len(docs)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "documents": len(self._docs),
+            "tokens": len(self._postings) + len(self._location_postings),
+            "cells": len(self._cells),
+            "local_answers": self.local_answers,
+            "fallthroughs": self.fallthroughs,
+        }
+
+
+class LocalRestaurantIndex:
+    """
+    Inverted index over the local `restaurants` collection (cuisine_type and
+    address tokens). These documents have no coordinates, so a search is
+    scoped by address tokens rather than a grid. They never age out: each
+    worker reloads the collection every LOCAL_INDEX_REFRESH_INTERVAL and adds
+    its own writes straight away. Holds RestaurantResponse models.
+    """
+
+    def __init__(self) -> None:
+        self._docs: dict[str, Any] = {}
+        self._cuisine_postings: dict[str, set[str]] = {}
+        self._location_postings: dict[str, set[str]] = {}
+        self.local_answers = 0
+        self.fallthroughs = 0
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def add(self, restaurant: Any) -> None:
+        """Index (or re-index) a RestaurantResponse."""
+        self.remove(restaurant.id)
+        self._docs[restaurant.id] = restaurant
+        for token in tokenize(restaurant.cuisine_type):
+            self._cuisine_postings.setdefault(token, set()).add(restaurant.id)
+        for token in tokenize(restaurant.address):
+            self._location_postings.setdefault(token, set()).add(restaurant.id)
+
+    def replace_all(self, restaurants: Iterable[Any]) -> None:
+        """Swap in a fresh copy of the collection, dropping deleted restaurants."""
+        self._docs.clear()
+        self._cuisine_postings.clear()
+        self._location_postings.clear()
+        for restaurant in restaurants:
+            self.add(restaurant)
+
+    def remove(self, restaurant_id: str) -> None:
+        restaurant = self._docs.pop(restaurant_id, None)
+        if restaurant is None:
+            return
+        _discard(self._cuisine_postings, tokenize(restaurant.cuisine_type), restaurant_id)
+        _discard(self._location_postings, tokenize(restaurant.address), restaurant_id)
+
+    def search(
+        self, cuisine_type: str | None = None, location: str | None = None, limit: int = 20
+    ) -> list[Any]:
+        """Newest restaurants matching every token of `cuisine_type` and `location`."""
+        candidates = set(self._docs)
+        cuisine_tokens = tokenize(cuisine_type)
+        if cuisine_tokens:
+            candidates &= _intersect(self._cuisine_postings, cuisine_tokens)
+        location_tokens = _location_tokens(location)
+        if location_tokens:
+            candidates &= _intersect(self._location_postings, location_tokens)
+        if candidates:
+            self.local_answers += 1
+        else:
+            self.fallthroughs += 1
+        restaurants = sorted(
+            (self._docs[restaurant_id] for restaurant_id in candidates),
+            key=lambda restaurant: (restaurant.created_at, restaurant.id),
+            reverse=True,
+        )
+        return restaurants[:limit]
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "documents": len(self._docs),
+            "tokens": len(self._cuisine_postings) + len(self._location_postings),
+            "local_answers": self.local_answers,
+            "fallthroughs": self.fallthroughs,
+        }
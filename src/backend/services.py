@@ -0,0 +1,216 @@
+"""
+Injectable handles to the external services: the Firestore client, the
+Firebase auth API and the Yelp base URL. Production builds the real clients
+from serviceAccountKey.json and sign in through the identity toolkit REST API
+(identity_toolkit.py); tests and load runs call
+configure() (or set FAKE_BACKENDS=1) before importing main.
+
+Nothing is built at import time. start_warm_up() builds the clients and
+imports the Firestore SDK in a worker thread, and requests await ready() before
+touching them, so the event loop neither blocks on nor builds them itself.
+Scripts that never start the warm-up get each client built on first use.
+"""
+
+import asyncio
+import inspect
+import os
+import threading
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from dotenv import load_dotenv
+
+# main imports this module first, so .env applies to every module's settings
+load_dotenv()
+
+FIREBASE_CREDENTIALS = os.getenv("FIREBASE_CREDENTIALS", "serviceAccountKey.json")
+# Run against the in-memory fakes in fakes/ instead of Firebase (no credentials needed)
+FAKE_BACKENDS = os.getenv("FAKE_BACKENDS", "0") == "1"
+
+# First use from a request may race the lifespan warm-up thread
+_lock = threading.RLock()
+_firebase_app: Any = None
+_firestore_client: Any = None
+_auth: Any = None
+_firestore_module: Any = None
+_warm_up: "asyncio.Future[None] | None" = None
+# Sync or async (email, password) -> {"idToken": ...}
+SignIn = Callable[[str, str], dict[str, Any] | Awaitable[dict[str, Any]]]
+_sign_in: SignIn | None = None
+
+
+class Lazy:
+    """Module-level stand-in that builds its client on first attribute access."""
+
+    def __init__(self, factory: Callable[[], Any]) -> None:
+        self._factory = factory
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._factory(), name)
+
+
+def configure(
+    firestore_client: Any = None,
+    auth: Any = None,
+    sign_in: SignIn | None = None,
+    yelp_base_url: str | None = None,
+    identity_toolkit_base_url: str | None = None,
+) -> None:
+    """
+    Override any of the service handles. `auth` must look like the
+    firebase_admin.auth module (verify_id_token, create_user, update_user and
+    the *Error classes); `sign_in(email, password)` returns (or resolves to)
+    the identity toolkit's {"idToken": ...} dict. Call before main is imported.
+    """
+    global _firestore_client, _auth, _sign_in
+    if firestore_client is not None:
+        _firestore_client = firestore_client
+    if auth is not None:
+        _auth = auth
+    if sign_in is not None:
+        _sign_in = sign_in
+    if yelp_base_url is not None:
+        from yelp_api_client import yelp_client
+
+        # Takes effect when the pooled client is (re)opened by yelp_client.start()
+        yelp_client.base_url = yelp_base_url
+    if identity_toolkit_base_url is not None:
+        from identity_toolkit import identity_client
+
+        identity_client.base_url = identity_toolkit_base_url
+
+
+def use_fakes(yelp_base_url: str | None = None) -> Any:
+    """Wire in a fresh FakeFirestore and FakeAuth; returns (db, auth) for seeding."""
+    from fakes.auth import FakeAuth
+    from fakes.firestore import FakeFirestore
+
+    db, auth = FakeFirestore(), FakeAuth()
+    configure(
+        firestore_client=db,
+        auth=auth,
+        sign_in=auth.sign_in_with_email_and_password,
+        yelp_base_url=yelp_base_url,
+    )
+    return db, auth
+
+
+def uses_firebase_auth() -> bool:
+    """True when tokens are verified by the real Firebase Admin SDK."""
+    if _auth is None:
+        # Not built yet; answer without importing firebase_admin
+        return not FAKE_BACKENDS
+    return getattr(_auth, "__name__", None) == "firebase_admin.auth"
+
+
+def _init_firebase_admin() -> None:
+    global _firebase_app
+    import firebase_admin
+    from firebase_admin import credentials
+
+    if not firebase_admin._apps:
+        _firebase_app = firebase_admin.initialize_app(credentials.Certificate(FIREBASE_CREDENTIALS))
+
+
+def firestore_client() -> Any:
+    global _firestore_client
+    if _firestore_client is None:
+        with _lock:
+            if _firestore_client is not None:
+                pass
+            elif FAKE_BACKENDS:
+                from fakes.firestore import FakeFirestore
+
+                _firestore_client = FakeFirestore()
+            else:
+                from firebase_admin import firestore
+
+                _init_firebase_admin()
+                _firestore_client = firestore.client()
+    return _firestore_client
+
+
+def auth_api() -> Any:
+    global _auth
+    if _auth is None:
+        with _lock:
+            if _auth is not None:
+                pass
+            elif FAKE_BACKENDS:
+                from fakes.auth import FakeAuth
+
+                _auth = FakeAuth()
+            else:
+                from firebase_admin import auth
+
+                _init_firebase_admin()
+                _auth = auth
+    return _auth
+
+
+async def sign_in(email: str, password: str) -> dict[str, Any]:
+    """Email/password sign-in returning the identity toolkit's response dict (with idToken)."""
+    global _sign_in
+    if _sign_in is None:
+        if FAKE_BACKENDS:
+            _sign_in = auth_api().sign_in_with_email_and_password
+        else:
+            from identity_toolkit import identity_client
+
+            _sign_in = identity_client.sign_in_with_email_and_password
+    result = _sign_in(email, password)
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+def firestore_module() -> Any:
+    """firebase_admin.firestore: transforms (ArrayUnion), Query and transactional()."""
+    global _firestore_module
+    if _firestore_module is None:
+        from firebase_admin import firestore
+
+        _firestore_module = firestore
+    return _firestore_module
+
+
+def warm_up() -> None:
+    """Build the Firestore client and auth API and import the SDK. Blocking."""
+    firestore_client()
+    auth_api()
+    firestore_module()
+
+
+def start_warm_up() -> "asyncio.Future[None]":
+    """Run warm_up() in the default executor (once; again after a failure)."""
+    global _warm_up
+    loop = asyncio.get_running_loop()
+    if _warm_up is None or (
+        # Failed, or still pending on an event loop that has since gone away
+        _warm_up.exception() is not None if _warm_up.done() else _warm_up.get_loop() is not loop
+    ):
+        _warm_up = loop.run_in_executor(None, warm_up)
+    return _warm_up
+
+
+async def ready() -> None:
+    """Wait, without blocking the event loop, until warm_up() has finished."""
+    warm_up_future = start_warm_up()
+    if not warm_up_future.done():
+        await asyncio.shield(warm_up_future)
+    # Raises the warm-up error, if any; the next call retries
+    warm_up_future.result()
+
+
+def shutdown() -> None:
+    """Close the Firestore channels and release the Firebase app, if they were built."""
+    global _firebase_app
+    with _lock:
+        close = getattr(_firestore_client, "close", None)
+        if close is not None:
+            close()
+        if _firebase_app is not None:
+            import firebase_admin
+
+            firebase_admin.delete_app(_firebase_app)
+            _firebase_app = None
@@ -0,0 +1,383 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+from typing import Any
+from urllib.parse import urlsplit
+
+from cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# "memory://" (default, per process) or "redis://[:password@]host:port/db"
+CACHE_BACKEND_URL = os.getenv("CACHE_BACKEND_URL", "memory://")
+# Channel carrying invalidation messages between workers
+INVALIDATION_CHANNEL = os.getenv("CACHE_INVALIDATION_CHANNEL", "crowdfork:invalidate")
+# How often the in-memory backend sweeps out expired keys nobody read again
+MEMORY_SWEEP_INTERVAL = 30.0
+# Invalidation counters per SharedCache; keys hash onto them (see generation())
+GENERATION_STRIPES = 1024
+
+# Called with an invalidated key, or None when messages may have been lost
+# (e.g. the subscription reconnected) and every local copy should be dropped
+InvalidationHandler = Callable[[str | None], None]
+
+
+class CacheBackend(ABC):
+    """
+    Shared cache tier interface: byte values with a TTL, plus pub/sub so each
+    worker can drop its local copies when another worker invalidates a key.
+    """
+
+    # True when every worker sees the same entries (and invalidations)
+    shared = True
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes | None: ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float) -> None: ...
+
+    @abstractmethod
+    async def delete(self, *keys: str) -> None: ...
+
+    @abstractmethod
+    async def publish(self, channel: str, message: str) -> None: ...
+
+    @abstractmethod
+    async def subscribe(self, channel: str, handler: InvalidationHandler) -> None:
+        """Start delivering `channel` messages to `handler` in the background."""
+
+    @abstractmethod
+    async def close(self) -> None: ...
+
+
+class InMemoryBackend(CacheBackend):
+    """Single-process backend; pub/sub messages are delivered within the process."""
+
+    shared = False
+
+    def __init__(self, sweep_interval: float = MEMORY_SWEEP_INTERVAL) -> None:
+        self._data: dict[str, tuple[bytes, float]] = {}
+        self._handlers: dict[str, list[InvalidationHandler]] = {}
+        self.sweep_interval = sweep_interval
+        self._next_sweep = time.monotonic() + sweep_interval
+
+    async def get(self, key: str) -> bytes | None:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= time.monotonic():
+            del self._data[key]
+            return None
+        return entry[0]
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        now = time.monotonic()
+        self._data[key] = (value, now + ttl)
+        if now >= self._next_sweep:
+            self._sweep(now)
+
+    def _sweep(self, now: float) -> None:
+        self._data = {k: entry for k, entry in self._data.items() if entry[1] > now}
+        self._next_sweep = now + self.sweep_interval
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._data.pop(key, None)
+
+    async def publish(self, channel: str, message: str) -> None:
+        for handler in self._handlers.get(channel, []):
+            handler(message)
+
+    async def subscribe(self, channel: str, handler: InvalidationHandler) -> None:
+        self._handlers.setdefault(channel, []).append(handler)
+
+    async def close(self) -> None:
+        self._data.clear()
+        self._handlers.clear()
+
+
+class RedisError(Exception):
+    """Error reply from a Redis-protocol server."""
+
+
+def _encode_command(args: tuple[Any, ...]) -> bytes:
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        data = arg if isinstance(arg, bytes) else str(arg).encode()
+        parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(parts)
+
+
+async def _read_reply(reader: asyncio.StreamReader) -> Any:
+    line = await reader.readuntil(b"\r\n")
+    kind, body = line[:1], line[1:-2]
+    if kind == b"+":
+        return body.decode()
+    if kind == b"-":
+        raise RedisError(body.decode())
+    if kind == b":":
+        return int(body)
+    if kind == b"$":
+        length = int(body)
+        if length < 0:
+            return None
+        data = await reader.readexactly(length + 2)
+        return data[:-2]
+    if kind == b"*":
+        count = int(body)
+        if count < 0:
+            return None
+        return [await _read_reply(reader) for _ in range(count)]
+    raise RedisError(f"Unexpected reply: {line!r}")
+
+
+class _RedisConnection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.reader = reader
+        self.writer = writer
+
+    async def execute(self, *args: Any) -> Any:
+        self.writer.write(_encode_command(args))
+        await self.writer.drain()
+        return await _read_reply(self.reader)
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class RedisBackend(CacheBackend):
+    """
+    Minimal asyncio client for the Redis protocol (RESP2): GET/SET PX/DEL,
+    PUBLISH and SUBSCRIBE over a small connection pool. Works against Redis,
+    Valkey, KeyDB or any compatible stand-in.
+    """
+
+    def __init__(self, url: str, pool_size: int = 8, timeout: float = 1.0) -> None:
+        parts = urlsplit(url)
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port or 6379
+        self.password = parts.password
+        self.db = int(parts.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self._idle: list[_RedisConnection] = []
+        self._slots = asyncio.Semaphore(pool_size)
+        self._listeners: list[asyncio.Task[None]] = []
+
+    async def _connect(self) -> _RedisConnection:
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.timeout
+        )
+        conn = _RedisConnection(reader, writer)
+        if self.password:
+            await conn.execute("AUTH", self.password)
+        if self.db:
+            await conn.execute("SELECT", self.db)
+        return conn
+
+    async def execute(self, *args: Any) -> Any:
+        async with self._slots:
+            conn = self._idle.pop() if self._idle else await self._connect()
+            try:
+                reply = await asyncio.wait_for(conn.execute(*args), self.timeout)
+            except RedisError:
+                self._idle.append(conn)  # the connection itself is fine
+                raise
+            except BaseException:
+                # Timed out or broken mid-reply: the stream position is unknown
+                conn.close()
+                raise
+            self._idle.append(conn)
+            return reply
+
+    async def get(self, key: str) -> bytes | None:
+        value: bytes | None = await self.execute("GET", key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self.execute("SET", key, value, "PX", max(1, int(ttl * 1000)))
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self.execute("DEL", *keys)
+
+    async def publish(self, channel: str, message: str) -> None:
+        await self.execute("PUBLISH", channel, message)
+
+    async def subscribe(self, channel: str, handler: InvalidationHandler) -> None:
+        self._listeners.append(asyncio.create_task(self._listen(channel, handler)))
+
+    async def _listen(self, channel: str, handler: InvalidationHandler) -> None:
+        # A dedicated connection; reconnects forever with a capped backoff
+        delay = 0.1
+        while True:
+            conn: _RedisConnection | None = None
+            try:
+                conn = await self._connect()
+                await conn.execute("SUBSCRIBE", channel)
+                delay = 0.1
+                # Anything published while we were disconnected is lost
+                handler(None)
+                while True:
+                    reply = await _read_reply(conn.reader)
+                    if isinstance(reply, list) and reply[0] == b"message":
+                        handler(reply[2].decode())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Cache invalidation subscription lost: %s", e)
+            finally:
+                if conn is not None:
+                    conn.close()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 5.0)
+
+    async def close(self) -> None:
+        for task in self._listeners:
+            task.cancel()
+        await asyncio.gather(*self._listeners, return_exceptions=True)
+        self._listeners.clear()
+        while self._idle:
+            self._idle.pop().close()
+
+
+def backend_from_url(url: str = CACHE_BACKEND_URL) -> CacheBackend:
+    scheme = urlsplit(url).scheme
+    if scheme in ("redis", "valkey"):
+        return RedisBackend(url)
+    if scheme in ("", "memory"):
+        return InMemoryBackend()
+    raise ValueError(f"Unsupported cache backend: {url}")
+
+
+class SharedCache:
+    """
+    Two-tier JSON cache for one namespace: a short-lived per-worker TTLCache in
+    front of the shared backend. invalidate() deletes the shared entry and
+    publishes the key, so every worker drops its local copy. Backend errors
+    are logged and treated as misses; the cache never fails a request.
+
+    A read-through caller takes generation() before loading the value and
+    passes it to set(): if the key was invalidated in between (here or, via
+    pub/sub, in another worker), the possibly stale value is not cached.
+
+    With enabled=False every get() misses and set() / invalidate() do nothing.
+    """
+
+    def __init__(
+        self,
+        backend: CacheBackend,
+        namespace: str,
+        ttl: float = 60,
+        local_ttl: float = 5,
+        local_max_entries: int = 10000,
+        channel: str = INVALIDATION_CHANNEL,
+        enabled: bool = True,
+    ) -> None:
+        self.backend = backend
+        self.namespace = namespace
+        self.ttl = ttl
+        self.local_ttl = local_ttl
+        self.channel = channel
+        self.enabled = enabled
+        self._local = TTLCache(max_entries=local_max_entries, max_bytes=64 * 1024 * 1024)
+        # Invalidation counters, striped by key hash; _epoch counts "drop everything"
+        self._generations = [0] * GENERATION_STRIPES
+        self._epoch = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.invalidations_received = 0
+        self.stale_writes_skipped = 0
+        self.errors = 0
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    async def start(self) -> None:
+        if self.enabled:
+            await self.backend.subscribe(self.channel, self._on_invalidate)
+
+    def generation(self, key: str) -> tuple[int, int]:
+        """Changes whenever `key` (or a key sharing its stripe) is invalidated."""
+        return self._epoch, self._generations[hash(key) % GENERATION_STRIPES]
+
+    def _bump(self, key: str) -> None:
+        self._generations[hash(key) % GENERATION_STRIPES] += 1
+
+    def _on_invalidate(self, message: str | None) -> None:
+        self.invalidations_received += 1
+        if message is None:
+            self._epoch += 1
+            self._local.clear()
+            return
+        namespace, _, key = message.partition(":")
+        if namespace == self.namespace:
+            self._bump(key)
+            self._local.delete(key)
+
+    async def get(self, key: str) -> Any | None:
+        if not self.enabled:
+            return None
+        value = self._local.get(key)
+        if value is not None:
+            return value
+        try:
+            raw = await self.backend.get(self._key(key))
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Shared cache read failed for %s: %s", self._key(key), e)
+            return None
+        if raw is None:
+            self.misses += 1
+            return None
+        self.shared_hits += 1
+        value = json.loads(raw)
+        self._local.set(key, value, ttl=self.local_ttl, size=len(raw))
+        return value
+
+    async def set(self, key: str, value: Any, generation: tuple[int, int] | None = None) -> None:
+        if not self.enabled:
+            return
+        if generation is not None and generation != self.generation(key):
+            # Invalidated while the caller was loading `value`
+            self.stale_writes_skipped += 1
+            return
+        raw = json.dumps(value, default=str).encode()
+        self._local.set(key, value, ttl=self.local_ttl, size=len(raw))
+        try:
+            await self.backend.set(self._key(key), raw, self.ttl)
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Shared cache write failed for %s: %s", self._key(key), e)
+
+    async def invalidate(self, key: str) -> None:
+        """Drop `key` here, in the shared tier, and (via pub/sub) in every other worker."""
+        if not self.enabled:
+            return
+        self._bump(key)
+        self._local.delete(key)
+        try:
+            await self.backend.delete(self._key(key))
+            await self.backend.publish(self.channel, self._key(key))
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Shared cache invalidation failed for %s: %s", self._key(key), e)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "backend": type(self.backend).__name__,
+            "enabled": self.enabled,
+            "local": self._local.stats(),
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "invalidations_received": self.invalidations_received,
+            "stale_writes_skipped": self.stale_writes_skipped,
+            "errors": self.errors,
+        }
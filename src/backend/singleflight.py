@@ -0,0 +1,49 @@
+import asyncio
+from collections.abc import Callable, Coroutine, Hashable
+from typing import Any
+
+from tracing import detached_task, span
+
+
+class SingleFlight:
+    """
+    De-duplicates concurrent calls that share a key.
+    The first caller runs the coroutine; callers that arrive while it is still
+    in flight await the same task and get the same result (or exception).
+    The task runs outside the first caller's trace, since it serves them all;
+    each caller's wait for it is timed as tracing `phase` instead.
+    """
+
+    def __init__(self, phase: str | None = None) -> None:
+        self.phase = phase
+        self._inflight: dict[Hashable, asyncio.Task[Any]] = {}
+        self.calls = 0
+        self.shared = 0
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: Hashable, fn: Callable[[], Coroutine[Any, Any, Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            self.calls += 1
+            task = detached_task(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._forget(key, task))
+        else:
+            self.shared += 1
+        # shield() so one waiter being cancelled does not cancel the shared call
+        if self.phase is None:
+            return await asyncio.shield(task)
+        with span(self.phase):
+            return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: "asyncio.Task[Any]") -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception as retrieved if every waiter went away
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict[str, int]:
+        return {"inflight": len(self._inflight), "calls": self.calls, "shared": self.shared}
@@ -0,0 +1,289 @@
+import asyncio
+import bisect
+import contextvars
+import functools
+import inspect
+import os
+import threading
+import time
+from collections.abc import Callable, Coroutine
+from contextvars import ContextVar
+from typing import Any, TypeVar
+
+from fastapi.routing import APIRoute
+
+# Per-request spans, Server-Timing headers and histograms on /metrics
+TRACING_ENABLED = os.getenv("TRACING", "1") == "1"
+# Prometheus' default latency buckets, in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+T = TypeVar("T")
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values, strict=True)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._lock = threading.Lock()
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for values, total in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labels, values)} {total:g}")
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus exposition format."""
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        # label values -> per-bucket counts (non-cumulative, last slot is +Inf)
+        self._counts: dict[tuple[str, ...], list[int]] = {}
+        self._sums: dict[tuple[str, ...], float] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.get(label_values)
+            if counts is None:
+                counts = self._counts[label_values] = [0] * (len(self.buckets) + 1)
+                self._sums[label_values] = 0.0
+            counts[index] += 1
+            self._sums[label_values] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((k, list(c), self._sums[k]) for k, c in self._counts.items())
+        for values, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts, strict=True):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                labels = _format_labels(self.labels, values, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labels, values)
+            lines.append(f"{self.name}_sum{labels} {total:.6f}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: list[Any] = []
+
+    def counter(self, name: str, help: str, labels: tuple[str, ...] = ()) -> Counter:
+        metric = Counter(name, help, labels)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help: str, labels: tuple[str, ...] = ()) -> Histogram:
+        metric = Histogram(name, help, labels)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+REQUEST_SECONDS = metrics.histogram(
+    "http_request_duration_seconds", "Time to handle a request.", ("method", "route")
+)
+PHASE_SECONDS = metrics.histogram(
+    "http_request_phase_duration_seconds",
+    "Time a request spent in each phase (auth, firestore, yelp, serialize).",
+    ("route", "phase"),
+)
+SPAN_SECONDS = metrics.histogram(
+    "span_duration_seconds", "Duration of individual Yelp/Firestore/auth calls.", ("span",)
+)
+REQUESTS_TOTAL = metrics.counter(
+    "http_requests_total", "Requests handled.", ("method", "route", "status")
+)
+
+
+class RequestTrace:
+    """Time spent per phase during one request. Concurrent spans both count."""
+
+    __slots__ = ("started", "endpoint_done", "phases")
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.endpoint_done: float | None = None
+        self.phases: dict[str, float] = {}
+
+    def add(self, phase: str, seconds: float) -> None:
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def server_timing(self, total: float) -> str:
+        entries = [f"{phase};dur={seconds * 1000:.1f}" for phase, seconds in self.phases.items()]
+        entries.append(f"app;dur={total * 1000:.1f}")
+        return ", ".join(entries)
+
+
+_current_trace: ContextVar[RequestTrace | None] = ContextVar("request_trace", default=None)
+# Name of the span already timing this call chain; nested spans are not counted
+# again, so e.g. a Firebase Admin call made while verifying a token is "auth"
+_active_span: ContextVar[str | None] = ContextVar("active_span", default=None)
+
+
+class span:
+    """
+    Attribute the enclosed block to a phase of the current request:
+
+        with span("yelp"):
+            response = await client.get(...)
+
+    A no-op outside a traced request or inside another span.
+    """
+
+    __slots__ = ("name", "_trace", "_token", "_started")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._trace: RequestTrace | None = None
+
+    def __enter__(self) -> "span":
+        trace = _current_trace.get()
+        if trace is not None and _active_span.get() is None:
+            self._trace = trace
+            self._token = _active_span.set(self.name)
+            self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        if self._trace is None:
+            return
+        elapsed = time.perf_counter() - self._started
+        _active_span.reset(self._token)
+        self._trace.add(self.name, elapsed)
+        SPAN_SECONDS.observe(elapsed, self.name)
+        self._trace = None
+
+
+def detached_task(coro: Coroutine[Any, Any, T]) -> "asyncio.Task[T]":
+    """
+    Start `coro` as a task outside the current request's trace. A task copies
+    the context it is created in, so work shared by several requests (or
+    outliving the one that started it) would otherwise record its spans into
+    whichever request happened to start it.
+    """
+    return contextvars.Context().run(asyncio.ensure_future, coro)
+
+
+def _mark_endpoint_done(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Wrap a route endpoint to note when it returns; what follows before the
+    response starts is response_model validation and serialization.
+    """
+
+    def mark() -> None:
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.endpoint_done = time.perf_counter()
+
+    if inspect.iscoroutinefunction(endpoint):
+
+        @functools.wraps(endpoint)
+        async def async_endpoint(*args: Any, **kwargs: Any) -> Any:
+            result = await endpoint(*args, **kwargs)
+            mark()
+            return result
+
+        return async_endpoint
+
+    @functools.wraps(endpoint)
+    def sync_endpoint(*args: Any, **kwargs: Any) -> Any:
+        result = endpoint(*args, **kwargs)
+        mark()
+        return result
+
+    return sync_endpoint
+
+
+class TracedRoute(APIRoute):
+    """APIRoute whose endpoint reports when it returns (see TracingMiddleware)."""
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
+        super().__init__(path, _mark_endpoint_done(endpoint), **kwargs)
+
+
+class TracingMiddleware:
+    """
+    Pure ASGI middleware: opens a RequestTrace for each HTTP request, adds the
+    per-phase totals to the Server-Timing header (after any the handler set)
+    and records the request in the /metrics histograms, labelled by route
+    template so path parameters do not create new series.
+    """
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace = RequestTrace()
+        token = _current_trace.set(trace)
+        status = 500
+
+        async def send_with_timing(message: dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                now = time.perf_counter()
+                if trace.endpoint_done is not None:
+                    trace.add("serialize", now - trace.endpoint_done)
+                headers = [(k, v) for k, v in message.get("headers", []) if k != b"server-timing"]
+                timing = trace.server_timing(now - trace.started)
+                existing = [v for k, v in message.get("headers", []) if k == b"server-timing"]
+                if existing:
+                    timing = ", ".join(v.decode("latin-1") for v in existing) + ", " + timing
+                headers.append((b"server-timing", timing.encode("latin-1")))
+                message["headers"] = headers
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_trace.reset(token)
+            route = getattr(scope.get("route"), "path", "unmatched")
+            REQUEST_SECONDS.observe(time.perf_counter() - trace.started, scope["method"], route)
+            for phase, seconds in trace.phases.items():
+                PHASE_SECONDS.observe(seconds, route, phase)
+            REQUESTS_TOTAL.inc(scope["method"], route, str(status))
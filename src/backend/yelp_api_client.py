@@ -1,20 +1,108 @@
+import asyncio
+import importlib.util
+import json
+import logging
+import math
 import os
+import re
+import threading
+import time
 from typing import Any, Dict, List, Optional
 
 import httpx
-
-# Load environment variables
-from dotenv import load_dotenv
 from pydantic import BaseModel, Field
 
-load_dotenv()
+from autocomplete_cache import AutocompleteCache
+from cache import TTLCache
+from compact import CompactSearchResults
+from detail_store import DetailStore, StoredDetail
+from geo import geohash_center, geohash_encode, haversine_m
+from rate_limit import DailyQuota, Priority, TokenBucket
+from resilience import CircuitBreaker, LatencyTracker, backoff_delay, parse_retry_after
+from search_index import RestaurantSearchIndex
+from singleflight import SingleFlight
+from tracing import detached_task, span
+
+logger = logging.getLogger(__name__)
 
+# .env is loaded by services, which main imports first
 YELP_API_KEY = os.getenv("YELP_API_KEY")
-YELP_API_HOST = "https://api.yelp.com"
+# Point at a local stand-in (python -m fakes.yelp) for offline runs
+YELP_API_HOST = os.getenv("YELP_API_HOST", "https://api.yelp.com")
 SEARCH_PATH = "/v3/businesses/search"
 AUTOCOMPLETE_PATH = "/v3/autocomplete"
 BUSINESS_DETAILS_PATH = "/v3/businesses"
 
+# Connection pool / timeout settings for the shared Yelp client
+YELP_MAX_CONNECTIONS = int(os.getenv("YELP_MAX_CONNECTIONS", "100"))
+YELP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("YELP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+YELP_KEEPALIVE_EXPIRY = float(os.getenv("YELP_KEEPALIVE_EXPIRY", "30"))
+YELP_CONNECT_TIMEOUT = float(os.getenv("YELP_CONNECT_TIMEOUT", "3"))
+YELP_READ_TIMEOUT = float(os.getenv("YELP_READ_TIMEOUT", "10"))
+YELP_POOL_TIMEOUT = float(os.getenv("YELP_POOL_TIMEOUT", "5"))
+# HTTP/2 needs the optional `h2` package (pip install "httpx[http2]")
+YELP_HTTP2 = os.getenv("YELP_HTTP2", "1") == "1" and importlib.util.find_spec("h2") is not None
+
+# Outbound rate limit (Yelp allows bursts of ~50 QPS) and daily request budget
+YELP_RATE_PER_SECOND = float(os.getenv("YELP_RATE_PER_SECOND", "25"))
+YELP_RATE_BURST = float(os.getenv("YELP_RATE_BURST", "50"))
+# Longest a caller waits for a token before failing with YelpRateLimitedError
+YELP_RATE_MAX_WAIT = float(os.getenv("YELP_RATE_MAX_WAIT", "5"))
+YELP_DAILY_QUOTA = int(os.getenv("YELP_DAILY_QUOTA", "5000"))
+# Remaining-quota fractions below which we go interactive-only, then cache-only
+YELP_QUOTA_LOW_WATER = float(os.getenv("YELP_QUOTA_LOW_WATER", "0.1"))
+YELP_QUOTA_CRITICAL = float(os.getenv("YELP_QUOTA_CRITICAL", "0.02"))
+
+# Retries on 429/5xx/transport errors with full-jitter exponential backoff
+YELP_MAX_RETRIES = int(os.getenv("YELP_MAX_RETRIES", "2"))
+YELP_RETRY_BASE_DELAY = float(os.getenv("YELP_RETRY_BASE_DELAY", "0.1"))
+YELP_RETRY_MAX_DELAY = float(os.getenv("YELP_RETRY_MAX_DELAY", "2"))
+# Hedging (off by default): send a second request once the first has taken
+# longer than this percentile of recent Yelp latencies
+YELP_HEDGE_ENABLED = os.getenv("YELP_HEDGE_ENABLED", "0") == "1"
+YELP_HEDGE_PERCENTILE = float(os.getenv("YELP_HEDGE_PERCENTILE", "0.95"))
+# Consecutive failures before failing fast, and how long before probing Yelp again
+YELP_BREAKER_FAILURES = int(os.getenv("YELP_BREAKER_FAILURES", "5"))
+YELP_BREAKER_RESET = float(os.getenv("YELP_BREAKER_RESET", "30"))
+
+# Search response cache settings
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("YELP_SEARCH_CACHE_MAX_ENTRIES", "2000"))
+SEARCH_CACHE_MAX_BYTES = int(os.getenv("YELP_SEARCH_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+# ~110m at 3 decimals, close enough to share results between nearby callers
+SEARCH_CACHE_COORD_DECIMALS = int(os.getenv("YELP_SEARCH_CACHE_COORD_DECIMALS", "3"))
+# TTL (seconds) per calling endpoint
+SEARCH_CACHE_TTLS: dict[str, float] = {
+    "search": 300,
+    "restaurants": 900,
+    "nearby": 600,
+    "localpicks": 900,
+    "similar": 1800,
+}
+
+# Business details rarely change, so they are kept much longer than searches
+DETAIL_CACHE_TTL = float(os.getenv("YELP_DETAIL_CACHE_TTL", str(6 * 60 * 60)))
+DETAIL_CACHE_MAX_ENTRIES = int(os.getenv("YELP_DETAIL_CACHE_MAX_ENTRIES", "5000"))
+DETAIL_CACHE_MAX_BYTES = int(os.getenv("YELP_DETAIL_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+# On-disk details older than this are refreshed in the background; older than
+# the max age they are only served when Yelp is unavailable
+DETAIL_STORE_MAX_AGE = float(os.getenv("YELP_DETAIL_STORE_MAX_AGE", str(7 * 24 * 60 * 60)))
+# How long a stale on-disk detail stays in memory while its refresh runs
+DETAIL_STALE_MEMORY_TTL = float(os.getenv("YELP_DETAIL_STALE_MEMORY_TTL", "60"))
+# Max concurrent upstream detail fetches for one bulk lookup
+DETAIL_FETCH_CONCURRENCY = int(os.getenv("YELP_DETAIL_FETCH_CONCURRENCY", "8"))
+
+# Autocomplete cache: fresh for TTL, then served stale while refreshing in the background
+AUTOCOMPLETE_CACHE_TTL = float(os.getenv("YELP_AUTOCOMPLETE_CACHE_TTL", "600"))
+AUTOCOMPLETE_CACHE_STALE_TTL = float(os.getenv("YELP_AUTOCOMPLETE_CACHE_STALE_TTL", "3600"))
+AUTOCOMPLETE_CACHE_MAX_ENTRIES = int(os.getenv("YELP_AUTOCOMPLETE_CACHE_MAX_ENTRIES", "20000"))
+# Coarse tile for location-biased suggestions (precision 4 ~ 39km x 20km)
+AUTOCOMPLETE_TILE_PRECISION = int(os.getenv("YELP_AUTOCOMPLETE_TILE_PRECISION", "4"))
+
+# Geo tiling for coordinate-only searches (precision 6 ~ 1.2km x 0.6km cells)
+GEO_TILE_PRECISION = int(os.getenv("YELP_GEO_TILE_PRECISION", "6"))
+# Fetch a full page per tile so any caller limit can be served from it (Yelp max is 50)
+GEO_TILE_FETCH_LIMIT = int(os.getenv("YELP_GEO_TILE_FETCH_LIMIT", "50"))
+
 # Warn if API key is not set
 if not YELP_API_KEY:
     print(
@@ -80,6 +168,299 @@ class YelpBusinessDetail(BaseModel):
     hours: List[Dict[str, Any]] = []
     is_closed: bool 
 
+class YelpUnavailableError(Exception):
+    """Yelp cannot be called right now; callers should serve cached data or a 503."""
+
+    def __init__(self, message: str, retry_after: float = 1.0) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class YelpRateLimitedError(YelpUnavailableError):
+    """Our own rate limiter is saturated, or Yelp answered 429."""
+
+
+class YelpQuotaExceededError(YelpUnavailableError):
+    """The daily quota is too low for this priority class (cache-only mode)."""
+
+
+class YelpCircuitOpenError(YelpUnavailableError):
+    """Yelp is failing; calls fail fast until the circuit breaker probes again."""
+
+
+def _retryable(response: httpx.Response) -> bool:
+    return response.status_code == 429 or response.status_code >= 500
+
+
+class YelpClient:
+    """
+    Application-lifetime wrapper around a pooled httpx.AsyncClient.
+    Keeps TCP/TLS connections to api.yelp.com alive between requests.
+    """
+
+    def __init__(
+        self,
+        base_url: str = YELP_API_HOST,
+        api_key: str | None = YELP_API_KEY,
+        max_connections: int = YELP_MAX_CONNECTIONS,
+        max_keepalive_connections: int = YELP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: float = YELP_KEEPALIVE_EXPIRY,
+        connect_timeout: float = YELP_CONNECT_TIMEOUT,
+        read_timeout: float = YELP_READ_TIMEOUT,
+        pool_timeout: float = YELP_POOL_TIMEOUT,
+        http2: bool = YELP_HTTP2,
+    ) -> None:
+        self.base_url = base_url
+        self.api_key = api_key
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = httpx.Timeout(read_timeout, connect=connect_timeout, pool=pool_timeout)
+        self.http2 = http2
+        self._client: httpx.AsyncClient | None = None
+        # Building the client loads the CA bundle (~150 ms); start() does it in a thread
+        self._client_lock = threading.Lock()
+        self._opening: asyncio.Future[httpx.AsyncClient] | None = None
+        self.limiter = TokenBucket(rate=YELP_RATE_PER_SECOND, capacity=YELP_RATE_BURST)
+        self.quota = DailyQuota(
+            YELP_DAILY_QUOTA, low_water=YELP_QUOTA_LOW_WATER, critical=YELP_QUOTA_CRITICAL
+        )
+        self.breaker = CircuitBreaker(YELP_BREAKER_FAILURES, YELP_BREAKER_RESET)
+        self.latency = LatencyTracker()
+        self.hedge_enabled = YELP_HEDGE_ENABLED
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Lazily open the pool so scripts can use the client without a lifespan hook
+        with self._client_lock:
+            if self._client is None or self._client.is_closed:
+                self._client = httpx.AsyncClient(
+                    base_url=self.base_url,
+                    headers={"Authorization": f"Bearer {self.api_key}"},
+                    limits=self.limits,
+                    timeout=self.timeout,
+                    http2=self.http2,
+                )
+            return self._client
+
+    async def start(self) -> None:
+        """
+        Open the connection pool in the background (called from the FastAPI
+        lifespan hook). A request that needs the client first waits for it.
+        """
+        self._opening = asyncio.ensure_future(asyncio.to_thread(lambda: self.client))
+
+    async def aclose(self) -> None:
+        """Close the connection pool (called on application shutdown)."""
+        if self._opening is not None:
+            await asyncio.gather(self._opening, return_exceptions=True)
+            self._opening = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def get(
+        self,
+        path: str,
+        params: dict[str, Any] | None = None,
+        priority: int = Priority.INTERACTIVE,
+        headers: dict[str, str] | None = None,
+    ) -> httpx.Response:
+        """
+        GET with rate limiting, bounded retries on 429/5xx/transport errors,
+        optional hedging, and a circuit breaker. Raises YelpUnavailableError
+        when Yelp cannot answer, so callers can fall back to cached data.
+        A conditional GET (If-None-Match) may return 304 Not Modified.
+        """
+        with span("yelp"):
+            return await self._get(path, params, priority, headers)
+
+    async def _get(
+        self,
+        path: str,
+        params: dict[str, Any] | None,
+        priority: int,
+        headers: dict[str, str] | None,
+    ) -> httpx.Response:
+        for attempt in range(YELP_MAX_RETRIES + 1):
+            if not self.breaker.allow():
+                raise YelpCircuitOpenError(
+                    "Yelp is unavailable, failing fast", retry_after=self.breaker.retry_after
+                )
+            if not self.quota.allows(priority):
+                raise YelpQuotaExceededError(
+                    f"Yelp daily quota is low ({self.quota.remaining} left), serving cache only",
+                    retry_after=60,
+                )
+            try:
+                await asyncio.wait_for(self.limiter.acquire(priority), YELP_RATE_MAX_WAIT)
+            except asyncio.TimeoutError as e:
+                raise YelpRateLimitedError("Yelp rate limit reached, try again shortly") from e
+
+            self.quota.consume()
+            retry_after: float | None = None
+            error: YelpUnavailableError
+            try:
+                response = await self._send(path, params, headers)
+            except httpx.TransportError as e:
+                # Timeouts and connection errors
+                self.breaker.record_failure()
+                error = YelpUnavailableError(f"Yelp request failed: {e!r}")
+                error.__cause__ = e
+            else:
+                self.quota.update_from_headers(response.headers)
+                if response.status_code < 500:
+                    # Yelp answered: 4xx is the caller's problem (429 is the limiter's)
+                    self.breaker.record_success()
+                if not _retryable(response):
+                    if response.status_code != 304:
+                        response.raise_for_status()
+                    return response
+                if response.status_code == 429:
+                    retry_after = parse_retry_after(response.headers.get("retry-after"))
+                    error = YelpRateLimitedError("Yelp returned 429 Too Many Requests", retry_after)
+                else:
+                    self.breaker.record_failure()
+                    error = YelpUnavailableError(f"Yelp returned {response.status_code}")
+
+            if attempt == YELP_MAX_RETRIES:
+                raise error
+            delay = backoff_delay(attempt, YELP_RETRY_BASE_DELAY, YELP_RETRY_MAX_DELAY)
+            if retry_after is not None:
+                if retry_after > YELP_RETRY_MAX_DELAY:
+                    raise error  # not worth holding the user's request that long
+                delay = max(delay, retry_after)
+            self.retries += 1
+            await asyncio.sleep(delay)
+        raise AssertionError("unreachable")
+
+    async def _send(
+        self,
+        path: str,
+        params: dict[str, Any] | None,
+        headers: dict[str, str] | None = None,
+    ) -> httpx.Response:
+        """
+        One logical request. With hedging enabled, a second identical request
+        is sent if the first is slower than the tracked latency percentile; the
+        first to finish wins and the other is cancelled.
+        """
+        if self._opening is not None and not self._opening.done():
+            # Still being built by start(); wait without blocking the loop on the lock
+            await asyncio.wait({self._opening})
+        started = time.monotonic()
+        primary = asyncio.ensure_future(self.client.get(path, params=params, headers=headers))
+        pending = {primary}
+        try:
+            hedge_after = self.latency.percentile(YELP_HEDGE_PERCENTILE)
+            if self.hedge_enabled and hedge_after is not None:
+                done, _ = await asyncio.wait(pending, timeout=hedge_after)
+                # Only hedge with spare capacity: never queue behind real traffic
+                if not done and self.limiter.try_acquire():
+                    self.quota.consume()
+                    self.hedges += 1
+                    hedge = self.client.get(path, params=params, headers=headers)
+                    pending.add(asyncio.ensure_future(hedge))
+
+            failure: BaseException | None = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # Retrieve every exception so a losing request never logs as unhandled
+                succeeded = [task for task in done if task.exception() is None]
+                if not succeeded:
+                    failure = next(iter(done)).exception()
+                    continue
+                winner = succeeded[0]
+                if winner is not primary:
+                    self.hedge_wins += 1
+                response: httpx.Response = winner.result()
+                if not _retryable(response):
+                    self.latency.record(time.monotonic() - started)
+                return response
+            assert failure is not None
+            raise failure
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def rate_status(self) -> dict[str, Any]:
+        """Current token bucket level and quota remaining, for monitoring."""
+        return {
+            "bucket_level": round(self.limiter.level, 2),
+            "bucket_capacity": self.limiter.capacity,
+            "waiting": self.limiter.waiting,
+            "quota": self.quota.stats(),
+        }
+
+    def resilience_status(self) -> dict[str, Any]:
+        """Circuit breaker state, retry/hedge counters and recent latency, for monitoring."""
+        return {
+            "breaker": self.breaker.stats(),
+            "latency": self.latency.stats(),
+            "retries": self.retries,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+        }
+
+
+# Shared client used by all Yelp calls in this module
+yelp_client = YelpClient()
+
+
+# Coalesces concurrent identical Yelp calls into one upstream request
+yelp_flight = SingleFlight(phase="yelp")
+
+# Shared cache of search responses, keyed on normalized query parameters
+search_cache = TTLCache(max_entries=SEARCH_CACHE_MAX_ENTRIES, max_bytes=SEARCH_CACHE_MAX_BYTES)
+
+# Local full-text + geo index over every business we have seen
+restaurant_index = RestaurantSearchIndex(model=YelpBusiness)
+# Yelp's `total` per query (search cache key without the limit), reported by
+# local answers to that query instead of the size of the local match set
+search_totals = TTLCache(max_entries=SEARCH_CACHE_MAX_ENTRIES)
+
+# Shared cache of parsed business details, keyed on Yelp business ID
+detail_cache = TTLCache(max_entries=DETAIL_CACHE_MAX_ENTRIES, max_bytes=DETAIL_CACHE_MAX_BYTES)
+# Persistent second tier behind detail_cache, shared by all workers on the host
+detail_store = DetailStore()
+# Background detail refreshes; keep references so tasks are not garbage collected
+_refresh_tasks: set["asyncio.Task[None]"] = set()
+
+
+def _canonical_location(location: str) -> str:
+    # "  New York ,NY. " -> "new york, ny"
+    location = re.sub(r"\s*,\s*", ", ", location.strip().lower())
+    return re.sub(r"\s+", " ", location).strip(" .,")
+
+
+def normalize_search_params(
+    term: str | None = None,
+    location: str | None = None,
+    latitude: float | None = None,
+    longitude: float | None = None,
+    sort_by: str | None = None,
+    attributes: str | None = None,
+    limit: int = 10,
+) -> tuple[Any, ...]:
+    """Build the search cache key. Equivalent queries map to the same key."""
+    term_key = " ".join(term.lower().split()) if term else None
+    location_key = _canonical_location(location) if location else None
+    if latitude and longitude:
+        lat_key: float | None = round(latitude, SEARCH_CACHE_COORD_DECIMALS)
+        lon_key: float | None = round(longitude, SEARCH_CACHE_COORD_DECIMALS)
+    else:
+        lat_key = lon_key = None
+    attributes_key = None
+    if attributes:
+        attributes_key = ",".join(sorted(a.strip() for a in attributes.split(",")))
+    return (term_key, location_key, lat_key, lon_key, sort_by or None, attributes_key, limit)
+
+
 # Function to search Yelp API
 async def search_yelp(
         term: str | None = None,
@@ -88,48 +469,208 @@ async def search_yelp(
         longitude: float | None = None,
         sort_by: str | None = None,
         attributes: str | None = None,
-        limit: int = 10) -> YelpSearchResponse:
-    
-    url = f"{YELP_API_HOST}{SEARCH_PATH}"
-    headers = {"Authorization": f"Bearer {YELP_API_KEY}"}
-
-    params = {"limit": limit}
-    if term:
-        params["term"] = term
-    if location:
-        params["location"] = location
-    if latitude and longitude:
-        params["latitude"] = latitude
-        params["longitude"] = longitude
-    if sort_by:
-        params["sort_by"] = sort_by
-    if attributes:
-        params["attributes"] = attributes
+        limit: int = 10,
+        endpoint: str = "search") -> YelpSearchResponse:
+    """
+    Search Yelp businesses. Responses are cached per normalized query, with the
+    TTL picked from SEARCH_CACHE_TTLS by the calling `endpoint`.
+    """
+    key = normalize_search_params(term, location, latitude, longitude, sort_by, attributes, limit)
+    cached: CompactSearchResults | None = search_cache.get(key)
+    if cached is not None:
+        return _expand(cached)
+    # Concurrent misses for the same query share one upstream request
+    try:
+        result: YelpSearchResponse = await yelp_flight.do(
+            ("search", key), lambda: _fetch_search(key, endpoint)
+        )
+    except YelpUnavailableError:
+        # Cache-only mode: an expired answer beats no answer
+        stale = search_cache.get_stale(key)
+        if stale is None:
+            raise
+        return _expand(stale)
+    return result
+
+
+def _expand(page: CompactSearchResults) -> YelpSearchResponse:
+    # Cached pages are stored compact and only become models when served
+    response: YelpSearchResponse = page.to_response(YelpSearchResponse, YelpBusiness)
+    return response
+
 
-    # async with httpx.AsyncClient() as client:
-    async with httpx.AsyncClient() as client:
-        response = await client.get(url, headers=headers, params=params)
-    response.raise_for_status()
+async def _fetch_search(key: tuple[Any, ...], endpoint: str) -> YelpSearchResponse:
+    term_key, location_key, lat_key, lon_key, sort_key, attributes_key, limit = key
+    params: dict[str, Any] = {"limit": limit}
+    if term_key:
+        params["term"] = term_key
+    if location_key:
+        params["location"] = location_key
+    if lat_key is not None and lon_key is not None:
+        # Send the rounded coordinates so the cached entry matches what Yelp saw
+        params["latitude"] = lat_key
+        params["longitude"] = lon_key
+    if sort_key:
+        params["sort_by"] = sort_key
+    if attributes_key:
+        params["attributes"] = attributes_key
+
+    response = await yelp_client.get(SEARCH_PATH, params=params)
     data = response.json()
-    return YelpSearchResponse(**data)
+    result = YelpSearchResponse(**data)
+    # The cached page shares its compact records with the search index
+    records = restaurant_index.add_many(result.businesses)
+    ttl = SEARCH_CACHE_TTLS.get(endpoint, SEARCH_CACHE_TTLS["search"])
+    page = CompactSearchResults.from_response(result, records)
+    # Budgeted by what the compact page holds, not by the JSON it came from
+    search_cache.set(key, page, ttl=ttl, size=page.size())
+    search_totals.set(key[:-1], result.total, ttl=restaurant_index.max_age)
+    return result
+
+async def search_restaurants(
+    term: str | None = None,
+    location: str | None = None,
+    latitude: float | None = None,
+    longitude: float | None = None,
+    limit: int = 20,
+    endpoint: str = "search",
+) -> YelpSearchResponse:
+    """
+    Search that prefers local answers: a cached Yelp response first, then the
+    local search index when it has a full page of matches, then Yelp itself.
+    """
+    key = normalize_search_params(term, location, latitude, longitude, None, None, limit)
+    if key in search_cache:
+        return await search_yelp(
+            term, location, latitude, longitude, limit=limit, endpoint=endpoint
+        )
+
+    local = restaurant_index.search(term, location, latitude, longitude, limit=limit)
+    if local is not None:
+        businesses, matches = local
+        total = search_totals.get(key[:-1])
+        region: dict[str, Any] = {}
+        if latitude is not None and longitude is not None:
+            region = {"center": {"latitude": latitude, "longitude": longitude}}
+        return YelpSearchResponse(
+            businesses=businesses, total=matches if total is None else total, region=region
+        )
+
+    return await search_yelp(
+        term, location, latitude, longitude, limit=limit, endpoint=endpoint
+    )
+
+
+async def search_yelp_tile(
+    latitude: float,
+    longitude: float,
+    sort_by: str | None = None,
+    attributes: str | None = None,
+    limit: int = 10,
+    endpoint: str = "nearby",
+) -> YelpSearchResponse:
+    """
+    Coordinate search that is shareable across callers in the same neighborhood.
+    Snaps the caller to a geohash tile, fetches (and caches) one Yelp page for
+    the tile center, then recomputes distances and re-ranks for the caller.
+    """
+    tile = geohash_encode(latitude, longitude, GEO_TILE_PRECISION)
+    center_lat, center_lon = geohash_center(tile)
+    page = await search_yelp(
+        latitude=center_lat,
+        longitude=center_lon,
+        sort_by=sort_by,
+        attributes=attributes,
+        limit=max(limit, GEO_TILE_FETCH_LIMIT),
+        endpoint=endpoint,
+    )
+
+    ranked = []
+    for business in page.businesses:
+        lat = business.coordinates.get("latitude")
+        lon = business.coordinates.get("longitude")
+        if lat is None or lon is None:
+            distance = math.inf
+        else:
+            distance = haversine_m(latitude, longitude, lat, lon)
+        ranked.append((distance, business))
+
+    if sort_by == "rating":
+        # Keep Yelp's rating order, nearest first among equally rated places
+        ranked.sort(key=lambda item: (-item[1].rating, item[0]))
+    else:
+        ranked.sort(key=lambda item: item[0])
+
+    businesses = [
+        business.model_copy(
+            update={"distance": distance if distance != math.inf else business.distance}
+        )
+        for distance, business in ranked[:limit]
+    ]
+    return YelpSearchResponse(
+        businesses=businesses,
+        total=page.total,
+        region={"center": {"latitude": latitude, "longitude": longitude}},
+    )
+
 
 # Function to autocomplete Yelp API
 async def autocomplete_yelp(text: str, latitude: Optional[float] = None, longitude: Optional[float] = None) -> YelpAutocompleteResponse:
-    url = f"{YELP_API_HOST}{AUTOCOMPLETE_PATH}"
-    headers = {"Authorization": f"Bearer {YELP_API_KEY}"}
-
-    params = {"text": text}
+    """
+    Autocomplete suggestions, served from the prefix-indexed autocomplete cache.
+    Location bias is snapped to a coarse geohash tile so nearby users share entries.
+    """
+    normalized = " ".join(text.lower().split())
+    tile = ""
     if latitude is not None and longitude is not None:
-        params["latitude"] = latitude
-        params["longitude"] = longitude
+        tile = geohash_encode(latitude, longitude, AUTOCOMPLETE_TILE_PRECISION)
+    result: YelpAutocompleteResponse = await autocomplete_cache.get(tile, normalized)
+    return result
+
+
+async def _fetch_autocomplete(
+    tile: str, text: str, background: bool = False
+) -> YelpAutocompleteResponse:
+    params: dict[str, Any] = {"text": text}
+    if tile:
+        params["latitude"], params["longitude"] = geohash_center(tile)
+    # Stale-while-revalidate refreshes yield to anything a user is waiting on
+    priority = Priority.BACKGROUND if background else Priority.AUTOCOMPLETE
+
+    async def fetch() -> YelpAutocompleteResponse:
+        response = await yelp_client.get(AUTOCOMPLETE_PATH, params=params, priority=priority)
+        return YelpAutocompleteResponse(**response.json())
+
+    result: YelpAutocompleteResponse = await yelp_flight.do(("autocomplete", tile, text), fetch)
+    return result
+
+
+def _matches_prefix(value: Any, text: str) -> bool:
+    # Word-prefix match, the way Yelp matches suggestions: "pizz" matches "Joe's Pizza"
+    return f" {text}" in f" {' '.join(str(value).lower().split())}"
+
+
+def _narrow_autocomplete(
+    response: YelpAutocompleteResponse, text: str
+) -> YelpAutocompleteResponse | None:
+    """Filter a shorter prefix's suggestions down to `text`; None if nothing is left."""
+    terms = [t for t in response.terms if _matches_prefix(t.get("text", ""), text)]
+    businesses = [b for b in response.businesses if _matches_prefix(b.get("name", ""), text)]
+    categories = [c for c in response.categories if _matches_prefix(c.get("title", ""), text)]
+    if not (terms or businesses or categories):
+        return None
+    return YelpAutocompleteResponse(terms=terms, businesses=businesses, categories=categories)
+
+
+autocomplete_cache = AutocompleteCache(
+    fetch=_fetch_autocomplete,
+    narrow=_narrow_autocomplete,
+    ttl=AUTOCOMPLETE_CACHE_TTL,
+    stale_ttl=AUTOCOMPLETE_CACHE_STALE_TTL,
+    max_entries=AUTOCOMPLETE_CACHE_MAX_ENTRIES,
+)
+
 
-    # async with httpx.AsyncClient() as client:
-    async with httpx.AsyncClient() as client:
-        response = await client.get(url, headers=headers, params=params)
-    response.raise_for_status()
-    data = response.json()
-    return YelpAutocompleteResponse(**data)  
-   
 # Function to get business details by ID
 async def get_business_details(yelp_id: str) -> YelpBusinessDetail:
     """
@@ -138,25 +679,140 @@ async def get_business_details(yelp_id: str) -> YelpBusinessDetail:
     """
     if not YELP_API_KEY:
         raise Exception("YELP_API_KEY is not configured.")
-        
-    # Endpoint: /v3/businesses/{id}
-    url = f"{YELP_API_HOST}{BUSINESS_DETAILS_PATH}/{yelp_id}?locale=en_US"
-    headers = {"Authorization": f"Bearer {YELP_API_KEY}"}
 
-    async with httpx.AsyncClient() as client:
+    cached: YelpBusinessDetail | None = detail_cache.get(yelp_id)
+    if cached is not None:
+        return cached
+
+    # A cold worker (or one whose memory entry expired) reads the shared disk tier
+    stored = await _load_stored_detail(yelp_id)
+    if stored is not None and stored.age <= DETAIL_STORE_MAX_AGE:
+        detail = _detail_from_payload(stored.payload)
+        if stored.age <= DETAIL_CACHE_TTL:
+            ttl = DETAIL_CACHE_TTL - stored.age
+        else:
+            # Serve stale while one worker revalidates it in the background
+            ttl = DETAIL_STALE_MEMORY_TTL
+            _refresh_in_background(yelp_id, stored.etag)
+        detail_cache.set(yelp_id, detail, ttl=ttl, size=len(stored.payload))
+        return detail
+
+    # Concurrent requests for the same business share one fetch and one parsed model
+    try:
+        result: YelpBusinessDetail = await yelp_flight.do(
+            ("details", yelp_id),
+            lambda: _fetch_business_details(yelp_id, stored.etag if stored else None),
+        )
+    except YelpUnavailableError:
+        stale: YelpBusinessDetail | None = detail_cache.get_stale(yelp_id)
+        if stale is not None:
+            return stale
+        if stored is not None:
+            return _detail_from_payload(stored.payload)
+        raise
+    return result
+
+
+def _detail_from_payload(payload: bytes) -> YelpBusinessDetail:
+    data = json.loads(payload)
+    if not data.get("photos") or len(data["photos"]) == 0:
+        if data.get("image_url"):
+            data["photos"] = [data["image_url"]]
+    return YelpBusinessDetail(**data)
+
+
+async def _load_stored_detail(yelp_id: str) -> StoredDetail | None:
+    try:
+        return await detail_store.get(yelp_id)
+    except Exception as e:
+        # The disk tier is an optimization; never fail a request because of it
+        logger.warning("Detail store read failed for %s: %s", yelp_id, e)
+        return None
+
+
+def _spawn(coro: Any) -> None:
+    # Outlives the request that noticed the stale entry, so it gets its own context
+    task = detached_task(coro)
+    _refresh_tasks.add(task)
+    task.add_done_callback(_refresh_tasks.discard)
+
+
+def _refresh_in_background(yelp_id: str, etag: str | None) -> None:
+    async def refresh() -> None:
         try:
-            response = await client.get(url, headers=headers)
-            response.raise_for_status()
-            data = response.json()
-
-            if not data.get("photos") or len(data["photos"]) == 0:
-                if data.get("image_url"):
-                    data["photos"] = [data["image_url"]]
-                    
-            return YelpBusinessDetail(**data)
+            # Only one worker process refreshes a given business per lease period
+            if not await detail_store.claim_refresh(yelp_id):
+                return
+            await yelp_flight.do(
+                ("details", yelp_id),
+                lambda: _fetch_business_details(yelp_id, etag, Priority.BACKGROUND),
+            )
         except Exception as e:
-            print(f"Yelp Detail Error: {e}")
-            raise e
+            logger.warning("Background detail refresh failed for %s: %s", yelp_id, e)
+
+    _spawn(refresh())
+
+
+async def _store_detail(yelp_id: str, payload: bytes, etag: str | None) -> None:
+    try:
+        await detail_store.put(yelp_id, payload, etag)
+    except Exception as e:
+        logger.warning("Detail store write failed for %s: %s", yelp_id, e)
+
+
+async def _fetch_business_details(
+    yelp_id: str, etag: str | None = None, priority: int = Priority.INTERACTIVE
+) -> YelpBusinessDetail:
+    # Endpoint: /v3/businesses/{id}
+    path = f"{BUSINESS_DETAILS_PATH}/{yelp_id}"
+    headers = {"If-None-Match": etag} if etag else None
+
+    try:
+        response = await yelp_client.get(
+            path, params={"locale": "en_US"}, priority=priority, headers=headers
+        )
+        if response.status_code == 304:
+            stored = await detail_store.get(yelp_id)
+            if stored is not None:
+                detail = _detail_from_payload(stored.payload)
+                detail_cache.set(yelp_id, detail, ttl=DETAIL_CACHE_TTL, size=len(stored.payload))
+                _spawn(detail_store.touch(yelp_id))
+                return detail
+            # Entry vanished between the read and the revalidation: fetch it in full
+            response = await yelp_client.get(path, params={"locale": "en_US"}, priority=priority)
+
+        detail = _detail_from_payload(response.content)
+        detail_cache.set(yelp_id, detail, ttl=DETAIL_CACHE_TTL, size=len(response.content))
+        # Persist without holding up the response
+        _spawn(_store_detail(yelp_id, response.content, response.headers.get("etag")))
+        return detail
+    except Exception as e:
+        print(f"Yelp Detail Error: {e}")
+        raise e
+
+
+async def get_business_details_many(
+    yelp_ids: list[str], concurrency: int = DETAIL_FETCH_CONCURRENCY
+) -> dict[str, YelpBusinessDetail]:
+    """
+    Resolve many business IDs concurrently, with at most `concurrency` upstream
+    fetches in flight. IDs that fail to resolve are left out of the result.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(yelp_id: str) -> YelpBusinessDetail | None:
+        try:
+            if yelp_id in detail_cache:
+                # Cache hits don't need an upstream slot
+                return await get_business_details(yelp_id)
+            async with semaphore:
+                return await get_business_details(yelp_id)
+        except Exception:
+            return None
+
+    unique_ids = list(dict.fromkeys(yelp_ids))
+    details = await asyncio.gather(*(fetch(yelp_id) for yelp_id in unique_ids))
+    return {yelp_id: d for yelp_id, d in zip(unique_ids, details, strict=True) if d is not None}
         
 
 # Example usage
@@ -0,0 +1,16 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# The backend is a flat set of modules run from src/backend (uvicorn main:app)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src" / "backend"))
+
+# Backend modules read their configuration at import time: run offline against
+# the in-memory fakes, with the detail store in a scratch directory
+os.environ.setdefault("FAKE_BACKENDS", "1")
+os.environ.setdefault("YELP_API_KEY", "fake")
+os.environ.setdefault("CACHE_BACKEND_URL", "memory://")
+os.environ.setdefault(
+    "DETAIL_STORE_PATH", os.path.join(tempfile.mkdtemp(prefix="crowdfork-tests-"), "details.db")
+)
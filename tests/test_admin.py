@@ -0,0 +1,28 @@
+import asyncio
+
+import httpx
+import pytest
+
+
+def get(url: str, headers: dict[str, str] | None = None) -> httpx.Response:
+    import main
+
+    async def send() -> httpx.Response:
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get(url, headers=headers)
+
+    return asyncio.run(send())
+
+
+@pytest.mark.parametrize("url", ["/internal/stats", "/internal/profiler"])
+def test_internal_endpoints_need_the_admin_token(monkeypatch: pytest.MonkeyPatch, url: str) -> None:
+    import main
+
+    monkeypatch.setattr(main, "PROFILER_ADMIN_TOKEN", "")
+    assert get(url).status_code == 404
+
+    monkeypatch.setattr(main, "PROFILER_ADMIN_TOKEN", "s3cret")
+    assert get(url).status_code == 403
+    assert get(url, {"X-Admin-Token": "wrong"}).status_code == 403
+    assert get(url, {"X-Admin-Token": "s3cret"}).status_code == 200
@@ -0,0 +1,39 @@
+import asyncio
+
+from autocomplete_cache import AutocompleteCache
+
+WORDS = ["pizza", "pizzeria", "pho", "pie"]
+
+
+def build() -> tuple[AutocompleteCache, list[tuple[str, str, bool]]]:
+    calls: list[tuple[str, str, bool]] = []
+
+    async def fetch(tile: str, text: str, background: bool = False) -> list[str]:
+        calls.append((tile, text, background))
+        return [word for word in WORDS if word.startswith(text)]
+
+    def narrow(words: list[str], text: str) -> list[str] | None:
+        matches = [word for word in words if word.startswith(text)]
+        return matches or None
+
+    return AutocompleteCache(fetch, narrow, ttl=0.05, stale_ttl=60), calls
+
+
+def test_narrowed_answer_from_a_stale_prefix_refreshes_it() -> None:
+    async def scenario() -> None:
+        cache, calls = build()
+        assert await cache.get("tile", "pi") == ["pizza", "pizzeria", "pie"]
+        assert await cache.get("tile", "piz") == ["pizza", "pizzeria"]
+        assert cache.stats()["prefix_hits"] == 1 and len(calls) == 1
+
+        await asyncio.sleep(0.06)
+        # Still answered from the stale prefix, which is refreshed in the background
+        assert await cache.get("tile", "pizz") == ["pizza", "pizzeria"]
+        await asyncio.sleep(0)
+        assert calls[-1] == ("tile", "pi", True)
+        assert cache.stats()["stale_hits"] == 1
+
+        assert await cache.get("tile", "pizze") == ["pizzeria"]
+        assert cache.stats()["prefix_hits"] == 2 and len(calls) == 2
+
+    asyncio.run(scenario())
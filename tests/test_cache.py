@@ -0,0 +1,39 @@
+from cache import TTLCache
+
+
+def test_expired_entries_miss_but_stay_available_as_stale() -> None:
+    cache = TTLCache()
+    cache.set("fresh", 1, ttl=60)
+    cache.set("old", 2, ttl=-1)
+    assert cache.get("fresh") == 1
+    assert cache.get("old") is None
+    assert "old" not in cache
+    assert cache.get_stale("old") == 2
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_least_recently_used_entry_is_evicted() -> None:
+    cache = TTLCache(max_entries=2)
+    cache.set("a", 1, ttl=60)
+    cache.set("b", 2, ttl=60)
+    cache.get("a")  # "b" is now the least recently used
+    cache.set("c", 3, ttl=60)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
+
+
+def test_byte_budget_evicts_and_skips_oversized_values() -> None:
+    cache = TTLCache(max_bytes=100)
+    cache.set("a", "x", ttl=60, size=60)
+    cache.set("b", "y", ttl=60, size=60)
+    assert "a" not in cache
+    assert cache.stats()["bytes"] == 60
+    cache.set("huge", "z", ttl=60, size=101)
+    assert "huge" not in cache
+    assert "b" in cache
+    # Replacing a key does not count its old size twice
+    cache.set("b", "y2", ttl=60, size=40)
+    assert cache.stats()["bytes"] == 40
@@ -0,0 +1,45 @@
+import json
+
+import pytest
+
+import compact
+from compact import CompactBusiness, CompactSearchResults
+from fakes.yelp import make_business
+from yelp_api_client import YelpBusiness, YelpSearchResponse
+
+
+def search_page(count: int) -> YelpSearchResponse:
+    businesses = [make_business(i) for i in range(count)]
+    # Missing coordinates and extra location keys must survive the round trip
+    businesses[0]["coordinates"] = {}
+    businesses[1]["location"]["neighborhood"] = "NoHo"
+    return YelpSearchResponse(businesses=businesses, total=240, region={"center": {}})
+
+
+def test_search_page_round_trip() -> None:
+    response = search_page(8)
+    page = CompactSearchResults.from_response(response)
+    expanded = page.to_response(YelpSearchResponse, YelpBusiness)
+    assert expanded.model_dump() == response.model_dump()
+    assert json.loads(expanded.model_dump_json()) == json.loads(response.model_dump_json())
+
+
+def test_page_size_counts_the_compact_records() -> None:
+    response = search_page(20)
+    page = CompactSearchResults.from_response(response)
+    # What the page holds in memory, which is more than the JSON it came from
+    assert page.size() > len(response.model_dump_json())
+    assert page.size() > sum(record.size() for record in page.businesses)
+
+
+def test_category_pool_is_bounded(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(compact, "CATEGORY_POOL_MAX", 2)
+    monkeypatch.setattr(compact, "_category_pool", {})
+    records = [
+        CompactBusiness(YelpBusiness(**make_business(i) | {"categories": [{"alias": f"c{i}"}]}))
+        for i in range(4)
+    ]
+    assert len(compact._category_pool) == 2
+    again = CompactBusiness(YelpBusiness(**make_business(9) | {"categories": [{"alias": "c0"}]}))
+    assert again.categories is records[0].categories
+    assert records[3].categories == (((("alias", "c3"),),))
@@ -0,0 +1,67 @@
+import asyncio
+import time
+from pathlib import Path
+
+from detail_store import DetailStore
+
+
+def test_put_get_and_touch(tmp_path: Path) -> None:
+    store = DetailStore(str(tmp_path / "details.db"))
+
+    async def scenario() -> None:
+        assert await store.get("biz") is None
+        payload = b'{"id": "biz", "name": "Pizza Place"}'
+        await store.put("biz", payload, etag='"v1"', fetched_at=time.time() - 3600)
+        stored = await store.get("biz")
+        assert stored is not None
+        assert stored.payload == payload
+        assert stored.etag == '"v1"'
+        assert 3590 < stored.age < 3610
+
+        # A 304 revalidation keeps the payload and resets its age
+        await store.touch("biz")
+        stored = await store.get("biz")
+        assert stored is not None
+        assert stored.payload == payload
+        assert stored.age < 5
+
+    asyncio.run(scenario())
+    assert store.stats()["hits"] == 2
+    assert store.stats()["misses"] == 1
+    assert store.stats()["writes"] == 1
+    store.close()
+
+
+def test_refresh_lease_is_shared_across_workers(tmp_path: Path) -> None:
+    path = str(tmp_path / "details.db")
+    # Two stores on one file behave like two uvicorn workers
+    first, second = DetailStore(path), DetailStore(path)
+
+    async def scenario() -> None:
+        assert not await first.claim_refresh("biz")  # nothing stored yet
+        await first.put("biz", b"{}", etag=None)
+        assert await first.claim_refresh("biz", lease=60)
+        assert not await second.claim_refresh("biz", lease=60)
+        # A fresh write releases the lease
+        await second.put("biz", b"{}", etag=None)
+        assert await second.claim_refresh("biz", lease=0.01)
+        await asyncio.sleep(0.02)
+        assert await first.claim_refresh("biz")
+
+    asyncio.run(scenario())
+    first.close()
+    second.close()
+
+
+def test_data_survives_a_restart(tmp_path: Path) -> None:
+    path = str(tmp_path / "details.db")
+    store = DetailStore(path)
+    asyncio.run(store.put("biz", b'{"id": "biz"}', etag='"v2"'))
+    store.close()
+
+    reopened = DetailStore(path)
+    stored = asyncio.run(reopened.get("biz"))
+    reopened.close()
+    assert stored is not None
+    assert stored.payload == b'{"id": "biz"}'
+    assert stored.etag == '"v2"'
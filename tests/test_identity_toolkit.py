@@ -0,0 +1,69 @@
+import asyncio
+
+import httpx
+import pytest
+
+from fakes.auth import FakeAuth
+from fakes.identity_toolkit import create_app
+from identity_toolkit import IdentityToolkitClient, IdentityToolkitUnavailableError, SignInError
+
+
+def stand_in(latency: float = 0.0, **kwargs: float) -> tuple[FakeAuth, IdentityToolkitClient]:
+    auth = FakeAuth()
+    auth.create_user(email="ada@example.com", password="hunter22", uid="ada")
+    transport = httpx.ASGITransport(app=create_app(auth, latency))
+    client = IdentityToolkitClient(
+        base_url="http://identity", api_key="fake", transport=transport, **kwargs
+    )
+    return auth, client
+
+
+def test_sign_in_and_rejected_credentials() -> None:
+    async def scenario() -> None:
+        auth, client = stand_in()
+        user = await client.sign_in_with_email_and_password("ada@example.com", "hunter22")
+        assert user["localId"] == "ada"
+        assert auth.verify_id_token(user["idToken"])["uid"] == "ada"
+
+        with pytest.raises(SignInError, match="INVALID_LOGIN_CREDENTIALS"):
+            await client.sign_in_with_email_and_password("ada@example.com", "wrong")
+        assert client.stats() == {"sign_ins": 1, "rejected": 1, "failures": 0}
+        await client.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_sign_ins_beyond_the_concurrency_limit_fail_fast() -> None:
+    async def scenario() -> None:
+        _, client = stand_in(latency=0.2, concurrency=2, queue_timeout=0.05)
+        sign_in = client.sign_in_with_email_and_password
+        results = await asyncio.gather(
+            *(sign_in("ada@example.com", "hunter22") for _ in range(3)), return_exceptions=True
+        )
+        assert sum(isinstance(r, dict) for r in results) == 2
+        assert sum(isinstance(r, IdentityToolkitUnavailableError) for r in results) == 1
+        await client.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_timed_out_and_cancelled_waiters_give_their_slot_back() -> None:
+    async def scenario() -> None:
+        _, client = stand_in(latency=0.05, concurrency=1, queue_timeout=0.02)
+        sign_in = client.sign_in_with_email_and_password
+        first = asyncio.ensure_future(sign_in("ada@example.com", "hunter22"))
+        await asyncio.sleep(0)
+        queued = [asyncio.ensure_future(sign_in("ada@example.com", "hunter22")) for _ in range(4)]
+        await asyncio.sleep(0.01)
+        queued[0].cancel()
+        results = await asyncio.gather(first, *queued, return_exceptions=True)
+        assert isinstance(results[0], dict)
+        assert isinstance(results[1], asyncio.CancelledError)
+        assert all(isinstance(r, IdentityToolkitUnavailableError) for r in results[2:])
+
+        # The one slot is free again
+        user = await sign_in("ada@example.com", "hunter22")
+        assert user["localId"] == "ada"
+        await client.aclose()
+
+    asyncio.run(scenario())
@@ -0,0 +1,50 @@
+import pytest
+
+from fakes.firestore import DESCENDING, FakeFirestore
+from pagination import apply_cursor, decode_cursor, encode_cursor, next_cursor
+
+
+def test_cursor_round_trip_and_malformed_cursors() -> None:
+    cursor = encode_cursor("2024-05-01T12:00:00", "review-1")
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == ("2024-05-01T12:00:00", "review-1")
+    malformed = [
+        "not a cursor",
+        cursor[:-3],
+        "WzEsMl0",  # [1,2]
+        encode_cursor("yesterday", "review-1"),
+        encode_cursor("2024-05-01T12:00:00", "reviews/review-1"),
+        encode_cursor("2024-05-01T12:00:00", ""),
+    ]
+    for bad in malformed:
+        with pytest.raises(ValueError):
+            decode_cursor(bad)
+
+
+def test_pages_cover_every_review_once_when_timestamps_collide() -> None:
+    db = FakeFirestore()
+    for i in range(7):
+        # Pairs of reviews share a timestamp, so the id tie-breaker matters
+        db.collection("reviews").document(f"r{i}").set(
+            {"restaurant_id": "x", "created_at": f"2024-05-0{i // 2 + 1}"}
+        )
+    query = (
+        db.collection("reviews")
+        .where("restaurant_id", "==", "x")
+        .order_by("created_at", direction=DESCENDING)
+        .order_by("__name__", direction=DESCENDING)
+    )
+
+    seen: list[str] = []
+    cursor = None
+    pages = 0
+    while True:
+        docs = apply_cursor(query, cursor).limit(3 + 1).get()
+        seen.extend(doc.id for doc in docs[:3])
+        pages += 1
+        cursor = next_cursor(docs, 3)
+        if cursor is None:
+            break
+
+    assert pages == 3
+    assert seen == ["r6", "r5", "r4", "r3", "r2", "r1", "r0"]
@@ -0,0 +1,54 @@
+import signal
+import sys
+import threading
+import time
+
+from profiler import SamplingProfiler
+
+
+def spin(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        sum(i * i for i in range(100))
+
+
+def test_samples_main_thread_on_sigprof() -> None:
+    profiler = SamplingProfiler()
+    profiler.start(interval=0.002, duration=5)
+    assert profiler.mode == "signal"
+    spin(0.2)
+    profiler.stop()
+
+    collapsed = profiler.collapsed()
+    assert collapsed.startswith("MainThread;")
+    assert "test_profiler.py:spin" in collapsed
+    # Every line is "frame;frame;... count"
+    for line in collapsed.splitlines():
+        stack, count = line.rsplit(" ", 1)
+        assert ";" in stack and int(count) > 0
+
+
+def test_samples_worker_threads_and_stops_itself() -> None:
+    profiler = SamplingProfiler()
+    worker = threading.Thread(target=spin, args=(0.3,), name="firestore_3")
+    worker.start()
+    profiler.start(interval=0.002, duration=0.1)
+    worker.join()
+
+    assert not profiler.running
+    # Pool threads are grouped under their pool name
+    assert any(
+        line.startswith("firestore;") and "spin" in line
+        for line in profiler.collapsed().splitlines()
+    )
+
+
+def test_signal_handler_takes_no_locks() -> None:
+    profiler = SamplingProfiler()
+    profiler.start(interval=10, duration=5)
+    # SIGPROF landing while collapsed() holds the lock must not deadlock
+    with profiler._lock:
+        profiler._on_signal(signal.SIGPROF, sys._getframe())
+    profiler.stop()
+
+    assert "test_profiler.py:test_signal_handler_takes_no_locks 1" in profiler.collapsed()
@@ -0,0 +1,82 @@
+import asyncio
+
+from rate_limit import DailyQuota, Priority, TokenBucket
+
+
+def test_bucket_serves_waiters_by_priority_then_arrival() -> None:
+    async def scenario() -> list[str]:
+        bucket = TokenBucket(rate=100, capacity=1)
+        await bucket.acquire()  # drain the burst
+        order: list[str] = []
+
+        async def take(name: str, priority: int) -> None:
+            await bucket.acquire(priority)
+            order.append(name)
+
+        tasks = [
+            asyncio.ensure_future(take("prefetch", Priority.BACKGROUND)),
+            asyncio.ensure_future(take("detail", Priority.INTERACTIVE)),
+            asyncio.ensure_future(take("search", Priority.INTERACTIVE)),
+        ]
+        await asyncio.sleep(0)
+        assert bucket.waiting == 3
+        assert not bucket.try_acquire()  # no jumping the queue
+        await asyncio.gather(*tasks)
+        return order
+
+    assert asyncio.run(scenario()) == ["detail", "search", "prefetch"]
+
+
+def test_bucket_refills_and_skips_cancelled_waiters() -> None:
+    async def scenario() -> None:
+        bucket = TokenBucket(rate=50, capacity=2)
+        assert bucket.try_acquire()
+        assert bucket.try_acquire()
+        assert not bucket.try_acquire()
+
+        gone = asyncio.ensure_future(bucket.acquire())
+        await asyncio.sleep(0)
+        gone.cancel()
+        await asyncio.wait_for(bucket.acquire(), timeout=1)
+        assert bucket.waiting == 0
+
+        await asyncio.sleep(0.1)
+        assert bucket.level == 2  # capped at capacity
+
+    asyncio.run(scenario())
+
+
+def test_quota_degrades_then_goes_cache_only() -> None:
+    quota = DailyQuota(limit=100, low_water=0.1, critical=0.02)
+    assert quota.mode == "normal"
+    assert quota.allows(Priority.BACKGROUND)
+
+    for _ in range(90):
+        quota.consume()
+    assert quota.remaining == 10
+    assert quota.mode == "degraded"
+    assert quota.allows(Priority.INTERACTIVE)
+    assert not quota.allows(Priority.AUTOCOMPLETE)
+
+    for _ in range(8):
+        quota.consume()
+    assert quota.mode == "cache_only"
+    assert not quota.allows(Priority.INTERACTIVE)
+
+
+def test_quota_resyncs_from_upstream_headers() -> None:
+    quota = DailyQuota(limit=100)
+    quota.update_from_headers({"ratelimit-dailylimit": "5000", "ratelimit-remaining": "4000"})
+    assert quota.stats() == {"limit": 5000, "remaining": 4000, "mode": "normal"}
+    # Garbage headers leave the local count alone
+    quota.update_from_headers({"ratelimit-remaining": "lots"})
+    assert quota.remaining == 4000
+
+
+def test_quota_resets_on_a_new_day() -> None:
+    quota = DailyQuota(limit=10)
+    for _ in range(10):
+        quota.consume()
+    assert quota.mode == "cache_only"
+    quota._day = "2000-01-01"
+    assert quota.remaining == 10
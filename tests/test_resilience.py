@@ -0,0 +1,103 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import httpx
+import pytest
+
+import yelp_api_client
+from resilience import CircuitBreaker, backoff_delay, parse_retry_after
+from yelp_api_client import YelpCircuitOpenError, YelpClient
+
+
+def test_retry_after_seconds_and_http_date() -> None:
+    assert parse_retry_after("3") == 3.0
+    later = datetime.now(timezone.utc) + timedelta(seconds=30)
+    assert parse_retry_after(format_datetime(later, usegmt=True)) == pytest.approx(30, abs=2)
+    # A date in the past means "now"
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+
+def test_unreadable_retry_after_uses_the_default() -> None:
+    assert parse_retry_after(None) == 1.0
+    assert parse_retry_after("soon", default=2.0) == 2.0
+    assert parse_retry_after("nan") == 1.0
+
+
+def test_backoff_delay_is_jittered_and_capped() -> None:
+    for attempt in range(6):
+        for _ in range(50):
+            assert 0 <= backoff_delay(attempt, base=0.1, cap=1.0) <= min(1.0, 0.1 * 2**attempt)
+
+
+def test_breaker_opens_probes_and_closes() -> None:
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=0.05)
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+    assert 0 < breaker.retry_after <= 0.05
+
+    time.sleep(0.06)
+    assert breaker.state == "half_open"
+    assert breaker.allow()  # the single probe
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.stats() == {
+        "state": "closed",
+        "consecutive_failures": 0,
+        "trips": 1,
+        "rejected": 2,
+    }
+
+
+def test_failed_probe_reopens_the_breaker() -> None:
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert breaker.trips == 2
+
+
+def yelp_client(monkeypatch: pytest.MonkeyPatch, statuses: list[int]) -> YelpClient:
+    monkeypatch.setattr(yelp_api_client, "YELP_RETRY_BASE_DELAY", 0.001)
+    replies = iter(statuses)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(next(replies), json={}, headers={"retry-after": "0"})
+
+    client = YelpClient(base_url="https://yelp.test")
+    client.breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    client._client = httpx.AsyncClient(
+        base_url=client.base_url, transport=httpx.MockTransport(handler)
+    )
+    return client
+
+
+def test_client_retries_5xx_and_429(monkeypatch: pytest.MonkeyPatch) -> None:
+    client = yelp_client(monkeypatch, [503, 429, 200])
+    response = asyncio.run(client.get("/v3/businesses/search"))
+    assert response.status_code == 200
+    assert client.retries == 2
+    assert client.breaker.state == "closed"
+
+
+def test_client_trips_the_breaker_and_fails_fast(monkeypatch: pytest.MonkeyPatch) -> None:
+    client = yelp_client(monkeypatch, [500, 502])
+
+    async def scenario() -> None:
+        # Two failures open the circuit, so the last retry never reaches Yelp
+        with pytest.raises(YelpCircuitOpenError):
+            await client.get("/v3/businesses/search")
+        with pytest.raises(YelpCircuitOpenError):
+            await client.get("/v3/businesses/search")
+
+    asyncio.run(scenario())
+    assert client.breaker.state == "open"
+    assert client.breaker.rejected == 2
@@ -0,0 +1,37 @@
+import json
+
+import pytest
+from pydantic import ValidationError
+
+import responses
+from models import ReviewResponse
+
+
+class ReviewWithSecret(ReviewResponse):
+    secret: str
+
+
+def review(**extra: str) -> dict[str, object]:
+    return {
+        "id": "r1",
+        "restaurant_id": "x",
+        "user_id": "u",
+        "rating": 4.0,
+        "created_at": "2024-05-01",
+        **extra,
+    }
+
+
+def test_fast_path_filters_to_the_response_model(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(responses, "FAST_JSON_ENABLED", True)
+    content = [ReviewWithSecret(**review(secret="hunter2")), review()]
+    rendered = responses.fast_response(content, list[ReviewResponse])
+    body = json.loads(rendered.body)
+    assert [item.get("secret") for item in body] == [None, None]
+    assert body[1]["id"] == "r1"
+
+
+def test_fast_path_validates_against_the_response_model(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(responses, "FAST_JSON_ENABLED", True)
+    with pytest.raises(ValidationError):
+        responses.fast_response([{"id": "r1"}], list[ReviewResponse])
@@ -0,0 +1,128 @@
+import asyncio
+from typing import Any
+
+import httpx
+import pytest
+
+import services
+from fakes.auth import FakeAuth
+from fakes.firestore import FakeFirestore
+from fakes.yelp import make_business, make_detail
+from pagination import encode_cursor
+from yelp_api_client import YelpBusinessDetail
+
+
+@pytest.fixture
+def backend() -> tuple[FakeFirestore, FakeAuth]:
+    db, auth = services.use_fakes()
+    db.collection("restaurants").document("r1").set({"name": "Legacy Diner"})
+    return db, auth
+
+
+def call(method: str, url: str, token: str, body: Any = None) -> httpx.Response:
+    import main
+
+    async def send() -> httpx.Response:
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            headers = {"Authorization": f"Bearer {token}"}
+            return await client.request(method, url, json=body, headers=headers)
+
+    return asyncio.run(send())
+
+
+def legacy_user(db: FakeFirestore, auth: FakeAuth, uid: str, reviews: int) -> str:
+    """A user and reviews written before review_count was maintained."""
+    auth.create_user(email=f"{uid}@example.com", password="password123", uid=uid)
+    db.collection("users").document(uid).set({"email": f"{uid}@example.com", "favorites": []})
+    for i in range(reviews):
+        db.collection("reviews").document(f"{uid}-{i}").set(
+            {
+                "restaurant_id": "r1",
+                "user_id": uid,
+                "rating": 4.0,
+                "text": "old",
+                "created_at": f"2024-01-0{i + 1}T00:00:00",
+            }
+        )
+    return auth.issue_token(uid)
+
+
+def post_review(token: str, rating: float = 5.0) -> str:
+    body = {"restaurant_id": "r1", "rating": rating, "text": "new"}
+    response = call("POST", "/restaurants/r1/reviews", token, body)
+    assert response.status_code == 200, response.text
+    return str(response.json()["id"])
+
+
+def test_review_counter_is_seeded_for_legacy_users(backend: Any) -> None:
+    db, auth = backend
+    token = legacy_user(db, auth, "legacy", reviews=3)
+
+    review_id = post_review(token)
+    assert db.collection("users").document("legacy").get().to_dict()["review_count"] == 4
+    assert call("GET", "/users/me/reviews/count", token).json() == {"reviewCount": 4}
+
+    assert call("DELETE", f"/reviews/{review_id}", token).status_code == 200
+    assert call("DELETE", "/reviews/legacy-0", token).status_code == 200
+    assert call("GET", "/users/me/reviews/count", token).json() == {"reviewCount": 2}
+
+
+def test_review_count_read_backfills_the_counter(backend: Any) -> None:
+    db, auth = backend
+    token = legacy_user(db, auth, "reader", reviews=2)
+
+    assert call("GET", "/users/me/reviews/count", token).json() == {"reviewCount": 2}
+    assert db.collection("users").document("reader").get().to_dict()["review_count"] == 2
+
+
+def test_rating_aggregate_is_rebuilt_for_legacy_restaurants(backend: Any) -> None:
+    db, auth = backend
+    token = legacy_user(db, auth, "critic", reviews=3)
+
+    review_id = post_review(token, rating=5.0)
+    [aggregate] = call("GET", "/restaurants/ratings?ids=r1", token).json()
+    assert aggregate["review_count"] == 4
+    assert aggregate["average_rating"] == 4.25
+    assert aggregate["histogram"] == {"4": 3, "5": 1}
+
+    assert call("DELETE", f"/reviews/{review_id}", token).status_code == 200
+    [aggregate] = call("GET", "/restaurants/ratings?ids=r1", token).json()
+    assert aggregate["review_count"] == 3
+    assert aggregate["average_rating"] == 4.0
+    assert aggregate["histogram"] == {"4": 3}
+
+
+def test_restaurant_view_lists_reviews_for_signed_in_users(
+    backend: Any, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    import main
+
+    db, auth = backend
+    token = legacy_user(db, auth, "viewer", reviews=3)
+
+    async def details(yelp_id: str) -> YelpBusinessDetail:
+        return YelpBusinessDetail(**{**make_detail(make_business(1)), "id": yelp_id})
+
+    async def similar(details: YelpBusinessDetail) -> list[dict[str, Any]]:
+        return []
+
+    monkeypatch.setattr(main, "get_business_details", details)
+    monkeypatch.setattr(main, "similar_restaurants_for", similar)
+
+    view = call("GET", "/restaurants/r1/view?reviews_limit=2", token).json()
+    assert [review["id"] for review in view["reviews"]] == ["viewer-2", "viewer-1"]
+    assert view["reviews_next_cursor"] is not None
+    assert view["is_favorite"] is False
+
+    anonymous = call("GET", "/restaurants/r1/view", "not-a-token").json()
+    assert anonymous["reviews"] is None
+    assert anonymous["is_favorite"] is None
+
+
+@pytest.mark.parametrize("cursor", ["garbage", encode_cursor("yesterday", "legacy-0")])
+def test_malformed_review_cursor_is_a_bad_request(backend: Any, cursor: str) -> None:
+    db, auth = backend
+    token = legacy_user(db, auth, "pager", reviews=1)
+    response = call("GET", f"/users/me/reviews?cursor={cursor}", token)
+    assert response.status_code == 400
@@ -0,0 +1,107 @@
+import asyncio
+
+import httpx
+
+import services
+from fakes.yelp import CENTER, make_business
+from models import RestaurantResponse
+from search_index import LocalRestaurantIndex, RestaurantSearchIndex
+from yelp_api_client import (
+    YelpBusiness,
+    normalize_search_params,
+    restaurant_index,
+    search_restaurants,
+    search_totals,
+)
+
+
+def test_local_page_reports_the_match_count() -> None:
+    index = RestaurantSearchIndex(model=YelpBusiness)
+    index.add_many(YelpBusiness(**make_business(i)) for i in range(0, 400, 8))
+    result = index.search("pizza", latitude=CENTER[0], longitude=CENTER[1], limit=3)
+    assert result is not None
+    page, matches = result
+    assert len(page) == 3
+    assert matches > 3
+    assert index.search("pizza", latitude=CENTER[0], longitude=CENTER[1], limit=50) is None
+
+
+def test_local_answers_keep_yelps_total() -> None:
+    restaurant_index.add_many(YelpBusiness(**make_business(i)) for i in range(0, 400, 8))
+    latitude, longitude = CENTER
+    key = normalize_search_params("pizza", None, latitude, longitude, None, None, 3)
+    search_totals.set(key[:-1], 240, ttl=60)
+    try:
+        response = asyncio.run(search_restaurants("pizza", None, latitude, longitude, limit=3))
+        assert len(response.businesses) == 3
+        assert response.total == 240
+
+        search_totals.delete(key[:-1])
+        response = asyncio.run(search_restaurants("pizza", None, latitude, longitude, limit=3))
+        assert response.total > 3
+    finally:
+        for i in range(0, 400, 8):
+            restaurant_index.remove(f"fake-{i:05d}")
+        search_totals.clear()
+
+
+def local_restaurant(
+    restaurant_id: str, cuisine: str, address: str, day: int
+) -> RestaurantResponse:
+    created_at = f"2024-05-{day:02d}T12:00:00"
+    return RestaurantResponse(
+        id=restaurant_id,
+        name=f"Restaurant {restaurant_id}",
+        address=address,
+        cuisine_type=cuisine,
+        created_at=created_at,
+        updated_at=created_at,
+    )
+
+
+def test_local_restaurants_filter_by_cuisine_and_address() -> None:
+    index = LocalRestaurantIndex()
+    index.add(local_restaurant("a", "Italian", "1 Main St, New York, NY", 1))
+    index.add(local_restaurant("b", "Italian", "2 Main St, New York, NY", 2))
+    index.add(local_restaurant("c", "Thai", "3 Market St, San Francisco, CA", 3))
+
+    assert [r.id for r in index.search("italian", "NYC")] == ["b", "a"]
+    assert [r.id for r in index.search(None, "sf")] == ["c"]
+    assert [r.id for r in index.search(limit=2)] == ["c", "b"]
+    assert index.search("Thai", "NYC") == []
+
+    # Re-indexing moves a restaurant out of its old postings
+    index.add(local_restaurant("a", "Thai", "1 Main St, New York, NY", 1))
+    assert [r.id for r in index.search("italian")] == ["b"]
+    index.replace_all([local_restaurant("d", "Thai", "4 Elm St, New York, NY", 4)])
+    assert [r.id for r in index.search("thai")] == ["d"]
+    assert index.stats()["documents"] == 1
+
+
+def test_created_restaurants_are_listed_locally() -> None:
+    import main
+
+    services.use_fakes()
+    main.local_restaurants.replace_all([])
+    body = {
+        "name": "Joe's Pizza",
+        "address": "123 Main St, New York, NY",
+        "cuisine_type": "Italian",
+    }
+
+    async def scenario() -> list[dict[str, str]]:
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            created = await client.post("/restaurants", json=body)
+            assert created.status_code == 201
+            listed = await client.get(
+                "/restaurants", params={"cuisine_type": "italian", "limit": 1}
+            )
+            assert listed.status_code == 200
+            return listed.json()
+
+    try:
+        restaurants = asyncio.run(scenario())
+    finally:
+        main.local_restaurants.replace_all([])
+    assert [r["name"] for r in restaurants] == ["Joe's Pizza"]
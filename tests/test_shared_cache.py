@@ -0,0 +1,178 @@
+import asyncio
+import time
+from typing import Any
+
+from shared_cache import InMemoryBackend, RedisBackend, SharedCache, _encode_command, _read_reply
+
+
+class FakeRedisServer:
+    """In-process Redis-protocol stand-in: GET, SET [PX], DEL, PUBLISH, SUBSCRIBE."""
+
+    def __init__(self) -> None:
+        self.data: dict[bytes, tuple[bytes, float | None]] = {}
+        self.subscribers: dict[bytes, set[asyncio.StreamWriter]] = {}
+        self.server: asyncio.AbstractServer | None = None
+        self.port = 0
+
+    async def start(self) -> None:
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        assert self.server is not None
+        self.server.close()
+        for writers in self.subscribers.values():
+            for writer in writers:
+                writer.close()
+        await self.server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                command = await _read_reply(reader)
+                writer.write(self._execute(command, writer))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+
+    def _execute(self, command: list[bytes], writer: asyncio.StreamWriter) -> bytes:
+        name, args = command[0].upper(), command[1:]
+        if name == b"GET":
+            entry = self.data.get(args[0])
+            if entry is None or (entry[1] is not None and entry[1] <= time.monotonic()):
+                return b"$-1\r\n"
+            return b"$%d\r\n%s\r\n" % (len(entry[0]), entry[0])
+        if name == b"SET":
+            expires = None
+            if len(args) == 4 and args[2].upper() == b"PX":
+                expires = time.monotonic() + int(args[3]) / 1000
+            self.data[args[0]] = (args[1], expires)
+            return b"+OK\r\n"
+        if name == b"DEL":
+            return b":%d\r\n" % sum(self.data.pop(key, None) is not None for key in args)
+        if name == b"PUBLISH":
+            receivers = self.subscribers.get(args[0], set())
+            for subscriber in receivers:
+                subscriber.write(_encode_command((b"message", args[0], args[1])))
+            return b":%d\r\n" % len(receivers)
+        if name == b"SUBSCRIBE":
+            self.subscribers.setdefault(args[0], set()).add(writer)
+            return b"*3\r\n$9\r\nsubscribe\r\n$%d\r\n%s\r\n:1\r\n" % (len(args[0]), args[0])
+        return b"-ERR unknown command\r\n"
+
+
+async def wait_for(condition: Any, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        await asyncio.sleep(0.01)
+
+
+def test_redis_backend_get_set_delete() -> None:
+    async def scenario() -> None:
+        server = FakeRedisServer()
+        await server.start()
+        backend = RedisBackend(f"redis://127.0.0.1:{server.port}/0")
+        try:
+            assert await backend.get("missing") is None
+            await backend.set("k", b"value", ttl=60)
+            assert await backend.get("k") == b"value"
+            await backend.set("short", b"x", ttl=0.01)
+            await asyncio.sleep(0.05)
+            assert await backend.get("short") is None
+            await backend.delete("k")
+            assert await backend.get("k") is None
+        finally:
+            await backend.close()
+            await server.stop()
+
+    asyncio.run(scenario())
+
+
+def test_invalidation_reaches_other_workers() -> None:
+    async def scenario() -> None:
+        server = FakeRedisServer()
+        await server.start()
+        url = f"redis://127.0.0.1:{server.port}"
+        # Two "workers", each with its own backend connections and local tier
+        worker_a = SharedCache(RedisBackend(url), "users", local_ttl=60)
+        worker_b = SharedCache(RedisBackend(url), "users", local_ttl=60)
+        try:
+            await worker_a.start()
+            await worker_b.start()
+            await wait_for(lambda: len(server.subscribers.get(b"crowdfork:invalidate", ())) == 2)
+
+            await worker_a.set("u1", {"favorites": ["a"]})
+            assert await worker_b.get("u1") == {"favorites": ["a"]}  # from the shared tier
+
+            await worker_a.invalidate("u1")
+            await wait_for(lambda: worker_b.invalidations_received >= 2)
+            assert await worker_b.get("u1") is None
+        finally:
+            await worker_a.backend.close()
+            await worker_b.backend.close()
+            await server.stop()
+
+    asyncio.run(scenario())
+
+
+def test_backend_errors_are_cache_misses() -> None:
+    async def scenario() -> None:
+        # Nothing listens on port 1: every call fails, none raise to the caller
+        cache = SharedCache(RedisBackend("redis://127.0.0.1:1"), "users")
+        assert await cache.get("u1") is None
+        await cache.set("u1", {"name": "x"})
+        await cache.invalidate("u1")
+        assert cache.errors == 3
+
+    asyncio.run(scenario())
+
+
+def test_in_memory_backend_invalidation() -> None:
+    async def scenario() -> None:
+        cache = SharedCache(InMemoryBackend(), "users", local_ttl=60)
+        await cache.start()
+        await cache.set("u1", {"name": "x"})
+        assert await cache.get("u1") == {"name": "x"}
+        await cache.invalidate("u1")
+        assert await cache.get("u1") is None
+        assert cache.invalidations_received == 1
+
+    asyncio.run(scenario())
+
+
+def test_write_after_invalidation_is_not_cached() -> None:
+    async def scenario() -> None:
+        cache = SharedCache(InMemoryBackend(), "users", local_ttl=60)
+        await cache.start()
+        generation = cache.generation("u1")
+        # A concurrent write invalidates while the reader is still loading
+        await cache.invalidate("u1")
+        await cache.set("u1", {"name": "stale"}, generation=generation)
+        assert await cache.get("u1") is None
+        assert cache.stale_writes_skipped == 1
+
+        await cache.set("u1", {"name": "fresh"}, generation=cache.generation("u1"))
+        assert await cache.get("u1") == {"name": "fresh"}
+
+    asyncio.run(scenario())
+
+
+def test_in_memory_backend_sweeps_expired_keys() -> None:
+    async def scenario() -> None:
+        backend = InMemoryBackend(sweep_interval=0)
+        await backend.set("old", b"x", ttl=0.01)
+        await asyncio.sleep(0.02)
+        await backend.set("new", b"y", ttl=60)
+        assert len(backend) == 1
+
+    asyncio.run(scenario())
+
+
+def test_disabled_cache_always_misses() -> None:
+    async def scenario() -> None:
+        cache = SharedCache(InMemoryBackend(), "users", enabled=False)
+        await cache.set("u1", {"name": "x"})
+        assert await cache.get("u1") is None
+
+    asyncio.run(scenario())
@@ -0,0 +1,59 @@
+import asyncio
+
+import pytest
+
+from singleflight import SingleFlight
+
+
+def test_singleflight_coalesces_concurrent_calls() -> None:
+    flight = SingleFlight()
+    calls = 0
+
+    async def load() -> str:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "value"
+
+    async def scenario() -> list[str]:
+        return await asyncio.gather(*(flight.do("key", load) for _ in range(5)))
+
+    assert asyncio.run(scenario()) == ["value"] * 5
+    assert calls == 1
+    assert flight.stats() == {"inflight": 0, "calls": 1, "shared": 4}
+
+
+def test_singleflight_shares_the_exception_and_forgets_the_key() -> None:
+    flight = SingleFlight()
+
+    async def fail() -> None:
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    async def scenario() -> list[BaseException | None]:
+        return await asyncio.gather(
+            flight.do("key", fail), flight.do("key", fail), return_exceptions=True
+        )
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert len(flight) == 0
+
+
+def test_cancelled_waiter_does_not_cancel_the_shared_call() -> None:
+    flight = SingleFlight()
+
+    async def load() -> str:
+        await asyncio.sleep(0.02)
+        return "value"
+
+    async def scenario() -> str:
+        first = asyncio.ensure_future(flight.do("key", load))
+        second = asyncio.ensure_future(flight.do("key", load))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(scenario()) == "value"
@@ -0,0 +1,93 @@
+import asyncio
+from typing import Any
+
+import httpx
+from fastapi import FastAPI, Response
+
+from singleflight import SingleFlight
+from tracing import Histogram, TracedRoute, TracingMiddleware, metrics, span
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+    app.router.route_class = TracedRoute
+    app.add_middleware(TracingMiddleware)
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: str, response: Response) -> dict[str, Any]:
+        response.headers["Server-Timing"] = "handler;dur=1.0"
+        with span("firestore"):
+            await asyncio.sleep(0.01)
+            # Nested spans are attributed to the outer one
+            with span("yelp"):
+                await asyncio.sleep(0.001)
+        return {"id": item_id}
+
+    return app
+
+
+def test_server_timing_and_metrics() -> None:
+    async def scenario() -> None:
+        transport = httpx.ASGITransport(app=build_app())
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/items/42")
+
+        timing = response.headers["server-timing"]
+        assert timing.startswith("handler;dur=1.0, firestore;dur=")
+        assert "serialize;dur=" in timing and "app;dur=" in timing
+        assert "yelp" not in timing
+
+        text = metrics.render()
+        # Labelled with the route template, not the concrete path
+        assert 'http_requests_total{method="GET",route="/items/{item_id}",status="200"}' in text
+        assert 'phase="firestore",le="+Inf"} 1' in text
+
+    asyncio.run(scenario())
+
+
+def test_shared_call_is_not_traced_as_the_first_callers() -> None:
+    flight = SingleFlight(phase="yelp")
+
+    async def fetch() -> str:
+        with span("firestore"):
+            await asyncio.sleep(0.05)
+        return "shared"
+
+    app = FastAPI()
+    app.add_middleware(TracingMiddleware)
+
+    @app.get("/shared")
+    async def shared() -> str:
+        result: str = await flight.do("key", fetch)
+        return result
+
+    async def scenario() -> None:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first, second = await asyncio.gather(client.get("/shared"), client.get("/shared"))
+
+        assert flight.stats() == {"inflight": 0, "calls": 1, "shared": 1}
+        # Both callers waited on Yelp; neither owns the shared call's spans
+        for response in (first, second):
+            timing = response.headers["server-timing"]
+            assert "yelp;dur=" in timing
+            assert "firestore" not in timing
+
+    asyncio.run(scenario())
+
+
+def test_span_outside_request_is_noop() -> None:
+    with span("firestore") as s:
+        pass
+    assert s._trace is None
+
+
+def test_histogram_buckets_are_cumulative() -> None:
+    histogram = Histogram("latency_seconds", "Latency.", ("op",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value, "get")
+    lines = histogram.render()
+    assert 'latency_seconds_bucket{op="get",le="0.1"} 2' in lines
+    assert 'latency_seconds_bucket{op="get",le="1"} 3' in lines
+    assert 'latency_seconds_bucket{op="get",le="+Inf"} 4' in lines
+    assert 'latency_seconds_count{op="get"} 4' in lines